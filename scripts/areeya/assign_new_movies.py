@@ -0,0 +1,139 @@
+"""
+Put new or changed movies into the existing micro-genres (no reclustering)
+
+Reads the cluster model saved by cluster_and_keywords1.py, finds movies of
+the cleaned dataset that are not in movie_clusters.csv (or whose clean_text
+changed), builds their features with the model's transforms and assigns
+each to the nearest centroid. movie_clusters.csv and
+movie_clusters_keybert.csv are updated in place with the existing labels,
+and the drift report says when a full recluster is due.
+
+Run vectorize_cluster.py first so the new movies have embeddings (only the
+new texts are embedded).
+
+    python scripts/areeya/assign_new_movies.py
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+# cleaned_store, vector_store, basic_features and cluster_model live in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cleaned_store import read_cleaned  # noqa: E402
+from vector_store import align_vectors, dequantize, read_vectors  # noqa: E402
+from basic_features import load_features  # noqa: E402
+from cluster_model import ClusterModel, hybrid_features  # noqa: E402
+
+# ----------------------------
+# CONFIG
+# ----------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLUSTER_MODEL_PATH = os.path.join(BASE_DIR, "../../data/processed/cluster_model")
+EMBEDDING_PATH = os.path.join(BASE_DIR, "../../data/processed/movie_embeddings")
+FEATURES_PATH = os.path.join(BASE_DIR, "../../data/processed/movie_features.parquet")
+INPUT_DATA_PATH = os.path.join(BASE_DIR, "../../data/cleaned/movies")
+CLUSTER_PATHS = [os.path.join(BASE_DIR, "../../data/processed/movie_clusters.csv"),
+                 os.path.join(BASE_DIR, "../../data/processed/movie_clusters_keybert.csv")]
+# per-cluster columns copied from the movies already in the cluster
+CLUSTER_COLUMNS = ["micro_genre_name", "sample_movies", "micro_genre_keybert"]
+
+
+# ----------------------------
+# 1) Find new / changed movies
+# ----------------------------
+def find_pending(df, clustered):
+    """Rows of df that are not clustered yet or whose clean_text changed"""
+    known = df[["movie_id", "clean_text"]].merge(clustered[["movie_id", "clean_text"]], on="movie_id", how="left",
+                                                 suffixes=("", "_clustered"), validate="many_to_one",
+                                                 indicator=True)
+    new = (known["_merge"] == "left_only").to_numpy()
+    changed = ~new & (known["clean_text"].fillna("").to_numpy(dtype=object)
+                      != known["clean_text_clustered"].fillna("").to_numpy(dtype=object))
+    print(f"[INFO] {int(new.sum())} new and {int(changed.sum())} changed movies")
+    return df[new | changed].copy()
+
+
+# ----------------------------
+# 2) Features in the model's space
+# ----------------------------
+def build_features(df, model):
+    ids, vectors, header = read_vectors(EMBEDDING_PATH)
+    if header['model'] != model.meta.get('embedding_model'):
+        raise ValueError(f"embeddings are from {header['model']} but the cluster model was fitted on "
+                         f"{model.meta.get('embedding_model')}. Rerun cluster_and_keywords1.py")
+    emb_matrix, missing = align_vectors(ids, vectors, df["movie_id"].to_numpy())
+    if missing.any():
+        print(f"[WARN] {int(missing.sum())} movies have no embedding yet (run python scripts/vectorize_cluster.py);"
+              " skipping them")
+        df, emb_matrix = df[~missing], emb_matrix[~missing]
+    emb_matrix = dequantize(emb_matrix, header)
+    mode = model.meta.get('feature_mode', 'emb_only')
+    if mode != 'emb_only':
+        df = load_features(df, FEATURES_PATH)
+    return df, hybrid_features(emb_matrix, df, mode, model.transforms,
+                               tfidf_weight=model.meta.get('tfidf_weight', 2.0))
+
+
+# ----------------------------
+# 3) Update outputs
+# ----------------------------
+def update_clusters(path, assigned, model):
+    """Replace / append the assigned movies in one cluster CSV, labels from the cluster's other movies"""
+    out = pd.read_csv(path)
+    kept = out[~out["movie_id"].isin(assigned["movie_id"])]
+    rows = assigned.copy()
+    per_cluster = [col for col in CLUSTER_COLUMNS if col in out.columns]
+    if per_cluster:
+        labels = kept.groupby("cluster")[per_cluster].first()
+        for col in per_cluster:
+            from_model = {c: names.get(col) for c, names in model.labels.items()}
+            rows[col] = rows["cluster"].map(labels[col]).fillna(rows["cluster"].map(from_model))
+    rows = rows.reindex(columns=out.columns)
+    pd.concat([kept, rows], ignore_index=True).to_csv(path, index=False)
+    print(f">> Updated {path} ({len(rows)} movies assigned)")
+
+
+def print_drift(report):
+    print("\n=== Drift since the last clustering ===")
+    print(f"   Movies assigned: {report['assigned']} ({report['new_share']:.1%} of the clustered catalogue)")
+    print(f"   Outside their micro-genre: {report['outlier_rate']:.1%}")
+    print(f"   Micro-genre share shift (PSI): {report['psi']:.3f}")
+    if report['recluster']:
+        print("[WARN] Full recluster recommended (python scripts/areeya/cluster_and_keywords1.py):")
+        for reason in report['reasons']:
+            print(f"   - {reason}")
+    else:
+        print("   No recluster needed")
+
+
+# ----------------------------
+# MAIN
+# ----------------------------
+if __name__ == "__main__":
+    print("=== Assign new movies to micro-genres ===")
+    model = ClusterModel.load(CLUSTER_MODEL_PATH)
+    print(f"[INFO] Cluster model: k={model.k}, feature mode = {model.meta.get('feature_mode')}")
+
+    columns = model.meta.get('columns')
+    df = read_cleaned(INPUT_DATA_PATH, columns=columns,
+                      csv_path=os.path.join(BASE_DIR, "../../data/cleaned/cleaned_movies.csv"))
+    clustered = pd.read_csv(CLUSTER_PATHS[0], usecols=["movie_id", "clean_text"])
+    pending = find_pending(df, clustered)
+
+    if len(pending):
+        pending, features = build_features(pending, model)
+        started = time.perf_counter()
+        clusters, distances, outliers = model.assign(features)
+        elapsed = time.perf_counter() - started
+        print(f"[INFO] Assigned {len(pending)} movies in {elapsed * 1000:.1f} ms "
+              f"({int(outliers.sum())} farther than their micro-genre's usual radius)")
+        pending["cluster"] = clusters
+        for path in CLUSTER_PATHS:
+            if os.path.exists(path):
+                update_clusters(path, pending, model)
+        model.save(CLUSTER_MODEL_PATH, arrays=False)
+
+    print_drift(model.drift())
+    print("=== DONE ===")
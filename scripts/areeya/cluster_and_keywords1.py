@@ -1,11 +1,10 @@
 import os
-import pickle
+import sys
 import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans, AgglomerativeClustering
+from sklearn.cluster import AgglomerativeClustering
 from sklearn.metrics import silhouette_score
 from sklearn.feature_extraction.text import TfidfVectorizer
-from textblob import TextBlob
 import matplotlib.pyplot as plt
 from sklearn.decomposition import PCA
 import umap
@@ -20,14 +19,30 @@ except Exception:
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
+# cleaned_store, vector_store and basic_features live in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cleaned_store import read_cleaned  # noqa: E402
+from vector_store import align_vectors, dequantize, read_vectors  # noqa: E402
+from basic_features import load_features  # noqa: E402
+from k_selection import SWEEP_JOBS, KSweep  # noqa: E402
+from cluster_backends import fit_kmeans  # noqa: E402
+from cluster_model import ClusterModel, hybrid_features, load_cluster_model  # noqa: E402
+from cluster_quality import EXACT_MAX_ROWS, SILHOUETTE_SAMPLE, format_score, quality_report  # noqa: E402
+
 # ----------------------------
 # CONFIG
 # ----------------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-EMBEDDING_PKL_PATH = os.path.join(BASE_DIR, "../../data/processed/movie_embeddings.pkl")
-EMBEDDING_NPY_PATH = os.path.join(BASE_DIR, "../../data/processed/movie_embeddings.npy")
-INPUT_DATA_PATH = os.path.join(BASE_DIR, "../../data/cleaned/cleaned_movies.csv")
+FEATURES_PATH = os.path.join(BASE_DIR, "../../data/processed/movie_features.parquet")
+EMBEDDING_PATH = os.path.join(BASE_DIR, "../../data/processed/movie_embeddings")  # .bin / .ids.npy / .json
+INPUT_DATA_PATH = os.path.join(BASE_DIR, "../../data/cleaned/movies")
+# Columns read from the cleaned dataset (clean_overview, budget, ... are not used)
+INPUT_COLUMNS = ["movie_id", "title", "original_title", "year", "runtime", "genres", "director", "cast",
+                 "overview", "tagline", "keywords", "clean_text", "vote_average", "vote_count",
+                 "popularity", "review_count", "original_language", "release_date"]
 OUTPUT_CLUSTER_PATH = os.path.join(BASE_DIR, "../../data/processed/movie_clusters.csv")
+# centroids + feature transforms + labels for assign_new_movies.py (.json / .npz / .transforms.joblib)
+CLUSTER_MODEL_PATH = os.path.join(BASE_DIR, "../../data/processed/cluster_model")
 OUTPUT_DIR = os.path.join(BASE_DIR, "../../data/processed")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -44,12 +59,28 @@ FEATURE_MODE = 'emb_only'
 TFIDF_PCA_DIM = 50
 
 # Safety / behavior flags
-ALLOW_PADDING = False   # if embeddings shorter than df, whether to pad zeros (unsafe)
+ALLOW_PADDING = False   # if some movies have no embedding, whether to use zero vectors (unsafe)
 FORCE_K = None          # set to an int (e.g., 50) to force chosen_k; set to None to use heuristic
 
+# K sweep: every k is fitted once (in parallel) and reused by the silhouette fallback and final KMeans
+SWEEP_WORKERS = SWEEP_JOBS  # parallel KMeans fits (env SWEEP_JOBS)
+SWEEP_WARM_START = False    # True = start each k from the previous centroids (faster, but k may differ)
+# KMeans backend for the K sweep and final clustering:
+# 'full'      -> sklearn KMeans on the whole matrix (default)
+# 'minibatch' -> mini-batch KMeans streamed over row blocks (millions of movies; inertia a little higher)
+#                with FEATURE_MODE='emb_only' and an artifact whose rows match the cleaned data, the K sweep and
+#                final fit read the memory-mapped (float16 / int8) artifact directly, without a float32 copy
+KMEANS_BACKEND = 'full'
+
+# Silhouette fallback: exact silhouette_score (O(N^2)) up to this many rows, above it a stratified sample
+# of SILHOUETTE_SAMPLE_ROWS rows (with 95% CI) plus the O(N k) scores of cluster_quality
+SILHOUETTE_EXACT_MAX_ROWS = EXACT_MAX_ROWS
+SILHOUETTE_SAMPLE_ROWS = SILHOUETTE_SAMPLE
+# Agglomerative / HDBSCAN / PCA+UMAP diagnostics of a streamed artifact run on a random sample of this many rows
+DIAGNOSTIC_SAMPLE_ROWS = 20000
+
 print(f"DEBUG: BASE_DIR = {BASE_DIR}")
-print(f"DEBUG: EMBEDDING_PKL exists? {os.path.exists(EMBEDDING_PKL_PATH)}")
-print(f"DEBUG: EMBEDDING_NPY exists? {os.path.exists(EMBEDDING_NPY_PATH)}")
+print(f"DEBUG: EMBEDDING exists? {os.path.exists(EMBEDDING_PATH + '.json')}")
 print(f"DEBUG: INPUT_DATA_PATH exists? {os.path.exists(INPUT_DATA_PATH)}")
 
 # ----------------------------
@@ -64,120 +95,71 @@ def pretty_print_choice(tested, chosen_name, chosen_k, reason):
 # ----------------------------
 # Feature Engineering
 # ----------------------------
-def build_hybrid_features(df, embeddings, mode='emb_only', tfidf_max_features=2000, tfidf_weight=2.0, tfidf_pca_dim=50):
+def build_hybrid_features(df, embeddings, mode='emb_only', tfidf_max_features=2000, tfidf_weight=2.0, tfidf_pca_dim=50,
+                          transforms=None):
     """
     Build hybrid features with safety checks.
-    embeddings may be: np.ndarray, dict (id->vec), list/tuple
+    embeddings: (movie_ids, vectors, header) from load_embeddings; rows are joined to df by movie_id
+    transforms: dict that receives the fitted TF-IDF / PCA (see cluster_model.hybrid_features)
     """
-    # 1) normalize embeddings into matrix aligned with df
-    emb_matrix = None
-    if isinstance(embeddings, dict):
-        if 'id' not in df.columns:
-            raise ValueError("Embeddings is a dict but dataframe has no 'id' column to align.")
-        # align by df['id']
-        emb_list = []
-        sample_vec = None
-        for rid in df['id'].values:
-            vec = embeddings.get(rid)
-            if vec is None:
-                if sample_vec is None:
-                    sample_vec = next(iter(embeddings.values()))
-                vec = np.zeros_like(sample_vec, dtype=float)
-            emb_list.append(vec)
-        emb_matrix = np.vstack(emb_list)
-    elif isinstance(embeddings, (list, tuple)):
-        emb_matrix = np.vstack(embeddings)
-    elif isinstance(embeddings, np.ndarray):
-        emb_matrix = embeddings
-        if emb_matrix.shape[0] != len(df):
-            msg = f"Embedding rows ({emb_matrix.shape[0]}) != DF rows ({len(df)})"
-            if ALLOW_PADDING and emb_matrix.shape[0] < len(df):
-                print("[WARN] " + msg + " -> padding embeddings with zeros (ALLOW_PADDING=True).")
-                missing = len(df) - emb_matrix.shape[0]
-                pad = np.zeros((missing, emb_matrix.shape[1]), dtype=emb_matrix.dtype)
-                emb_matrix = np.vstack([emb_matrix, pad])
-            else:
-                raise ValueError(msg + ". Regenerate embeddings aligned to dataframe or set ALLOW_PADDING=True (not recommended).")
-    else:
-        raise ValueError("Unknown embeddings type: {}".format(type(embeddings)))
+    # 1) embeddings in df order (no copy when the artifact is already aligned float32)
+    ids, vectors, header = embeddings
+    emb_matrix, missing = align_vectors(ids, vectors, df['movie_id'].to_numpy())
+    emb_matrix = dequantize(emb_matrix, header)
+    if missing.any():
+        msg = f"{int(missing.sum())} of {len(df)} movies have no embedding"
+        if not ALLOW_PADDING:
+            raise ValueError(msg + ". Regenerate embeddings (python scripts/vectorize_cluster.py) or set ALLOW_PADDING=True (not recommended).")
+        print("[WARN] " + msg + " -> using zero vectors (ALLOW_PADDING=True).")
+        emb_matrix[missing] = 0
 
     print(f"[INFO] Using embeddings matrix with shape = {emb_matrix.shape}")
 
-    if mode == 'emb_only':
-        return emb_matrix
-
-    # Build TF-IDF if required
-    tfidf = TfidfVectorizer(max_features=tfidf_max_features, stop_words="english")
-    tfidf_vec = tfidf.fit_transform(df["clean_text"].fillna("")).toarray()
-    print(f"[INFO] TF-IDF raw shape = {tfidf_vec.shape}")
-
-    numeric_vec = df[["desc_length", "num_keywords", "sentiment_score"]].values if {'desc_length','num_keywords','sentiment_score'}.issubset(df.columns) else np.zeros((len(df), 0))
-
-    if mode == 'emb+tfidf_pca':
-        print(f"[INFO] Reducing TF-IDF from {tfidf_vec.shape[1]} -> {tfidf_pca_dim} using PCA")
-        pca_tfidf = PCA(n_components=tfidf_pca_dim, random_state=42)
-        tfidf_reduced = pca_tfidf.fit_transform(tfidf_vec)
-        hybrid_vec = np.hstack([emb_matrix, tfidf_reduced * tfidf_weight, numeric_vec])
-        print(f"[INFO] Hybrid shape = {hybrid_vec.shape} (emb + tfidf_pca + numeric)")
-        return hybrid_vec
-
-    if mode == 'full':
-        hybrid_vec = np.hstack([emb_matrix, tfidf_vec * tfidf_weight, numeric_vec])
-        print(f"[INFO] Hybrid shape = {hybrid_vec.shape} (emb + full tfidf + numeric)")
-        return hybrid_vec
+    # 2) TF-IDF / PCA / numeric columns per mode (fitted transforms are kept in transforms for the cluster model)
+    return hybrid_features(emb_matrix, df, mode, transforms, tfidf_max_features=tfidf_max_features,
+                           tfidf_weight=tfidf_weight, tfidf_pca_dim=tfidf_pca_dim)
 
-    raise ValueError("Unknown feature mode: " + str(mode))
+def stored_embeddings(df, embeddings, mode='emb_only', backend=KMEANS_BACKEND):
+    """
+    (vectors, header) of the stored artifact when it can be clustered as is, else None:
+    emb_only features, the minibatch backend and artifact rows already in df order
+    """
+    if mode != 'emb_only' or backend != 'minibatch':
+        return None
+    ids, vectors, header = embeddings
+    if len(ids) != len(df) or not np.array_equal(ids, df['movie_id'].to_numpy()):
+        print("[INFO] Embedding rows are not in cleaned-data order -> building a float32 feature matrix")
+        return None
+    print(f"[INFO] Streaming the {header['dtype']} embedding artifact (shape = {vectors.shape}) to KMeans")
+    return vectors, header
 
 # ----------------------------
 # Numeric Feature Engineering
 # ----------------------------
 def extract_basic_features(df):
-    print("[INFO] Extracting basic numeric features...")
+    print("[INFO] Loading basic numeric features...")
     df["clean_text"] = df["clean_text"].fillna("")
-    df["desc_length"] = df["clean_text"].str.len()
-    df["num_keywords"] = df["clean_text"].str.split().apply(lambda x: len(x) if isinstance(x, list) else 0)
-    df["sentiment_score"] = df["clean_text"].apply(lambda x: TextBlob(x).sentiment.polarity if x else 0.0)
-    return df
+    # saved by vectorize_cluster.py next to the embeddings; only missing movies are computed
+    return load_features(df, FEATURES_PATH)
 
 # ----------------------------
 # 1) Load Data & Embedding
 # ----------------------------
-def load_embeddings(prefer_npy=True):
+def load_embeddings(path=EMBEDDING_PATH):
     """
-    Try to load .npy first (prefer_npy=True), otherwise .pkl.
-    Returns numpy array or dict/list depending on file contents.
+    Memory-map the vector artifact written by vectorize_cluster.py.
+    Returns (movie_ids, vectors, header); vectors is a read-only memmap (no copy)
+    of the stored dtype (float32, float16 or int8; see vector_store.dequantize).
     """
-    # try npy
-    if prefer_npy and os.path.exists(EMBEDDING_NPY_PATH):
-        print(f"[INFO] Loading embeddings from npy: {EMBEDDING_NPY_PATH}")
-        emb = np.load(EMBEDDING_NPY_PATH, allow_pickle=False)
-        print(f"[INFO] Embeddings loaded (npy), shape = {emb.shape}")
-        return emb
-
-    # try pkl
-    if os.path.exists(EMBEDDING_PKL_PATH):
-        print(f"[INFO] Loading embeddings from pkl: {EMBEDDING_PKL_PATH}")
-        with open(EMBEDDING_PKL_PATH, "rb") as f:
-            emb = pickle.load(f)
-        if isinstance(emb, np.ndarray):
-            print(f"[INFO] Embeddings loaded (pkl->ndarray), shape = {emb.shape}")
-        elif isinstance(emb, dict):
-            sample = next(iter(emb.items()))
-            print(f"[INFO] Embeddings loaded as dict, sample key = {sample[0]}, dim = {len(sample[1])}")
-        else:
-            try:
-                arr = np.vstack(emb)
-                print(f"[INFO] Embeddings loaded as list/tuple, converted to array shape = {arr.shape}")
-                emb = arr
-            except Exception:
-                print("[WARN] Embeddings loaded from pkl but type is unexpected:", type(emb))
-        return emb
-
-    raise FileNotFoundError("No embeddings file found. Please generate embeddings and save to .npy or .pkl paths.")
+    print(f"[INFO] Loading embeddings from: {path}.bin")
+    ids, vectors, header = read_vectors(path)
+    print(f"[INFO] Embeddings loaded, shape = {vectors.shape}, dtype = {header['dtype']}, model = {header['model']}")
+    return ids, vectors, header
 
 def load_data(path):
     print(f"[INFO] Loading cleaned data from: {path}")
-    df = pd.read_csv(path)
+    df = read_cleaned(path, columns=INPUT_COLUMNS,
+                      csv_path=os.path.join(BASE_DIR, "../../data/cleaned/cleaned_movies.csv"))
     if "clean_text" not in df.columns:
         raise ValueError("ERROR: ต้องมี column clean_text")
     print(f"[INFO] Data loaded, rows = {len(df)}")
@@ -186,26 +168,31 @@ def load_data(path):
 # ----------------------------
 # 2) Find K using Elbow method (inertia) with heuristic
 # ----------------------------
-def find_k_elbow(vectors, k_range=range(5,101), rel_improve_threshold=0.03):
+def find_k_elbow(vectors, k_range=range(5,101), rel_improve_threshold=0.03, sweep=None, header=None):
     """
     Compute inertia for KMeans over k_range, then choose elbow where relative improvement < threshold.
     Implementation detail:
       - rel_improv[i] = (inertia[i-1] - inertia[i]) / inertia[i-1]
       - find first i>=1 where rel_improv[i] < threshold -> choose k = ks[i]
+      - fits come from sweep (KSweep): all k in parallel, each fitted once
+      - above SILHOUETTE_EXACT_MAX_ROWS rows the silhouette fallback scores a stratified sample
+      - header (from read_vectors): vectors is the stored artifact, fitted and scored block by block
     Returns chosen_k, ks, inertias, reason
     """
+    if sweep is None:
+        sweep = KSweep(vectors, random_state=42, n_init=10, header=header)
     ks = list(k_range)
     inertias = []
     print("[INFO] Computing inertia for K in:", ks)
+    sweep.fit([k for k in ks if k < len(vectors)])
     for k in ks:
         if k >= len(vectors):
             print(f"[WARN] k={k} >= n_samples ({len(vectors)}), skipping")
             inertias.append(np.nan)
             continue
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        kmeans.fit(vectors)
-        inertias.append(kmeans.inertia_)
-        print(f"  k={k}, inertia={kmeans.inertia_:.2f}")
+        inertia = sweep.inertia(k)
+        inertias.append(inertia)
+        print(f"  k={k}, inertia={inertia:.2f}")
 
     inertias = np.array(inertias, dtype=float)
     # compute relative improvements
@@ -228,16 +215,23 @@ def find_k_elbow(vectors, k_range=range(5,101), rel_improve_threshold=0.03):
 
     if chosen_k is None:
         # fallback to silhouette best within ks (excluding nan and k>=n_samples)
+        exact_vec = None  # float32 rows for silhouette_score (at most SILHOUETTE_EXACT_MAX_ROWS of them)
         best_k = None
         best_score = -1
         for k, inertia_val in zip(ks, inertias):
             if np.isnan(inertia_val) or k >= len(vectors):
                 continue
             try:
-                kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-                labels = kmeans.fit_predict(vectors)
-                score = silhouette_score(vectors, labels)
-                print(f"  silhouette k={k}: score={score:.4f}")
+                labels = sweep.labels(k)  # cached fit, no refit
+                if len(vectors) <= SILHOUETTE_EXACT_MAX_ROWS:
+                    if exact_vec is None:
+                        exact_vec = vectors if header is None else dequantize(vectors, header)
+                    score = silhouette_score(exact_vec, labels)
+                    print(f"  silhouette k={k}: score={score:.4f}")
+                else:
+                    scores = quality_report(vectors, labels, sample_size=SILHOUETTE_SAMPLE_ROWS, header=header)
+                    score = scores['silhouette']['score']
+                    print(f"  k={k}: " + ", ".join(format_score(name, result) for name, result in scores.items()))
                 if score > best_score:
                     best_score = score
                     best_k = k
@@ -256,11 +250,14 @@ def find_k_elbow(vectors, k_range=range(5,101), rel_improve_threshold=0.03):
 # ----------------------------
 # 3) Cluster
 # ----------------------------
-def perform_kmeans(vectors, k):
-    print(f"[INFO] Clustering using KMeans with K={k}")
-    km = KMeans(n_clusters=k, random_state=42, n_init=10)
-    labels = km.fit_predict(vectors)
-    return labels, km
+def perform_kmeans(vectors, k, sweep=None, backend=KMEANS_BACKEND, header=None):
+    print(f"[INFO] Clustering using KMeans ({backend}) with K={k}")
+    if sweep is not None:
+        # the K search already fitted this k (same seed, n_init and backend)
+        km = sweep.model(k)
+        return km.labels_, km
+    km = fit_kmeans(vectors, k, backend, random_state=42, n_init=10, header=header)
+    return km.labels_, km
 
 def perform_agglomerative(vectors, k):
     print(f"[INFO] Clustering using Agglomerative with K={k}")
@@ -354,22 +351,32 @@ def visualize_clusters(hybrid_vec, labels, df, output_dir=OUTPUT_DIR):
 if __name__ == "__main__":
     print("=== Phase 4: Clustering and Micro-Genre Naming (Fixed) ===")
 
-    embeddings = load_embeddings(prefer_npy=True)
+    embeddings = load_embeddings()
     df = load_data(INPUT_DATA_PATH)
     df = extract_basic_features(df)
 
-    # Build features according to mode
-    print("[INFO] Building hybrid feature vectors...")
-    hybrid_vec = build_hybrid_features(df, embeddings,
-                                       mode=FEATURE_MODE,
-                                       tfidf_max_features=TFIDF_MAX_FEATURES,
-                                       tfidf_weight=TFIDF_WEIGHT,
-                                       tfidf_pca_dim=TFIDF_PCA_DIM)
-    print(f"[INFO] Hybrid feature vector shape = {hybrid_vec.shape}")
+    # Build features according to mode (emb_only + minibatch clusters the stored artifact itself)
+    transforms = {}
+    stored = stored_embeddings(df, embeddings, mode=FEATURE_MODE, backend=KMEANS_BACKEND)
+    if stored is not None:
+        cluster_vec, cluster_header = stored
+    else:
+        print("[INFO] Building hybrid feature vectors...")
+        cluster_vec = build_hybrid_features(df, embeddings,
+                                            mode=FEATURE_MODE,
+                                            tfidf_max_features=TFIDF_MAX_FEATURES,
+                                            tfidf_weight=TFIDF_WEIGHT,
+                                            tfidf_pca_dim=TFIDF_PCA_DIM,
+                                            transforms=transforms)
+        cluster_header = None
+        print(f"[INFO] Hybrid feature vector shape = {cluster_vec.shape}")
 
     # Determine K using elbow heuristic
     print("[INFO] Searching for optimal K using Elbow heuristic (and fallback to silhouette)...")
-    chosen_k, ks, inertias, reason = find_k_elbow(hybrid_vec, k_range=N_CLUSTERS_RANGE, rel_improve_threshold=0.03)
+    sweep = KSweep(cluster_vec, random_state=42, n_init=10, n_jobs=SWEEP_WORKERS, warm_start=SWEEP_WARM_START,
+                   backend=KMEANS_BACKEND, header=cluster_header)
+    chosen_k, ks, inertias, reason = find_k_elbow(cluster_vec, k_range=N_CLUSTERS_RANGE, rel_improve_threshold=0.03,
+                                                  sweep=sweep, header=cluster_header)
 
     # Force k if requested
     if FORCE_K is not None:
@@ -383,7 +390,26 @@ if __name__ == "__main__":
 
     # Try KMeans first
     tested = ["K-Means", "HDBSCAN" if HAS_HDBSCAN else "HDBSCAN(not_installed)", "Agglomerative"]
-    labels_km, km_model = perform_kmeans(hybrid_vec, chosen_k)
+    labels_km, km_model = perform_kmeans(cluster_vec, chosen_k, sweep=sweep, header=cluster_header)
+
+    # Persist the model; clusters keep the ids of the nearest previous clusters so labels stay put
+    cluster_model = ClusterModel.from_fit(cluster_vec, labels_km, km_model.cluster_centers_, meta={
+        'feature_mode': FEATURE_MODE, 'tfidf_max_features': TFIDF_MAX_FEATURES, 'tfidf_weight': TFIDF_WEIGHT,
+        'tfidf_pca_dim': TFIDF_PCA_DIM, 'embedding_model': embeddings[2]['model'], 'columns': INPUT_COLUMNS,
+        'backend': KMEANS_BACKEND, 'chosen_k': int(chosen_k), 'movies': int(len(df))}, transforms=transforms,
+        header=cluster_header)
+    cluster_model.match_ids(load_cluster_model(CLUSTER_MODEL_PATH))
+    labels_km = cluster_model.cluster_ids[labels_km]
+
+    # Diagnostics need dense float32 rows: the whole matrix, or a sample of a streamed artifact
+    if cluster_header is None:
+        diag_rows = np.arange(len(df))
+        hybrid_vec = cluster_vec
+    else:
+        diag_rows = np.sort(np.random.default_rng(42).choice(len(df), min(len(df), DIAGNOSTIC_SAMPLE_ROWS),
+                                                             replace=False))
+        hybrid_vec = dequantize(cluster_vec[diag_rows], cluster_header)
+        print(f"[INFO] Diagnostics on a sample of {len(diag_rows)} of {len(df)} movies")
 
     # Optionally try other algorithms for diagnostics (do not override chosen result)
     labels_agg, agg_model = perform_agglomerative(hybrid_vec, chosen_k)
@@ -395,7 +421,7 @@ if __name__ == "__main__":
             print(f"[WARN] HDBSCAN failed: {e}")
 
     # Visualization and outputs based on KMeans labels
-    visualize_clusters(hybrid_vec, labels_km, df, output_dir=OUTPUT_DIR)
+    visualize_clusters(hybrid_vec, labels_km[diag_rows], df.iloc[diag_rows], output_dir=OUTPUT_DIR)
 
     print("\n=== Cluster Distribution (KMeans) ===")
     print(pd.Series(labels_km).value_counts())
@@ -403,6 +429,9 @@ if __name__ == "__main__":
     df["cluster"] = labels_km
     cluster_names = extract_cluster_keywords(df, labels_km)
     save_clusters(df, cluster_names, OUTPUT_CLUSTER_PATH)
+    cluster_model.labels = {int(c): {"micro_genre_name": info["micro_genre"]} for c, info in cluster_names.items()}
+    cluster_model.save(CLUSTER_MODEL_PATH)
+    print(f"[INFO] Cluster model saved to {CLUSTER_MODEL_PATH}.json (assign new movies: assign_new_movies.py)")
 
     # Print summary in requested format
     pretty_print_choice(tested=tested, chosen_name="K-Means", chosen_k=chosen_k, reason=reason)
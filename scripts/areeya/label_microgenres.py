@@ -1,13 +1,19 @@
 import os
+import sys
 import pandas as pd
 from keybert import KeyBERT
 
+# cluster_model lives in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cluster_model import load_cluster_model  # noqa: E402
+
 # ----------------------------
 # CONFIG
 # ----------------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_CLUSTER_PATH = os.path.join(BASE_DIR, "../../data/processed/movie_clusters.csv")
 OUTPUT_KEYBERT_PATH = os.path.join(BASE_DIR, "../../data/processed/movie_clusters_keybert.csv")
+CLUSTER_MODEL_PATH = os.path.join(BASE_DIR, "../../data/processed/cluster_model")
 
 TOP_KEYWORDS_PER_CLUSTER = 10  # จะเอา top 10 TF-IDF keywords ต่อ cluster
 TOP_KEYWORDS_FOR_LABEL = 3     # จะเอา 1-3 keywords เป็น micro-genre label
@@ -58,3 +64,13 @@ df['sample_movies'] = df.groupby('cluster')['title'].transform(lambda x: ", ".jo
 # ----------------------------
 df.to_csv(OUTPUT_KEYBERT_PATH, index=False)
 print(f"[INFO] Saved KeyBERT-enhanced clusters to {OUTPUT_KEYBERT_PATH}")
+
+# ----------------------------
+# 7) Keep the labels in the cluster model (assign_new_movies.py labels new movies with them)
+# ----------------------------
+cluster_model = load_cluster_model(CLUSTER_MODEL_PATH)
+if cluster_model is not None:
+    for c, label in cluster_labels.items():
+        cluster_model.labels.setdefault(int(c), {})['micro_genre_keybert'] = label
+    cluster_model.save(CLUSTER_MODEL_PATH, arrays=False)
+    print(f"[INFO] KeyBERT labels added to {CLUSTER_MODEL_PATH}.json")
@@ -0,0 +1,126 @@
+"""
+Basic per-movie text features shared by vectorize_cluster.py and clustering
+
+    desc_length       characters of clean_text
+    num_keywords      whitespace-separated tokens of clean_text (len(text.split()))
+    sentiment_score   TextBlob polarity of clean_text
+
+Lengths and token counts are computed on the Arrow buffers of the whole
+column; sentiment is scored in a process pool. vectorize_cluster.py saves
+the result next to the embeddings (data/processed/movie_features.parquet),
+and later stages join it on movie_id instead of scoring every text again.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from textblob import TextBlob
+
+FEATURES_PATH = Path("data/processed/movie_features.parquet")
+FEATURES = ["desc_length", "num_keywords", "sentiment_score"]
+
+FEATURE_WORKERS = int(os.getenv("FEATURE_WORKERS", os.cpu_count() or 1))
+SENTIMENT_BATCH_ROWS = 256
+# below this many rows the pool start-up costs more than it saves
+PARALLEL_MIN_ROWS = 2000
+# rows per token-count pass (bounds the byte masks)
+TOKEN_CHUNK_ROWS = 65536
+
+# str.split() whitespace: ASCII bytes 9-13, 28-32 (space is 32) and these code points
+_UNICODE_SPACE = r"[\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}]"
+
+
+def _token_counts_chunk(array):
+    offsets = np.frombuffer(array.buffers()[1], dtype=np.int64)[array.offset:array.offset + len(array) + 1]
+    data = array.buffers()[2]
+    data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(0, dtype=np.uint8)
+    space = (data == 32) | ((data >= 9) & (data <= 13)) | ((data >= 28) & (data <= 31))
+
+    # a token starts at a non-space byte that follows a space or opens its text
+    starts = ~space
+    starts[1:] &= space[:-1]
+    firsts = offsets[:-1][np.diff(offsets) > 0]
+    starts[firsts] = ~space[firsts]
+    counts = np.diff(np.searchsorted(np.flatnonzero(starts), offsets))
+
+    # rare rows with non-ASCII whitespace: exact Python split
+    for row in np.flatnonzero(pc.match_substring_regex(array, _UNICODE_SPACE).to_numpy(zero_copy_only=False)):
+        counts[row] = len(array[row].as_py().split())
+    return counts
+
+
+def token_counts(texts):
+    """len(text.split()) of every text (0 for missing), without a per-row Python loop"""
+    array = pc.fill_null(pa.array(texts, type=pa.large_string(), from_pandas=True), "")
+    counts = np.zeros(len(array), dtype=np.int64)
+    for start in range(0, len(array), TOKEN_CHUNK_ROWS):
+        chunk = array.slice(start, TOKEN_CHUNK_ROWS)
+        counts[start:start + len(chunk)] = _token_counts_chunk(chunk)
+    return counts
+
+
+def _polarity_batch(texts):
+    """Process pool work unit: TextBlob polarity of one batch"""
+    return [TextBlob(text).sentiment.polarity if text else 0.0 for text in texts]
+
+
+def sentiment_scores(texts, workers=FEATURE_WORKERS):
+    """TextBlob polarity of every text, in a process pool for large inputs"""
+    texts = ["" if pd.isna(text) else str(text) for text in texts]
+    if workers <= 1 or len(texts) < PARALLEL_MIN_ROWS:
+        return np.asarray(_polarity_batch(texts), dtype=float)
+    batches = [texts[i:i + SENTIMENT_BATCH_ROWS] for i in range(0, len(texts), SENTIMENT_BATCH_ROWS)]
+    scores = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in pool.map(_polarity_batch, batches):
+            scores.extend(batch)
+    return np.asarray(scores, dtype=float)
+
+
+def extract_basic_features(df, workers=FEATURE_WORKERS):
+    """Add FEATURES columns computed from df['clean_text']"""
+    texts = df["clean_text"]
+    df["desc_length"] = pc.utf8_length(pc.fill_null(pa.array(texts, type=pa.large_string(), from_pandas=True),
+                                                    "")).to_numpy()
+    df["num_keywords"] = token_counts(texts)
+    df["sentiment_score"] = sentiment_scores(texts, workers)
+    return df
+
+
+def save_features(df, path=FEATURES_PATH):
+    """Write movie_id + FEATURES (Parquet)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df[["movie_id"] + FEATURES], preserve_index=False)
+    tmp = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+def load_features(df, path=FEATURES_PATH, workers=FEATURE_WORKERS):
+    """
+    Add FEATURES columns to df from the saved features, joined on movie_id
+
+    Movies missing from the file (or no file at all) are computed here.
+    """
+    path = Path(path)
+    saved = pq.read_table(path, columns=["movie_id"] + FEATURES).to_pandas() if path.exists() else \
+        pd.DataFrame(columns=["movie_id"] + FEATURES)
+    joined = df[["movie_id"]].merge(saved, on="movie_id", how="left", validate="many_to_one")
+    missing = joined["desc_length"].isna().to_numpy()
+    if missing.any():
+        print(f"[INFO] Computing basic features for {int(missing.sum())} movies not in {path}")
+        fresh = extract_basic_features(df.loc[missing, ["clean_text"]].copy(), workers)
+        for col in FEATURES:
+            joined.loc[missing, col] = fresh[col].to_numpy()
+    for col in FEATURES:
+        df[col] = joined[col].to_numpy()
+    df["desc_length"] = df["desc_length"].astype(np.int64)
+    df["num_keywords"] = df["num_keywords"].astype(np.int64)
+    df["sentiment_score"] = df["sentiment_score"].astype(float)
+    return df
@@ -0,0 +1,93 @@
+"""
+Benchmark DataCleaner text cleaning with 1..N worker processes.
+
+Cleans a synthetic, review-heavy clean_text column with the serial path
+and with the process pool at increasing worker counts, checks that every
+parallel result is identical to the serial one, and prints rows/second.
+Before that, compares tokens/second of the 'nltk' and 'fast' stopword
+modes and how many rows they clean identically.
+
+    python scripts/benchmark_cleaning.py [num_rows]
+"""
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+from clean_data import DataCleaner
+
+NUM_ROWS = 5000
+WORDS = ("the hero journey love war space family <b>epic</b> it's a mind-bending "
+         "thriller &amp; drama with great acting, but the ending... was it worth it? "
+         "<i>5/10</i> don't miss <br/> this one!").split()
+
+
+def make_texts(num_rows, seed=0):
+    """Overview + genres + keywords + 0-10 reviews per row, like create_clean_text input"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(num_rows):
+        n_words = 40 + rng.randrange(10) * rng.randrange(60)
+        texts.append(" ".join(rng.choice(WORDS) for _ in range(n_words)))
+    return pd.Series(texts)
+
+
+def run(texts, workers):
+    cleaner = DataCleaner(workers=workers)
+    started = time.perf_counter()
+    cleaned = cleaner.clean_text_column(texts, remove_stops=True)
+    elapsed = time.perf_counter() - started
+    cleaner.close_pool()
+    return cleaned, elapsed
+
+
+def benchmark_stopwords(texts):
+    """Stopword removal alone, on remove_special_chars output"""
+    prepared = DataCleaner(workers=1).clean_values(texts.tolist())
+    tokens = sum(len(text.split()) for text in prepared)
+
+    results = {}
+    for mode in ("nltk", "fast"):
+        cleaner = DataCleaner(workers=1, stopword_mode=mode)
+        started = time.perf_counter()
+        results[mode] = (cleaner.remove_stopwords_column(prepared), time.perf_counter() - started)
+
+    same = sum(a == b for a, b in zip(results["nltk"][0], results["fast"][0]))
+    print("=" * 80)
+    print(f"STOPWORD REMOVAL ({len(prepared)} rows, {tokens / 1e6:.2f}M tokens)")
+    print("=" * 80)
+    for mode, (_, elapsed) in results.items():
+        print(f"   {mode:<6} {tokens / elapsed:14,.0f} tokens/s  ({results['nltk'][1] / elapsed:.1f}x nltk)")
+    print(f"   parity: {same}/{len(prepared)} rows identical")
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_ROWS
+    texts = make_texts(num_rows)
+    print(f"{num_rows} rows, {texts.str.len().sum() / 1e6:.1f}M characters")
+    benchmark_stopwords(texts)
+
+    serial, serial_time = run(texts, workers=1)
+    results = {1: serial_time}
+
+    cpus = os.cpu_count() or 1
+    counts = sorted({w for w in (2, 4, 8, 16, cpus) if 1 < w <= cpus})
+    for workers in counts:
+        cleaned, elapsed = run(texts, workers)
+        if not cleaned.equals(serial):
+            raise AssertionError(f"{workers} workers: output differs from the serial path")
+        results[workers] = elapsed
+
+    print("=" * 80)
+    print(f"TEXT CLEANING BENCHMARK ({num_rows} rows, {cpus} CPUs)")
+    print("=" * 80)
+    for workers, elapsed in results.items():
+        print(f"   {workers:>3} workers {num_rows / elapsed:10.1f} rows/s  ({serial_time / elapsed:.1f}x serial)")
+    if len(results) == 1:
+        print("   (single CPU: no parallel runs)")
+
+
+if __name__ == "__main__":
+    main()
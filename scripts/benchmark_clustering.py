@@ -0,0 +1,75 @@
+"""
+Benchmark the mini-batch (streaming) KMeans backend against full KMeans.
+
+Writes num_movies synthetic unit-length 384-d vectors around 60 topics as a
+vector artifact, memory-maps it and clusters it with both backends of
+cluster_backends.py:
+
+    - fit time and rows held in memory at once
+    - inertia of each (over every row) and the mini-batch inertia gap
+    - label agreement (adjusted Rand index)
+    - partial_fit: fit on 90% of the rows, update with the last 10% and
+      compare that inertia with a fresh mini-batch fit on all rows
+
+    python scripts/benchmark_clustering.py [num_movies]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sklearn.metrics import adjusted_rand_score
+
+from benchmark_quantization import make_vectors
+from cluster_backends import StreamingKMeans, fit_kmeans
+from vector_store import BLOCK_ROWS, read_vectors, write_vectors
+
+NUM_MOVIES = 200_000
+NUM_CLUSTERS = 60
+# full KMeans restarts (perform_kmeans uses 10; fewer keeps the benchmark short)
+FULL_N_INIT = 3
+NEW_SHARE = 0.1
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    num_movies = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_MOVIES
+    ids, vectors = make_vectors(num_movies)
+    k = min(NUM_CLUSTERS, num_movies)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "vectors"
+        write_vectors(path, ids, vectors, model="benchmark")
+        del vectors
+        _, stored, header = read_vectors(path)
+
+        full, full_time = timed(lambda: fit_kmeans(stored, k, "full", n_init=FULL_N_INIT))
+        streamed, stream_time = timed(lambda: fit_kmeans(stored, k, "minibatch", header=header))
+
+        split = int(len(stored) * (1 - NEW_SHARE))
+        updated = StreamingKMeans(k).fit(stored[:split], header)
+        _, update_time = timed(lambda: updated.partial_fit(stored[split:]))
+        _, updated_inertia = updated.assign(stored, header)
+        del stored
+
+    print("=" * 80)
+    print(f"CLUSTERING BACKEND BENCHMARK ({num_movies} vectors x {header['dim']} dims, k={k})")
+    print("=" * 80)
+    print(f"   {'backend':<10} {'fit':>8} {'rows in memory':>15} {'inertia':>14} {'gap':>7}")
+    print(f"   {'full':<10} {full_time:7.2f}s {num_movies:15d} {full.inertia_:14.1f} {'':>7}")
+    print(f"   {'minibatch':<10} {stream_time:7.2f}s {min(BLOCK_ROWS, num_movies):15d} {streamed.inertia_:14.1f}"
+          f" {streamed.inertia_ / full.inertia_ - 1:7.2%}")
+    print(f"   Speedup:            {full_time / stream_time:.1f}x")
+    print(f"   Label agreement:    ARI {adjusted_rand_score(full.labels_, streamed.labels_):.4f}"
+          f" ({streamed.n_epochs_} epochs)")
+    print(f"   partial_fit {len(ids) - split} new rows: {update_time:.2f}s, inertia {updated_inertia:.1f}"
+          f" ({updated_inertia / streamed.inertia_ - 1:+.2%} vs mini-batch on all rows)")
+
+
+if __name__ == "__main__":
+    main()
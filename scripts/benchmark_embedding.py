@@ -0,0 +1,63 @@
+"""
+Benchmark sentence embedding: EmbeddingEngine against model.encode(texts).
+
+Embeds the first num_texts clean_text values of the cleaned dataset three
+ways and prints texts/second and tokens/second (tokens the model actually
+attends to, special tokens included, padding excluded):
+
+    1. model.encode(texts)            the previous vectorize_text call
+    2. EmbeddingEngine(chunk=False)   same truncation, token-length batches;
+                                      checked to give the same vectors
+    3. EmbeddingEngine(chunk=True)    long texts embedded window by window
+
+    python scripts/benchmark_embedding.py [num_texts]
+"""
+import sys
+import time
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from cleaned_store import read_cleaned
+from embedding_engine import EmbeddingEngine
+from vectorize_cluster import EMBED_MODEL, INPUT_PATH
+
+NUM_TEXTS = 2000
+
+
+def main():
+    num_texts = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_TEXTS
+    texts = read_cleaned(INPUT_PATH, columns=["clean_text"])["clean_text"].fillna("").head(num_texts).tolist()
+    model = SentenceTransformer(EMBED_MODEL)
+
+    truncated = EmbeddingEngine(model, chunk=False)
+    model.encode(texts[:64])  # warm up
+
+    started = time.perf_counter()
+    baseline = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    baseline_time = time.perf_counter() - started
+
+    vectors = truncated.encode(texts)
+    # same tokens as model.encode: every text truncated at max_seq_length
+    baseline_tokens = truncated.stats['tokens']
+    cosine = np.sum(baseline * vectors, axis=1) / (
+        np.linalg.norm(baseline, axis=1) * np.linalg.norm(vectors, axis=1) + 1e-12)
+
+    chunked = EmbeddingEngine(model, chunk=True)
+    chunked.encode(texts)
+
+    print("=" * 80)
+    print(f"EMBEDDING BENCHMARK ({len(texts)} texts, {EMBED_MODEL})")
+    print("=" * 80)
+    print(f"   model.encode          {baseline_time:7.2f}s  {len(texts) / baseline_time:8.1f} texts/s"
+          f"  {baseline_tokens / baseline_time:9.0f} tokens/s")
+    for name, engine in (("engine (truncate)", truncated), ("engine (chunk)", chunked)):
+        s = engine.stats
+        print(f"   {name:<21} {s['seconds']:7.2f}s  {s['texts_per_sec']:8.1f} texts/s"
+              f"  {s['tokens_per_sec']:9.0f} tokens/s  {baseline_time / s['seconds']:.1f}x")
+        print(f"      {engine.summary()}")
+    print(f"   truncate vs model.encode: min cosine {cosine.min():.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Benchmark TMDB fetchers against a local fake TMDB server.
+
+Compares movies/second of the serial loop, the threaded TMDBFetcher and
+AsyncTMDBFetcher, then of an incremental refresh of the threaded crawl
+(every tenth movie is reported changed and has a new overview). The fake
+server adds a fixed latency to every response so round trips dominate,
+like the real API.
+
+    python scripts/benchmark_fetch.py
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+os.environ.setdefault("TMDB_API_KEY", "benchmark")
+
+from fetch_data import TMDBFetcher  # noqa: E402
+from fetch_data_async import AsyncTMDBFetcher  # noqa: E402
+from raw_store import RawDelta  # noqa: E402
+
+NUM_MOVIES = 400
+LATENCY = 0.05  # seconds added to every response
+REVIEWS_PER_MOVIE = 3  # per page
+
+
+def review_pages(movie_id):
+    """Most movies have one review page, every fifth has several"""
+    return 1 if movie_id % 5 else 4
+
+
+class FakeTMDBHandler(BaseHTTPRequestHandler):
+    """Serves movie/changes, movie/popular, movie/{id} and movie/{id}/reviews"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/movie/changes":
+            # every tenth movie changed (its overview differs once the server is revised)
+            page = int(query.get("page", ["1"])[0])
+            body = {"page": page, "total_pages": 1, "results": [{"id": i} for i in range(10, NUM_MOVIES + 1, 10)]}
+        elif url.path == "/movie/popular":
+            page = int(query.get("page", ["1"])[0])
+            start = (page - 1) * 20 + 1
+            body = {"page": page, "results": [{"id": i} for i in range(start, start + 20)]}
+        elif re.fullmatch(r"/movie/\d+/reviews", url.path):
+            movie_id = int(url.path.split("/")[2])
+            page = int(query.get("page", ["1"])[0])
+            body = {
+                "id": movie_id,
+                "page": page,
+                "total_pages": review_pages(movie_id),
+                "results": [
+                    {"id": f"{movie_id}-{page}-{n}", "author": "bench", "content": "Great movie " * 20,
+                     "author_details": {"rating": 7.0}}
+                    for n in range(REVIEWS_PER_MOVIE)
+                ],
+            }
+        elif re.fullmatch(r"/movie/\d+", url.path):
+            movie_id = int(url.path.split("/")[2])
+            body = {
+                "id": movie_id,
+                "title": f"Movie {movie_id}",
+                "original_title": f"Movie {movie_id}",
+                "overview": "A benchmark movie " * 10 + ("revised" if self.server.revised and movie_id % 10 == 0
+                                                         else ""),
+                "tagline": "",
+                "release_date": f"{1950 + movie_id % 70}-01-01",
+                "runtime": 90 + movie_id % 60,
+                "budget": 1000000 * (movie_id % 7),
+                "revenue": 0,
+                "vote_average": round(5 + (movie_id % 50) / 10, 1),
+                "vote_count": movie_id * 3,
+                "popularity": 1000.0 / movie_id,
+                "status": "Released",
+                "original_language": "en",
+                "genres": [{"id": 18, "name": "Drama"}],
+                "keywords": {"keywords": [{"id": 1, "name": "benchmark"}]},
+                "credits": {"cast": [{"id": 1, "name": "Actor", "character": "Lead", "order": 0}],
+                            "crew": [{"id": 2, "name": "Director", "job": "Director"}]},
+            }
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_server(latency=LATENCY):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTMDBHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.revised = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def run(name, fetcher, **kwargs):
+    started = time.perf_counter()
+    fetcher.fetch_complete_dataset(num_movies=NUM_MOVIES, **kwargs)
+    elapsed = time.perf_counter() - started
+    fetched = sum(1 for _ in open(fetcher.movies_path, encoding="utf-8"))
+    print(f"\n>> {name}: {fetched} movies in {elapsed:.2f}s = {fetched / elapsed:.1f} movies/s\n")
+    return fetched / elapsed
+
+
+def run_refresh(name, fetcher, **kwargs):
+    started = time.perf_counter()
+    updated = fetcher.refresh_dataset(**kwargs)
+    elapsed = time.perf_counter() - started
+    delta = RawDelta(fetcher.delta_dir)
+    assert sorted(delta.movies) == sorted(updated), "refresh delta does not hold the updated movies"
+    print(f"\n>> {name}: {len(updated)} changed movies in {elapsed:.2f}s = {len(updated) / elapsed:.1f} movies/s\n")
+    return len(updated) / elapsed
+
+
+def main():
+    server, base_url = start_fake_server()
+    results = {}
+    # rate limit far above what the server can serve, so only latency matters
+    rate = 10_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        def paths(name):
+            return {"movies_path": tmp / f"{name}_movies.jsonl", "reviews_path": tmp / f"{name}_reviews.jsonl",
+                    "state_path": tmp / f"{name}_state.json"}
+
+        results["serial"] = run("serial", TMDBFetcher("benchmark", base_url, workers=1,
+                                                      requests_per_second=rate, **paths("serial")))
+        threaded = TMDBFetcher("benchmark", base_url, workers=16, requests_per_second=rate,
+                               delta_dir=tmp / "delta", **paths("threaded"))
+        results["threaded"] = run("threaded", threaded)
+        results["async"] = run("async", AsyncTMDBFetcher("benchmark", base_url, max_in_flight=64, pool_size=32,
+                                                         requests_per_second=rate, **paths("async")))
+
+        # incremental refresh of the threaded crawl after upstream edits
+        server.revised = True
+        results["refresh"] = run_refresh("refresh", threaded)
+
+    server.shutdown()
+
+    print("=" * 80)
+    print(f"FETCH BENCHMARK ({NUM_MOVIES} movies, {LATENCY * 1000:.0f} ms latency)")
+    print("=" * 80)
+    for name, rate in results.items():
+        print(f"   {name:<10} {rate:8.1f} movies/s  ({rate / results['serial']:.1f}x serial)")
+
+
+if __name__ == "__main__":
+    main()
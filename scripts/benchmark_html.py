@@ -0,0 +1,117 @@
+"""
+Equivalence check and microbenchmark for fast_text.strip_html.
+
+1. Runs strip_html against the BeautifulSoup reference on hand-written
+   edge cases and on randomly assembled markup; any difference fails.
+2. Times both on a TMDB-like corpus (mostly plain overviews, some
+   entities, some review markup, a few complex documents) and prints
+   the per-row cost of each tier.
+
+    python scripts/benchmark_html.py
+"""
+import random
+import sys
+import time
+
+import fast_text
+from fast_text import bs4_strip_html, strip_html
+
+FUZZ_CASES = 20000
+CORPUS_ROWS = 20000
+
+EDGE_CASES = [
+    "", "   ", "plain overview\nwith  newlines\tand tabs",
+    "Tom & Jerry", "x&", "&;", "&#;", "&#x;", "&1", "a&ampb", "&amp", "&foo;", "&notit;",
+    "&amp;&lt;&gt;&quot;&apos;&nbsp;", "&#39;&#x27;&#65;&#X41;", "&#150;&#129;&#0;&#55296;&#x110000;",
+    "&lt;b&gt;not a tag&lt;/b&gt;", "a&lt;<b>b</b>&amp;c",
+    "<b>bold</b> and <i>italic</i>", "line<br>break<br/>again<BR />", "<p>one</p><p>two</p>",
+    "<p class=x id='y' data-z=\"w\">attrs</p>", "<a href=\"http://x.org/?a=1&b=2\">link</a>",
+    "<b>a</b >c", "</ b>x", "<b", "a <3 b", "a < b > c", "x<y", "1 > 0",
+    "a<!-- comment -->b", "<!DOCTYPE html><p>x</p>", "<![CDATA[x]]>y", "<?php echo 1; ?>z",
+    "<script>var a = '<b>';</script>after", "<style>p {}</style>t", "<SCRIPT>x</SCRIPT>y",
+    "<title>T</title>x", "<textarea><b>q</b></textarea>", "<p title='a>b'>z</p>", "<p title=\"<x>\">z</p>",
+    "<em>café</em> หนังดี", "<unknown-tag>x</unknown-tag>", "<a/b>c",
+]
+
+FRAGMENTS = [
+    "word", "movie", " ", "  ", "\n", "é", "'", '"', ">", "<", "&", "=",
+    "<b>", "</b>", "<br/>", "<br>", "<p class='x'>", "<A HREF=\"u\">", "</a >", "<i", "</",
+    "&amp;", "&lt;", "&gt;", "&nbsp;", "&#39;", "&#x2014;", "&#150;", "&foo;", "&amp",
+    "<!-- c -->", "<script>x</script>", "<style>y</style>", "a<3",
+]
+
+
+def check_equivalence(fuzz_cases=FUZZ_CASES, seed=0):
+    rng = random.Random(seed)
+    cases = list(EDGE_CASES)
+    for _ in range(fuzz_cases):
+        cases.append("".join(rng.choice(FRAGMENTS) for _ in range(rng.randrange(1, 25))))
+
+    failures = [text for text in cases if strip_html(text) != bs4_strip_html(text)]
+    for text in failures[:20]:
+        print(f"MISMATCH {text!r}: fast={strip_html(text)!r} bs4={bs4_strip_html(text)!r}")
+    print(f"Equivalence: {len(cases) - len(failures)}/{len(cases)} cases identical")
+    return not failures
+
+
+def make_corpus(rows=CORPUS_ROWS, seed=0):
+    """(tier, text) pairs in rough TMDB proportions"""
+    rng = random.Random(seed)
+    sentence = "A retired hitman is pulled back into the criminal underworld to find the men who wronged him. "
+    corpus = []
+    for _ in range(rows):
+        base = sentence * rng.randrange(1, 6)
+        roll = rng.random()
+        if roll < 0.80:
+            corpus.append(("plain", base))
+        elif roll < 0.90:
+            corpus.append(("entities", base.replace(" the ", " the &quot;") + " Rated &#39;R&#39; &amp; more."))
+        elif roll < 0.98:
+            corpus.append(("simple tags", f"<p>{base}</p><br/><em>Spoilers</em> &amp; <b>more</b>"))
+        else:
+            corpus.append(("complex", f"<!-- review --><p>{base}</p><script>track()</script>"))
+    return corpus
+
+
+def time_per_row(func, texts):
+    started = time.perf_counter()
+    for text in texts:
+        func(text)
+    return (time.perf_counter() - started) / max(1, len(texts)) * 1e6
+
+
+def main():
+    if not check_equivalence():
+        sys.exit(1)
+
+    corpus = make_corpus()
+    texts = [text for _, text in corpus]
+
+    fallbacks = 0
+    reference = fast_text.bs4_strip_html
+
+    def counting(text):
+        nonlocal fallbacks
+        fallbacks += 1
+        return reference(text)
+
+    fast_text.bs4_strip_html = counting
+    for text in texts:
+        strip_html(text)
+    fast_text.bs4_strip_html = reference
+
+    print("=" * 80)
+    print(f"HTML STRIPPING MICROBENCHMARK ({len(texts)} rows, {fallbacks} fell back to bs4)")
+    print("=" * 80)
+    for tier in ("plain", "entities", "simple tags", "complex"):
+        rows = [text for name, text in corpus if name == tier]
+        slow = time_per_row(bs4_strip_html, rows)
+        fast = time_per_row(strip_html, rows)
+        print(f"   {tier:<12} {len(rows):6d} rows  bs4 {slow:8.1f} us/row  fast {fast:8.1f} us/row  ({slow / fast:5.1f}x)")
+    slow = time_per_row(bs4_strip_html, texts)
+    fast = time_per_row(strip_html, texts)
+    print(f"   {'all':<12} {len(texts):6d} rows  bs4 {slow:8.1f} us/row  fast {fast:8.1f} us/row  ({slow / fast:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark quantized vector storage (float16 / int8) against float32.
+
+Takes the movie vectors from data/processed/movie_embeddings.* (or, when
+that artifact does not exist, num_movies synthetic unit-length 384-d
+vectors around 60 topics), writes them in every storage dtype and reports:
+
+    - bytes on disk / mapped per dtype and the share saved
+    - cluster agreement: nearest of the same float32 KMeans centers,
+      assigned with on-the-fly dequantization, vs the float32 labels
+    - neighbour recall@10 of 200 random queries vs float32 exact kNN
+    - time to assign every row to its nearest center
+
+    python scripts/benchmark_quantization.py [num_movies]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.cluster import KMeans
+
+from vector_store import (DTYPES, VECTORS_PATH, assign_nearest, dequantize, iter_blocks, nearest_neighbors,
+                          read_vectors, write_vectors)
+
+NUM_MOVIES = 200_000
+DIM = 384
+TOPICS = 60
+NUM_CLUSTERS = 60
+NUM_QUERIES = 200
+TOP_K = 10
+# rows KMeans is fitted on (assignment then covers every row)
+FIT_ROWS = 20000
+
+
+def make_vectors(num_movies, seed=0):
+    """Unit-length vectors scattered around random topic directions, like sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(TOPICS, DIM)).astype(np.float32)
+    noise = rng.normal(scale=0.9, size=(num_movies, DIM)).astype(np.float32)
+    vectors = topics[rng.integers(TOPICS, size=num_movies)] + noise
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.arange(1, num_movies + 1), vectors
+
+
+def load_vectors(num_movies):
+    if Path(str(VECTORS_PATH) + ".json").exists():
+        ids, stored, header = read_vectors(VECTORS_PATH)
+        vectors = np.vstack([block for _, block in iter_blocks(stored, header)])
+        print(f"Using {VECTORS_PATH} ({header['model']}, stored as {header['dtype']})")
+        return np.asarray(ids), vectors
+    print(f"{VECTORS_PATH} not found, using {num_movies} synthetic vectors")
+    return make_vectors(num_movies)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    num_movies = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_MOVIES
+    ids, vectors = load_vectors(num_movies)
+    rng = np.random.default_rng(1)
+
+    sample = vectors[rng.choice(len(vectors), min(FIT_ROWS, len(vectors)), replace=False)]
+    centers = KMeans(n_clusters=min(NUM_CLUSTERS, len(sample)), n_init=1, random_state=42).fit(sample).cluster_centers_
+    queries = vectors[rng.choice(len(vectors), min(NUM_QUERIES, len(vectors)), replace=False)]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in DTYPES:
+            path = Path(tmp) / dtype
+            write_vectors(path, ids, vectors, model="benchmark", dtype=dtype)
+            _, stored, header = read_vectors(path)
+            # the matrix plus int8's scale / offset (the id sidecar is the same for all)
+            size = sum(f.stat().st_size for f in (path.with_name(dtype + ".bin"), path.with_name(dtype + ".quant.npy"))
+                       if f.exists())
+            labels, assign_time = timed(lambda: assign_nearest(stored, header, centers))
+            neighbors, _ = nearest_neighbors(queries, stored, header, k=TOP_K)
+            error = np.abs(dequantize(stored[:FIT_ROWS], header) - vectors[:FIT_ROWS]).max()
+            results[dtype] = (size, stored.nbytes, labels, neighbors, assign_time, error)
+            del stored
+
+    base_size, _, base_labels, base_neighbors, _, _ = results["float32"]
+    print("=" * 80)
+    print(f"QUANTIZATION BENCHMARK ({len(vectors)} vectors x {vectors.shape[1]} dims)")
+    print("=" * 80)
+    print(f"   {'dtype':<8} {'disk':>9} {'mapped':>9} {'saved':>6} {'clusters':>9} {'recall@' + str(TOP_K):>10}"
+          f" {'assign':>8} {'max err':>8}")
+    for dtype, (size, mapped, labels, neighbors, assign_time, error) in results.items():
+        agreement = np.mean(labels == base_labels)
+        recall = np.mean([len(np.intersect1d(a, b)) / TOP_K for a, b in zip(neighbors, base_neighbors)])
+        print(f"   {dtype:<8} {size / 1e6:7.1f}MB {mapped / 1e6:7.1f}MB {1 - size / base_size:6.1%}"
+              f" {agreement:9.2%} {recall:10.2%} {assign_time:7.2f}s {error:8.5f}")
+
+
+if __name__ == "__main__":
+    main()
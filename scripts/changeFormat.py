@@ -1,14 +1,12 @@
-import json
+from raw_store import convert_jsonl
 
-input_path = "data/raw/raw_reviews.jsonl"
-output_path = "data/raw/raw_reviews.json"
+# One-time migration of an old JSONL crawl into zstd Parquet parts
+# (fetch_data.py now writes Parquet directly, so new crawls skip this step)
+movies_jsonl = "data/raw/raw_movies.jsonl"
+reviews_jsonl = "data/raw/raw_reviews.jsonl"
+movies_dir = "data/raw/movies"
+reviews_dir = "data/raw/reviews"
 
-data = []
-with open(input_path, "r", encoding="utf-8") as f:
-    for line in f:
-        data.append(json.loads(line))
+n_movies, n_reviews = convert_jsonl(movies_jsonl, reviews_jsonl, movies_dir, reviews_dir)
 
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
-
-print("Done → saved as reviews.json")
\ No newline at end of file
+print(f"Done → {n_movies} movies, {n_reviews} reviews saved as Parquet parts in data/raw/")
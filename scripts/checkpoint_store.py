@@ -0,0 +1,351 @@
+import hashlib
+import json
+import os
+import sys
+import time
+from array import array
+from pathlib import Path
+
+# Buffered appends are flushed (and fsync'ed) every N movies or T seconds
+FLUSH_EVERY = 200
+FLUSH_INTERVAL = 10.0
+
+# Sidecar index: one fixed-size record per committed movie
+#   (movie_id, end offset in movies JSONL, end offset in reviews JSONL)
+INDEX_FIELDS = 3
+INDEX_SUFFIX = ".idx"
+
+
+def _read_index(path, fields=INDEX_FIELDS):
+    """Read the sidecar index as a flat int64 array, ignoring a torn trailing record"""
+    arr = array('q')
+    if not path.exists():
+        return arr
+    with open(path, "rb") as f:
+        data = f.read()
+    record_size = arr.itemsize * fields
+    arr.frombytes(data[:len(data) - len(data) % record_size])
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def _index_bytes(records):
+    arr = array('q', [v for record in records for v in record])
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _fsync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class CheckpointStore:
+    """
+    Buffered, resumable JSONL writer for crawled movies and their reviews
+
+    Resume reads only the compact sidecar index (raw_movies.jsonl.idx)
+    instead of parsing every JSON line. Each flush writes reviews first,
+    then movies, then the index, each followed by fsync, so an indexed
+    movie always has its line and its reviews on disk.
+    """
+
+    def __init__(self, movies_path, reviews_path, flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL):
+        self.movies_path = Path(movies_path)
+        self.reviews_path = Path(reviews_path)
+        self.index_path = self.movies_path.with_name(self.movies_path.name + INDEX_SUFFIX)
+        self.flush_every = max(1, int(flush_every))
+        self.flush_interval = flush_interval
+
+        self.movies_path.parent.mkdir(parents=True, exist_ok=True)
+        self.reviews_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.ids = set()
+        self._pending = []  # (movie_id, movie line, review lines)
+        self._last_flush = time.monotonic()
+        self._recover()
+
+        self._movies_f = open(self.movies_path, "ab")
+        self._reviews_f = open(self.reviews_path, "ab")
+        self._index_f = open(self.index_path, "ab")
+
+    # ----------------------------
+    # Recovery
+    # ----------------------------
+    def _recover(self):
+        movies_size = self.movies_path.stat().st_size if self.movies_path.exists() else 0
+        reviews_size = self._truncate_partial_line(self.reviews_path)
+
+        index = _read_index(self.index_path)
+        n = len(index) // INDEX_FIELDS
+
+        def fits(i):
+            return (index[i * INDEX_FIELDS + 1] <= movies_size
+                    and index[i * INDEX_FIELDS + 2] <= reviews_size)
+
+        # offsets only grow, so binary search the longest prefix that fits both files
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if fits(mid):
+                lo = mid + 1
+            else:
+                hi = mid
+        valid = lo
+        if valid < n or len(index) * index.itemsize != self._file_size(self.index_path):
+            del index[valid * INDEX_FIELDS:]
+            with open(self.index_path, "wb") as f:
+                f.write(_index_bytes(zip(*[iter(index)] * INDEX_FIELDS)))
+                _fsync(f)
+
+        self.ids = set(index[0::INDEX_FIELDS])
+        movies_end = index[-2] if valid else 0
+        reviews_end = index[-1] if valid else 0
+
+        # Lines written after the last index record (crash between the movies
+        # write and the index write, or a JSONL created before the index existed)
+        tail_records = self._scan_tail(movies_end, reviews_size)
+        if tail_records:
+            with open(self.index_path, "ab") as f:
+                f.write(_index_bytes(tail_records))
+                _fsync(f)
+            self.ids.update(record[0] for record in tail_records)
+        elif reviews_size > reviews_end:
+            # reviews of movies that never got committed; they will be re-fetched
+            with open(self.reviews_path, "r+b") as f:
+                f.truncate(reviews_end)
+                _fsync(f)
+
+    @staticmethod
+    def _file_size(path):
+        return path.stat().st_size if path.exists() else 0
+
+    @staticmethod
+    def _truncate_partial_line(path):
+        """Drop a torn final line left by a crash; returns the resulting file size"""
+        if not path.exists():
+            return 0
+        size = path.stat().st_size
+        if size == 0:
+            return 0
+        with open(path, "r+b") as f:
+            pos = size
+            while pos > 0:
+                step = min(65536, pos)
+                f.seek(pos - step)
+                chunk = f.read(step)
+                nl = chunk.rfind(b"\n")
+                if nl >= 0:
+                    end = pos - step + nl + 1
+                    break
+                pos -= step
+            else:
+                end = 0
+            if end != size:
+                f.truncate(end)
+                _fsync(f)
+        return end
+
+    def _scan_tail(self, start, reviews_size):
+        """Parse movie lines after offset `start` and return index records for them"""
+        end = self._truncate_partial_line(self.movies_path)
+        if end <= start:
+            return []
+
+        records = []
+        offset = start
+        with open(self.movies_path, "rb") as f:
+            f.seek(start)
+            for line in f:
+                offset += len(line)
+                try:
+                    movie_id = json.loads(line)["id"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                records.append((movie_id, offset, reviews_size))
+        return records
+
+    # ----------------------------
+    # Writing
+    # ----------------------------
+    def add_movie(self, details, reviews):
+        """Buffer one movie and its reviews; flushes when the batch is full or old enough"""
+        movie_id = details["id"]
+        movie_line = (json.dumps(details, ensure_ascii=False) + "\n").encode("utf-8")
+        review_lines = [(json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8") for r in reviews]
+        self._pending.append((movie_id, movie_line, review_lines))
+        self.ids.add(movie_id)
+
+        if (len(self._pending) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write buffered records: reviews, then movies, then their index records"""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+
+        reviews_end = self._reviews_f.tell()
+        movies_end = self._movies_f.tell()
+        review_chunks, movie_chunks, records = [], [], []
+        for movie_id, movie_line, review_lines in self._pending:
+            review_chunks.extend(review_lines)
+            reviews_end += sum(len(line) for line in review_lines)
+            movie_chunks.append(movie_line)
+            movies_end += len(movie_line)
+            records.append((movie_id, movies_end, reviews_end))
+
+        self._reviews_f.write(b"".join(review_chunks))
+        _fsync(self._reviews_f)
+        self._movies_f.write(b"".join(movie_chunks))
+        _fsync(self._movies_f)
+        self._index_f.write(_index_bytes(records))
+        _fsync(self._index_f)
+
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        for f in (self._movies_f, self._reviews_f, self._index_f):
+            f.close()
+
+    def remove(self):
+        """Delete the store files (used for empty refresh deltas)"""
+        for path in (self.movies_path, self.reviews_path, self.index_path):
+            if path.exists():
+                path.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ----------------------------
+# Refresh state
+# ----------------------------
+# Fields that change on every crawl without the movie itself changing
+VOLATILE_FIELDS = {'popularity'}
+
+# Sidecar log of fetches, one fixed-size record per fetch (the latest per movie wins):
+#   (movie_id, fetched_at epoch seconds, first 16 bytes of the content hash as two int64)
+STATE_FIELDS = 4
+STATE_SUFFIX = ".idx"
+
+
+def _digest_fields(digest):
+    raw = bytes.fromhex(digest)[:16]
+    return (int.from_bytes(raw[:8], "little", signed=True), int.from_bytes(raw[8:], "little", signed=True))
+
+
+def content_hash(details, reviews):
+    """Stable hash of a movie's details (minus volatile fields) and its reviews"""
+    payload = {
+        'details': {k: v for k, v in details.items() if k not in VOLATILE_FIELDS},
+        'reviews': sorted((str(r.get('id', '')), str(r.get('updated_at', ''))) for r in reviews),
+    }
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+class FetchState:
+    """
+    Per-movie last-fetched timestamp and content hash
+
+    Fetches are appended to a sidecar log (fetch_state.json.idx, int64
+    records like the checkpoint index); the JSON file only holds
+    last_refresh. A crawl only appends (record), so it never reads the log.
+    The log is loaded on the first lookup (fetched_at / mark / stale_ids,
+    i.e. in refresh mode) and rewritten without superseded records once
+    they make up more than half of it. A JSON file with the old
+    {"movies": {id: [fetched_at, hash]}} layout is moved into the log.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.log_path = self.path.with_name(self.path.name + STATE_SUFFIX)
+        self.last_refresh = None
+        self._movies = None  # id -> (fetched_at, hash fields), loaded on first lookup
+        self._records = 0  # records in the log when it was loaded
+        self._pending = []
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.last_refresh = data.get("last_refresh")
+            if "movies" in data:
+                for movie_id, (fetched_at, digest) in data["movies"].items():
+                    self.record(int(movie_id), digest, fetched_at)
+                self.save()
+
+    @property
+    def movies(self):
+        if self._movies is None:
+            log = _read_index(self.log_path, STATE_FIELDS)
+            self._records = len(log) // STATE_FIELDS
+            self._movies = {}
+            for i in range(0, self._records * STATE_FIELDS, STATE_FIELDS):
+                self._movies[log[i]] = (log[i + 1], (log[i + 2], log[i + 3]))
+            for movie_id, fetched_at, *digest in self._pending:
+                self._movies[movie_id] = (fetched_at, tuple(digest))
+        return self._movies
+
+    def fetched_at(self, movie_id):
+        """Epoch seconds of the last fetch, 0 if never recorded"""
+        return self.movies.get(movie_id, (0, None))[0]
+
+    def record(self, movie_id, digest, fetched_at=None):
+        """Record a fetch without looking up the previous one"""
+        entry = (movie_id, int(fetched_at or time.time()), *_digest_fields(digest))
+        self._pending.append(entry)
+        if self._movies is not None:
+            self._movies[movie_id] = (entry[1], entry[2:])
+
+    def mark(self, movie_id, digest, fetched_at=None):
+        """
+        Record a fetch
+
+        Returns:
+            bool: True when the content changed (or was never hashed before)
+        """
+        previous = self.movies.get(movie_id, (0, None))[1]
+        self.record(movie_id, digest, fetched_at)
+        return previous != _digest_fields(digest)
+
+    def stale_ids(self, ids, max_age):
+        """ids not fetched within max_age seconds, oldest first"""
+        cutoff = time.time() - max_age
+        stale = [movie_id for movie_id in ids if self.fetched_at(movie_id) < cutoff]
+        return sorted(stale, key=self.fetched_at)
+
+    def save(self):
+        """Append the new records to the log (or compact it) and write last_refresh"""
+        if self._movies is not None and self._records + len(self._pending) > 2 * len(self._movies):
+            tmp = self.log_path.with_name(self.log_path.name + ".tmp")
+            with open(tmp, "wb") as f:
+                f.write(_index_bytes((movie_id, fetched_at, *digest)
+                                     for movie_id, (fetched_at, digest) in self._movies.items()))
+                _fsync(f)
+            os.replace(tmp, self.log_path)
+            self._records = len(self._movies)
+        elif self._pending:
+            record_size = array('q').itemsize * STATE_FIELDS
+            with open(self.log_path, "ab") as f:
+                # drop a torn trailing record so the new ones stay aligned
+                torn = f.tell() % record_size
+                if torn:
+                    f.truncate(f.tell() - torn)
+                    f.seek(0, os.SEEK_END)
+                f.write(_index_bytes(self._pending))
+                _fsync(f)
+            self._records += len(self._pending)
+        self._pending = []
+
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"last_refresh": self.last_refresh}, f)
+            _fsync(f)
+        os.replace(tmp, self.path)
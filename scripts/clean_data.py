@@ -1,27 +1,117 @@
 import json
+import heapq
+import os
+import pickle
+import sys
+import tempfile
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import re
 from pathlib import Path
-from bs4 import BeautifulSoup
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 import string
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import warnings
+from raw_store import RawDelta, count_raw_records, iter_raw_records, iter_raw_tables, read_raw_records, read_raw_table
+from fast_text import RULES_VERSION, StopwordRemover, strip_html
+from text_cache import TextCache
+from cleaned_store import CLEANED_DIR, CleanedWriter, read_cleaned
+from quality_profile import PROFILE_FILE, QUANTILE_ALPHA, QualityProfile
 warnings.filterwarnings('ignore')
 
-# Paths
+# Paths (first existing source wins: Parquet parts, crawler JSONL, legacy JSON)
+RAW_MOVIES_DIR = Path("data/raw/movies")
+RAW_REVIEWS_DIR = Path("data/raw/reviews")
+RAW_MOVIES_JSONL = Path("data/raw/raw_movies.jsonl")
+RAW_REVIEWS_JSONL = Path("data/raw/raw_reviews.jsonl")
 RAW_MOVIES = Path("data/raw/raw_movies.json")
 RAW_REVIEWS = Path("data/raw/raw_reviews.json")
+# Movies re-fetched by `fetch_data.py refresh` (applied over the raw data, latest wins)
+RAW_DELTA_DIR = Path("data/raw/delta")
 OUTPUT_DIR = Path("data/cleaned")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_FILE = OUTPUT_DIR / "cleaned_movies.csv"
 REPORT_FILE = OUTPUT_DIR / "data_quality_report.txt"
 
+# The cleaned dataset is Parquet parts in CLEANED_DIR (see cleaned_store);
+# CLEAN_CSV=0 skips the cleaned_movies.csv copy
+WRITE_CSV = os.getenv("CLEAN_CSV", "1") == "1"
+
+# Raw fields used by the cleaner (only these columns are read from Parquet)
+RAW_MOVIE_COLUMNS = [
+    'id', 'title', 'original_title', 'overview', 'tagline', 'release_date',
+    'runtime', 'budget', 'revenue', 'vote_average', 'vote_count', 'popularity',
+    'status', 'original_language', 'genres', 'keywords', 'credits'
+]
+RAW_REVIEW_COLUMNS = ['id', 'movie_id', 'content']
+
+# Output columns, in order
+FINAL_COLUMNS = [
+    'movie_id',
+    'title',
+    'original_title',
+    'year',
+    'runtime',
+    'genres',
+    'director',
+    'cast',
+    'overview',
+    'clean_overview',
+    'tagline',
+    'keywords',
+    'clean_text',
+    'vote_average',
+    'vote_count',
+    'popularity',
+    'budget',
+    'revenue',
+    'review_count',
+    'status',
+    'original_language',
+    'release_date'
+]
+
+# Review aggregation (ReviewAggregator): characters of review text kept per
+# movie for clean_text (0 = counts only, no reviews in clean_text), and
+# whether the output gets per-movie statistics of the reviewers' own ratings
+# (author_details.rating)
+REVIEW_MAX_CHARS = int(os.getenv("CLEAN_REVIEW_CHARS", 20000))
+REVIEW_RATINGS = os.getenv("CLEAN_REVIEW_RATINGS", "0") == "1"
+REVIEW_RATING_COLUMNS = ['review_rating_count', 'review_rating_mean']
+
+# Streaming mode: movies per spill bucket (cleaned together), rows per pickled
+# slice of a sorted run, and the most buckets (open spill files) of one run
+CHUNK_SIZE = 50000
+RUN_BLOCK_ROWS = 2000
+MAX_BUCKETS = 512
+
+# Text cleaning process pool: workers, rows per work unit, and the column size
+# below which the pool start-up costs more than it saves
+CLEAN_WORKERS = int(os.getenv("CLEAN_WORKERS", os.cpu_count() or 1))
+CLEAN_BATCH_ROWS = 256
+PARALLEL_MIN_ROWS = 2000
+
 # NLTK stopwords
 STOP_WORDS = set(stopwords.words('english'))
 
+# Stopword removal: 'fast' (whole column through compiled regexes, see
+# fast_text.StopwordRemover) or 'nltk' (word_tokenize per row, the reference
+# the fast mode matches)
+STOPWORD_MODE = os.getenv("CLEAN_STOPWORDS", "fast")
+STOPWORD_REMOVER = StopwordRemover(STOP_WORDS, string.punctuation)
+
+# Cleaned text cache (text_cache.TextCache): SQLite file ('' turns it off) and
+# the stored text kept between runs. Bump CLEAN_TEXT_VERSION whenever
+# clean_values output changes outside fast_text (which has RULES_VERSION).
+TEXT_CACHE_PATH = os.getenv("CLEAN_CACHE", "data/cache/clean_text.sqlite")
+TEXT_CACHE_MAX_MB = int(os.getenv("CLEAN_CACHE_MB", 512))
+CLEAN_TEXT_VERSION = 2
+
 
 def normalize_genres(genres):
     """Normalize genres into a list of strings."""
@@ -43,11 +133,461 @@ def normalize_genres(genres):
     return cleaned
 
 
+
+# ----------------------------
+# Single-pass field extraction
+# ----------------------------
+# (output column, raw key) copied as-is
+MOVIE_SCALAR_FIELDS = [
+    ('movie_id', 'id'),
+    ('title', 'title'),
+    ('original_title', 'original_title'),
+    ('overview', 'overview'),
+    ('tagline', 'tagline'),
+    ('release_date', 'release_date'),
+    ('runtime', 'runtime'),
+    ('budget', 'budget'),
+    ('revenue', 'revenue'),
+    ('vote_average', 'vote_average'),
+    ('vote_count', 'vote_count'),
+    ('popularity', 'popularity'),
+    ('status', 'status'),
+    ('original_language', 'original_language'),
+]
+MOVIE_COLUMNS = [name for name, _ in MOVIE_SCALAR_FIELDS] + ['year', 'genres', 'keywords', 'cast', 'director']
+
+
+class MovieColumnBuilder:
+    """
+    Walks each raw movie record once and fills column buffers
+
+    Replaces DataFrame(records) + one .apply per nested field. Scalar
+    fields are gathered per column with C-level map(dict.get); the nested
+    fields are extracted in a single Python loop over the records. Genres
+    and keywords are kept as per-row lists (Arrow list<string> in
+    to_arrow), director and original_language are interned into
+    dictionary codes as they are read.
+    """
+
+    def __init__(self, extract_year):
+        self.extract_year = extract_year
+        self._scalars = {name: [] for name, _ in MOVIE_SCALAR_FIELDS if name != 'original_language'}
+        self.year = []
+        self.genres = []
+        self.keywords = []
+        self.cast = []
+        self.director = ([], {})  # (codes, value -> code)
+        self.language = ([], {})
+
+    def add(self, records):
+        """อ่าน raw records (list of dict) หนึ่งรอบ"""
+        for name, key in MOVIE_SCALAR_FIELDS:
+            if name in self._scalars:
+                self._scalars[name].extend(map(dict.get, records, repeat(key)))
+
+        year_append = self.year.append
+        genres_append = self.genres.append
+        keywords_append = self.keywords.append
+        cast_append = self.cast.append
+        extract_year = self.extract_year
+        director_codes, directors = self.director
+        language_codes, languages = self.language
+
+        for record in records:
+            # extract_year, inlined for the common "YYYY-MM-DD" string
+            date = record.get('release_date')
+            if type(date) is str and date[:4].isdecimal() and date[4:5] in ('-', ''):
+                year = int(date[:4])
+                year_append(year if 1900 <= year <= 2030 else None)
+            else:
+                year_append(extract_year(date))
+
+            # normalize_genres, inlined for lists
+            genres = record.get('genres')
+            if type(genres) is list:
+                genres_append([g['name'] for g in genres if isinstance(g, dict) and 'name' in g])
+            else:
+                genres_append(normalize_genres(genres))
+
+            keywords_obj = record.get('keywords')
+            if isinstance(keywords_obj, dict):
+                keywords_append([k['name'] for k in keywords_obj.get('keywords') or []])
+            else:
+                keywords_append([])
+
+            director = ''
+            credits = record.get('credits')
+            if isinstance(credits, dict) and credits:
+                cast_append(' '.join([c['name'] for c in (credits.get('cast') or [])[:5]]))
+                for member in credits.get('crew') or []:
+                    if member.get('job') == 'Director':
+                        director = member['name']
+                        break
+            else:
+                cast_append('')
+
+            code = directors.get(director)
+            if code is None:
+                code = directors[director] = len(directors)
+            director_codes.append(code)
+
+            language = record.get('original_language')
+            code = languages.get(language)
+            if code is None:
+                code = languages[language] = len(languages)
+            language_codes.append(code)
+
+    @staticmethod
+    def _names(list_array, field='name'):
+        """list<struct> -> Python lists of one struct field (null lists become [])"""
+        list_array = pc.fill_null(list_array, pa.scalar([], list_array.type))
+        return pa.ListArray.from_arrays(list_array.offsets, pc.struct_field(list_array.values, field))
+
+    @staticmethod
+    def _intern_array(column, array):
+        """Append dictionary codes for an Arrow string array (dictionary_encode, then remap)"""
+        codes, dictionary = column
+        encoded = pc.dictionary_encode(array)
+        mapping = []
+        for value in encoded.dictionary.to_pylist() + [None]:
+            code = dictionary.get(value)
+            if code is None and (value is not None or encoded.indices.null_count):
+                code = dictionary[value] = len(dictionary)
+            mapping.append(code if code is not None else -1)
+        local = pc.fill_null(encoded.indices, len(mapping) - 1).to_numpy()
+        codes.extend(np.asarray(mapping, dtype=np.int64)[local].tolist())
+
+    def add_table(self, table):
+        """
+        Same as add() for an Arrow table in RAW_MOVIE_SCHEMA (Parquet raw parts)
+
+        Every field is extracted with Arrow compute kernels; only release dates
+        that are not "YYYY..." go through extract_year in Python.
+        """
+        for name, key in MOVIE_SCALAR_FIELDS:
+            if name in self._scalars:
+                self._scalars[name].extend(table.column(key).to_pylist())
+
+        # year: "YYYY-..." / "YYYY" vectorized, the rest like extract_year
+        dates = table.column('release_date').combine_chunks()
+        fast = pc.fill_null(pc.match_substring_regex(dates, r'^[0-9]{4}(-|$)'), False)
+        years = pc.cast(pc.utf8_slice_codeunits(pc.if_else(fast, dates, pa.scalar(None, pa.string())), 0, 4),
+                        pa.int64())
+        in_range = pc.and_(pc.greater_equal(years, 1900), pc.less_equal(years, 2030))
+        years = pc.if_else(pc.fill_null(in_range, False), years, pa.scalar(None, pa.int64())).to_pylist()
+        slow = np.flatnonzero(~fast.to_numpy(zero_copy_only=False))
+        for i, date in zip(slow, dates.take(pa.array(slow, pa.int64())).to_pylist()):
+            years[i] = self.extract_year(date)
+        self.year.extend(years)
+
+        self.genres.extend(self._names(table.column('genres').combine_chunks()).to_pylist())
+        keywords = pc.struct_field(table.column('keywords').combine_chunks(), 'keywords')
+        self.keywords.extend(self._names(keywords).to_pylist())
+
+        credits = table.column('credits').combine_chunks()
+        cast = pc.fill_null(pc.struct_field(credits, 'cast'), pa.scalar([], credits.type.field('cast').type))
+        cast = self._names(pc.list_slice(cast, 0, 5))
+        self.cast.extend(pc.fill_null(pc.binary_join(cast, ' '), '').to_pylist())
+
+        # director: first crew member per movie whose job is Director
+        crew = pc.fill_null(pc.struct_field(credits, 'crew'), pa.scalar([], credits.type.field('crew').type))
+        members = pc.list_flatten(crew)
+        parents = pc.list_parent_indices(crew).to_numpy()
+        is_director = pc.fill_null(pc.equal(pc.struct_field(members, 'job'), 'Director'), False).to_numpy(
+            zero_copy_only=False)
+        rows, first = np.unique(parents[is_director], return_index=True)
+        names = pc.struct_field(members, 'name').filter(pa.array(is_director)).take(pa.array(first, pa.int64()))
+        directors = [''] * len(table)
+        for row, name in zip(rows.tolist(), names.to_pylist()):
+            directors[row] = name
+        self._intern_array(self.director, pa.array(directors, pa.string()))
+        self._intern_array(self.language, table.column('original_language').combine_chunks())
+
+    def __len__(self):
+        return len(self.year)
+
+    @staticmethod
+    def _decode(column):
+        codes, dictionary = column
+        values = np.empty(len(dictionary), dtype=object)
+        values[:] = list(dictionary)
+        return values[np.asarray(codes, dtype=np.int64)] if codes else np.empty(0, dtype=object)
+
+    def to_frame(self):
+        """DataFrame with the columns process_movies has always returned"""
+        columns = dict(self._scalars)
+        columns['original_language'] = list(self._decode(self.language))
+        columns['year'] = self.year
+        columns['genres'] = self.genres
+        columns['keywords'] = self.keywords
+        columns['cast'] = self.cast
+        columns['director'] = list(self._decode(self.director))
+        return pd.DataFrame({name: columns[name] for name in MOVIE_COLUMNS})
+
+    def to_arrow(self):
+        """Arrow table: list<string> genres/keywords, dictionary-encoded director/language"""
+        arrays = {name: pa.array(values) for name, values in self._scalars.items()}
+        for name, column in (('original_language', self.language), ('director', self.director)):
+            codes, dictionary = column
+            values = list(dictionary)
+            missing = np.asarray(codes, dtype=np.int64) == values.index(None) if None in dictionary else None
+            values = ['' if value is None else value for value in values]
+            arrays[name] = pa.DictionaryArray.from_arrays(
+                pa.array(codes, pa.int32(), mask=missing), pa.array(values, pa.string()))
+        arrays['year'] = pa.array(self.year, pa.int16())
+        arrays['genres'] = pa.array(self.genres, pa.list_(pa.string()))
+        arrays['keywords'] = pa.array(self.keywords, pa.list_(pa.string()))
+        arrays['cast'] = pa.array(self.cast, pa.string())
+        return pa.table({name: arrays[name] for name in MOVIE_COLUMNS})
+
+
+# ----------------------------
+# Review aggregation
+# ----------------------------
+class ReviewAggregator:
+    """
+    รวม reviews ต่อภาพยนตร์ทีละ batch โดยไม่สร้าง DataFrame ของ reviews
+
+    Keeps one small buffer per movie: the review count (reviews with an id,
+    like the old groupby count), review content joined with ' ' up to
+    max_chars characters (the review crossing the cap is cut), and with
+    ratings=True the count and sum of author_details.rating. Memory grows
+    with movies x max_chars, not with the number of reviews.
+    """
+
+    def __init__(self, max_chars=REVIEW_MAX_CHARS, ratings=False):
+        self.max_chars = max_chars
+        self.ratings = ratings
+        self.reviews = 0
+        self._counts = {}
+        self._texts = {}  # movie_id -> [parts, chars used]
+        self._rating_counts = {}
+        self._rating_sums = {}
+
+    def add(self, reviews):
+        """อ่าน raw review dicts หนึ่ง batch"""
+        counts = self._counts
+        texts = self._texts
+        max_chars = self.max_chars
+        self.reviews += len(reviews)
+
+        for review in reviews:
+            movie_id = review.get('movie_id')
+            if movie_id is None or movie_id != movie_id:  # None / NaN are dropped by groupby
+                continue
+            if review.get('id') is not None:
+                counts[movie_id] = counts.get(movie_id, 0) + 1
+
+            content = review.get('content')
+            if max_chars > 0 and content is not None:
+                buffer = texts.get(movie_id)
+                if buffer is None:
+                    buffer = texts[movie_id] = [[], -1]  # -1: no separator before the first part
+                room = max_chars - buffer[1] - 1
+                if room > 0:
+                    part = str(content)[:room]
+                    buffer[0].append(part)
+                    buffer[1] += 1 + len(part)
+
+            if self.ratings:
+                rating = (review.get('author_details') or {}).get('rating')
+                if rating is not None and rating == rating:
+                    self._rating_counts[movie_id] = self._rating_counts.get(movie_id, 0) + 1
+                    self._rating_sums[movie_id] = self._rating_sums.get(movie_id, 0.0) + rating
+
+    def __len__(self):
+        """Movies with at least one review"""
+        return len(self._counts.keys() | self._texts.keys())
+
+    def columns(self, movie_ids):
+        """
+        Review columns aligned with movie_ids
+
+        Returns:
+            dict: reviews_text, review_count (+ REVIEW_RATING_COLUMNS) -> list;
+            movies without reviews get '' / 0 (/ 0, NaN)
+        """
+        texts = self._texts
+        counts = self._counts
+        columns = {
+            'reviews_text': [' '.join(texts[m][0]) if m in texts else '' for m in movie_ids],
+            'review_count': [counts.get(m, 0) for m in movie_ids],
+        }
+        if self.ratings:
+            rated = self._rating_counts
+            sums = self._rating_sums
+            columns['review_rating_count'] = [rated.get(m, 0) for m in movie_ids]
+            columns['review_rating_mean'] = [sums[m] / rated[m] if m in rated else np.nan for m in movie_ids]
+        return columns
+
+
+# ----------------------------
+# Streaming spills
+# ----------------------------
+def movie_bucket(movie_id, buckets):
+    """Spill bucket of a movie_id; None / NaN ids share bucket 0"""
+    if movie_id is None or movie_id != movie_id:
+        return 0
+    if isinstance(movie_id, (int, float, np.integer, np.floating)):
+        return int(movie_id % buckets)
+    return hash(movie_id) % buckets
+
+
+class BucketSpill:
+    """
+    Records partitioned by movie_id into append-only pickle files
+
+    Every copy of a movie (and every review of it) lands in the same bucket,
+    in input order, so a bucket can be cleaned on its own.
+    """
+
+    def __init__(self, directory, name, buckets):
+        self.paths = [Path(directory) / f"{name}-{i:05d}.pkl" for i in range(buckets)]
+        self._files = [open(path, 'wb') for path in self.paths]
+
+    def __len__(self):
+        return len(self.paths)
+
+    def add_records(self, records, key):
+        """Spill a list of dicts by record[key]"""
+        parts = {}
+        for record in records:
+            parts.setdefault(movie_bucket(record.get(key), len(self)), []).append(record)
+        for bucket, part in parts.items():
+            pickle.dump(part, self._files[bucket], protocol=pickle.HIGHEST_PROTOCOL)
+
+    def add_movies(self, movies, seqs):
+        """Spill raw movies (list of dicts or Arrow table) with their raw positions"""
+        if isinstance(movies, pa.Table):
+            buckets = pc.fill_null(movies.column('id'), 0).to_numpy() % len(self)
+        else:
+            buckets = np.array([movie_bucket(movie.get('id'), len(self)) for movie in movies], dtype=np.int64)
+        order = np.argsort(buckets, kind='stable')
+        bounds = np.searchsorted(buckets[order], np.arange(len(self) + 1))
+        for bucket in np.flatnonzero(np.diff(bounds)):
+            rows = order[bounds[bucket]:bounds[bucket + 1]]
+            part = movies.take(rows) if isinstance(movies, pa.Table) else [movies[i] for i in rows]
+            pickle.dump((seqs[rows], part), self._files[bucket], protocol=pickle.HIGHEST_PROTOCOL)
+
+    def close(self):
+        for f in self._files:
+            f.close()
+
+    def read(self, bucket):
+        """Pieces spilled to bucket, in order"""
+        with open(self.paths[bucket], 'rb') as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+
+class SpilledColumn:
+    """
+    float64 values appended to a file; exact median without loading them
+
+    median() finds the middle order statistics by bisecting on the bit
+    pattern of the values (ordered like the floats), counting block by
+    block, and returns what np.median of all values would.
+    """
+
+    _FLIP = np.int64(0x7FFFFFFFFFFFFFFF)
+
+    def __init__(self, path, block_rows=CHUNK_SIZE):
+        self.path = Path(path)
+        self.block_rows = block_rows
+        self._file = open(self.path, 'wb')
+        self.count = 0
+
+    def append(self, values):
+        values = np.asarray(values, dtype=np.float64) + 0.0  # -0.0 -> 0.0, so equal values share a key
+        self._file.write(values.tobytes())
+        self.count += len(values)
+
+    def _keys(self):
+        self._file.flush()
+        values = np.memmap(self.path, dtype=np.float64, mode='r', shape=(self.count,))
+        for start in range(0, self.count, self.block_rows):
+            bits = values[start:start + self.block_rows].view(np.int64)
+            yield np.where(bits < 0, bits ^ self._FLIP, bits)
+
+    def _value(self, key):
+        key = np.int64(key)
+        return float(np.array([key ^ self._FLIP if key < 0 else key], dtype=np.int64).view(np.float64)[0])
+
+    def _kth_key(self, k, lo, hi):
+        """Smallest key with more than k values at or below it"""
+        while lo < hi:
+            mid = lo + (hi - lo) // 2
+            if sum(int(np.count_nonzero(keys <= mid)) for keys in self._keys()) > k:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def median(self):
+        if not self.count:
+            return None
+        lo = min(int(keys.min()) for keys in self._keys())
+        hi = max(int(keys.max()) for keys in self._keys())
+        middle = self._kth_key((self.count - 1) // 2, lo, hi)
+        if self.count % 2:
+            return self._value(middle)
+        upper = self._kth_key(self.count // 2, middle, hi)
+        return float(np.mean([self._value(middle), self._value(upper)]))
+
+    def close(self):
+        self._file.close()
+
+
+def promote_dtype(dtypes):
+    """
+    dtype a numeric column would have had if all chunks were one DataFrame
+
+    A non-numeric chunk of a numeric column means it held only nulls, which
+    a single DataFrame would have stored as float NaN. Returns None for text
+    and list columns, which keep the dtype pandas infers.
+    """
+    numeric = [d for d in dtypes if pd.api.types.is_numeric_dtype(d)]
+    if not numeric:
+        return None
+    if len(numeric) < len(dtypes):
+        numeric.append(np.dtype(float))
+    return np.result_type(*numeric)
+
+
+_worker_cleaner = None
+
+
+def _clean_batch(texts, remove_stops, stopword_mode):
+    """Process pool work unit: clean_text_field over one batch of rows"""
+    global _worker_cleaner
+    if _worker_cleaner is None or _worker_cleaner.stopword_mode != stopword_mode:
+        _worker_cleaner = DataCleaner(workers=1, stopword_mode=stopword_mode)
+    return _worker_cleaner.clean_values(texts, remove_stops)
+
+
 class DataCleaner:
     """Class สำหรับทำความสะอาดข้อมูล"""
     
-    def __init__(self):
+    def __init__(self, workers=CLEAN_WORKERS, stopword_mode=STOPWORD_MODE, review_ratings=REVIEW_RATINGS,
+                 text_cache=TEXT_CACHE_PATH):
+        if stopword_mode not in ('fast', 'nltk'):
+            raise ValueError(f"Unknown stopword mode: {stopword_mode}")
+        self.workers = max(1, int(workers))
+        self.stopword_mode = stopword_mode
+        self.text_cache_path = text_cache or None
+        self._text_cache = None
+        self.review_ratings = review_ratings
+        self.final_columns = list(FINAL_COLUMNS)
+        if review_ratings:
+            position = self.final_columns.index('review_count') + 1
+            self.final_columns[position:position] = REVIEW_RATING_COLUMNS
+        self._pool = None
+        self._delta = None
         self.cleaning_log = []
+        self.quiet = False  # per-chunk step logs are muted in streaming mode
         self.stats = {
             'initial_movies': 0,
             'initial_reviews': 0,
@@ -60,46 +600,75 @@ class DataCleaner:
     
     def log(self, message):
         """บันทึก log message"""
+        if self.quiet:
+            return
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_entry = f"[{timestamp}] {message}"
         self.cleaning_log.append(log_entry)
         print(log_entry)
     
+    def load_raw(self, sources, columns, as_table=False):
+        """
+        โหลด raw records จากแหล่งแรกที่มีอยู่ (Parquet parts / JSONL / JSON)
+
+        as_table=True returns Parquet parts as one Arrow table instead of dicts
+        (MovieColumnBuilder.add_table); JSON sources are always lists of dicts.
+        """
+        for path in sources:
+            if path.exists():
+                self.log(f"Reading {path}")
+                if path.suffix == '.json':
+                    with open(path, 'r', encoding='utf-8') as f:
+                        return json.load(f)
+                if as_table and path.is_dir():
+                    return read_raw_table(path, columns)
+                return read_raw_records(path, columns)
+        raise FileNotFoundError(f"No raw data found in: {', '.join(str(p) for p in sources)}")
+    
     def load_data(self):
-        """โหลดข้อมูลจากไฟล์ JSON"""
+        """
+        โหลดข้อมูลดิบ
+
+        Returns:
+            tuple: (movies, review batches); reviews are only read when
+            aggregate_reviews consumes the batches
+        """
         self.log("Loading raw data...")
         
-        # Load movies
-        with open(RAW_MOVIES, 'r', encoding='utf-8') as f:
-            movies = json.load(f)
+        # Load movies (refreshed movies from the delta replace their old records)
+        delta = self.load_delta()
+        movies = self.load_raw([RAW_MOVIES_DIR, RAW_MOVIES_JSONL, RAW_MOVIES], RAW_MOVIE_COLUMNS, as_table=True)
+        movies = delta.apply_movies(movies)
         
         self.stats['initial_movies'] = len(movies)
         self.log(f"Loaded {len(movies)} movies")
         
-        # Load reviews
-        with open(RAW_REVIEWS, 'r', encoding='utf-8') as f:
-            reviews = json.load(f)
-        
-        self.stats['initial_reviews'] = len(reviews)
-        self.log(f"Loaded {len(reviews)} reviews")
+        # Reviews, batch by batch
+        reviews = delta.apply_reviews(
+            self.iter_raw([RAW_REVIEWS_DIR, RAW_REVIEWS_JSONL, RAW_REVIEWS], self.review_columns(), CHUNK_SIZE))
         
         return movies, reviews
     
+    def load_delta(self):
+        """Refreshed movies in RAW_DELTA_DIR (see raw_store.RawDelta), read once per cleaner"""
+        if self._delta is None:
+            self._delta = RawDelta(RAW_DELTA_DIR, RAW_MOVIE_COLUMNS, self.review_columns())
+            if self._delta.pairs:
+                self.log(f"Refresh delta: {len(self._delta)} movies from {self._delta.pairs} runs in {RAW_DELTA_DIR}")
+        return self._delta
+    
+    def review_columns(self):
+        """Raw review fields ReviewAggregator reads"""
+        return RAW_REVIEW_COLUMNS + (['author_details'] if self.review_ratings else [])
+    
     def clean_html(self, text):
         """ลบ HTML tags"""
         if pd.isna(text) or text == '':
             return ''
         
-        # Parse HTML
-        soup = BeautifulSoup(str(text), 'html.parser')
-        
-        # Get text only
-        clean_text = soup.get_text()
-        
-        # Remove extra whitespace
-        clean_text = ' '.join(clean_text.split())
-        
-        return clean_text
+        # Get text only and remove extra whitespace
+        # (BeautifulSoup only for complex HTML, see fast_text.strip_html)
+        return strip_html(str(text))
     
     def remove_special_chars(self, text):
         """ลบ special characters ที่ไม่จำเป็น"""
@@ -119,6 +688,9 @@ class DataCleaner:
         if pd.isna(text) or text == '':
             return ''
         
+        if self.stopword_mode == 'fast':
+            return STOPWORD_REMOVER.remove(str(text))
+        
         # Tokenize
         words = word_tokenize(str(text).lower())
         
@@ -127,6 +699,12 @@ class DataCleaner:
         
         return ' '.join(filtered)
     
+    def remove_stopwords_column(self, texts):
+        """remove_stopwords ทั้ง list (โหมด fast ทำทั้ง column ในครั้งเดียว)"""
+        if self.stopword_mode == 'fast':
+            return STOPWORD_REMOVER.remove_column(texts)
+        return [self.remove_stopwords(text) for text in texts]
+    
     def clean_text_field(self, text, remove_stops=False):
         """ทำความสะอาดข้อความ (pipeline)"""
         # Step 1: Clean HTML
@@ -161,112 +739,147 @@ class DataCleaner:
         except:
             return None
     
+    def clean_values(self, values, remove_stops=False):
+        """clean_text_field over a list of values, with stopwords removed per column"""
+        texts = [self.remove_special_chars(self.clean_html(value)) for value in values]
+        if remove_stops:
+            texts = self.remove_stopwords_column(texts)
+        return [text.lower().strip() for text in texts]
+    
+    def clean_text_column(self, texts, remove_stops=False):
+        """
+        clean_text_field ทั้ง column โดยแบ่ง rows ให้ process pool
+
+        Rows are sent in batches of CLEAN_BATCH_ROWS and results come back in
+        order, so the output is identical to the serial path.
+
+        Args:
+            texts (Series): raw text column
+            remove_stops (bool): ส่งต่อให้ clean_text_field
+
+        Returns:
+            Series: cleaned text with the same index
+        """
+        if self.workers == 1 or len(texts) < PARALLEL_MIN_ROWS:
+            return pd.Series(self.clean_values(texts.tolist(), remove_stops), index=texts.index, name=texts.name)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        values = texts.tolist()
+        batches = [values[i:i + CLEAN_BATCH_ROWS] for i in range(0, len(values), CLEAN_BATCH_ROWS)]
+        cleaned = []
+        for batch in self._pool.map(_clean_batch, batches, [remove_stops] * len(batches),
+                                    [self.stopword_mode] * len(batches)):
+            cleaned.extend(batch)
+        return pd.Series(cleaned, index=texts.index, name=texts.name)
+    
+    def close_pool(self):
+        """ปิด process pool (ถ้ามี)"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def open_text_cache(self):
+        """เปิด text cache (ถ้าเปิดใช้) ครั้งแรกที่ต้องใช้"""
+        if self._text_cache is None and self.text_cache_path:
+            self._text_cache = TextCache(
+                self.text_cache_path,
+                version=f"{CLEAN_TEXT_VERSION}.{RULES_VERSION}",
+                config=f"stopwords={self.stopword_mode}:{' '.join(sorted(STOP_WORDS))}",
+                max_bytes=TEXT_CACHE_MAX_MB * 1024 * 1024,
+            )
+        return self._text_cache
+    
+    def close_text_cache(self):
+        """Evict, close and log hit/miss statistics of the text cache (ถ้ามี)"""
+        if self._text_cache is not None:
+            cache = self._text_cache
+            cache.close()
+            self._text_cache = None
+            self.log(f"Text cache: {cache.stats['hits']} hits, {cache.stats['misses']} misses, "
+                     f"{cache.stats['evicted']} evicted ({cache.path})")
+    
+    def clean_text_cached(self, cache, raw_texts, overviews):
+        """
+        clean_text and clean_overview columns, cleaning only rows missing from the cache
+
+        Args:
+            cache (TextCache): open cache
+            raw_texts (Series): create_clean_text raw_text column
+            overviews (Series): overview column
+
+        Returns:
+            tuple: (clean_text Series, clean_overview Series), same index as raw_texts
+        """
+        # clean_html maps a missing overview to '' as well
+        overview_inputs = ['' if pd.isna(value) else str(value) for value in overviews.tolist()]
+        keys = [cache.key(text, overview) for text, overview in zip(raw_texts.tolist(), overview_inputs)]
+        found = cache.get_many(keys)
+        hits = sum(key in found for key in keys)
+        
+        # first row of every missing key
+        missing = {}
+        for position, key in enumerate(keys):
+            if key not in found and key not in missing:
+                missing[key] = position
+        if missing:
+            rows = list(missing.values())
+            clean_text = self.clean_text_column(raw_texts.iloc[rows], remove_stops=True).tolist()
+            clean_overview = self.clean_text_column(overviews.iloc[rows], remove_stops=False).tolist()
+            entries = list(zip(missing, clean_text, clean_overview))
+            cache.put_many(entries)
+            found.update((key, (text, overview)) for key, text, overview in entries)
+        self.log(f"Text cache: {hits} of {len(keys)} rows cached, cleaned {len(missing)}")
+        
+        pairs = [found[key] for key in keys]
+        return (pd.Series([pair[0] for pair in pairs], index=raw_texts.index, name='clean_text'),
+                pd.Series([pair[1] for pair in pairs], index=raw_texts.index, name='clean_overview'))
+    
     def process_movies(self, movies_raw):
-        """ประมวลผลข้อมูลภาพยนตร์"""
+        """ประมวลผลข้อมูลภาพยนตร์ (อ่านแต่ละ record ครั้งเดียว, ดู MovieColumnBuilder)"""
         self.log("\nProcessing movies...")
+        self.log(f"Initial records: {len(movies_raw)}")
         
-        # Convert to DataFrame
-        df = pd.DataFrame(movies_raw)
-        
-        self.log(f"Initial shape: {df.shape}")
-        
-        # ===== EXTRACT BASIC FIELDS =====
-        
-        movies_clean = pd.DataFrame()
-        
-        movies_clean['movie_id'] = df['id']
-        movies_clean['title'] = df['title']
-        movies_clean['original_title'] = df['original_title']
-        movies_clean['overview'] = df['overview']
-        movies_clean['tagline'] = df['tagline']
-        movies_clean['release_date'] = df['release_date']
-        movies_clean['runtime'] = df['runtime']
-        movies_clean['budget'] = df['budget']
-        movies_clean['revenue'] = df['revenue']
-        movies_clean['vote_average'] = df['vote_average']
-        movies_clean['vote_count'] = df['vote_count']
-        movies_clean['popularity'] = df['popularity']
-        movies_clean['status'] = df['status']
-        movies_clean['original_language'] = df['original_language']
-        
-        # ===== EXTRACT YEAR =====
-        
-        movies_clean['year'] = df['release_date'].apply(self.extract_year)
-        
-        # ===== EXTRACT GENRES =====
-        
-        movies_clean['genres'] = df['genres'].apply(normalize_genres)
-        
-        # ===== EXTRACT KEYWORDS =====
-        
-        def extract_keywords(keywords_obj):
-            if pd.isna(keywords_obj) or not keywords_obj:
-                return []
-            
-            keywords_list = keywords_obj.get('keywords', [])
-            return [k['name'] for k in keywords_list]
-        
-        movies_clean['keywords'] = df['keywords'].apply(extract_keywords)
-        
-        # ===== EXTRACT CAST (TOP 5) =====
-        
-        def extract_cast(credits_obj):
-            if pd.isna(credits_obj) or not credits_obj:
-                return ''
-            
-            cast_list = credits_obj.get('cast', [])
-            top_cast = [c['name'] for c in cast_list[:5]]
-            return ' '.join(top_cast)
-        
-        movies_clean['cast'] = df['credits'].apply(extract_cast)
-        
-        # ===== EXTRACT DIRECTOR =====
-        
-        def extract_director(credits_obj):
-            if pd.isna(credits_obj) or not credits_obj:
-                return ''
-            
-            crew_list = credits_obj.get('crew', [])
-            directors = [c['name'] for c in crew_list if c.get('job') == 'Director']
-            return directors[0] if directors else ''
-        
-        movies_clean['director'] = df['credits'].apply(extract_director)
+        builder = MovieColumnBuilder(self.extract_year)
+        if isinstance(movies_raw, pa.Table):
+            builder.add_table(movies_raw)
+        else:
+            builder.add(movies_raw)
+        movies_clean = builder.to_frame()
         
         self.log(f"Extracted fields. Shape: {movies_clean.shape}")
         
         return movies_clean
     
-    def aggregate_reviews(self, reviews_raw):
-        """รวม reviews ของแต่ละภาพยนตร์"""
+    def aggregate_reviews(self, review_batches, max_chars=REVIEW_MAX_CHARS):
+        """
+        รวม reviews ของแต่ละภาพยนตร์ (ดู ReviewAggregator)
+
+        Args:
+            review_batches (iterable): lists of raw review dicts, e.g. from iter_raw
+            max_chars (int): review text kept per movie (0 = counts only)
+
+        Returns:
+            ReviewAggregator
+        """
         self.log("\nAggregating reviews...")
         
-        df_reviews = pd.DataFrame(reviews_raw)
-        
-        # Group by movie_id
-        reviews_agg = df_reviews.groupby('movie_id').agg({
-            'content': lambda x: ' '.join(x.astype(str)),  # รวมเนื้อหา
-            'id': 'count'  # นับจำนวน reviews
-        }).rename(columns={'content': 'reviews_text', 'id': 'review_count'})
+        aggregator = ReviewAggregator(max_chars, self.review_ratings)
+        for batch in review_batches:
+            aggregator.add(batch)
         
-        self.log(f"Aggregated reviews for {len(reviews_agg)} movies")
+        self.stats['initial_reviews'] += aggregator.reviews
+        self.log(f"Aggregated {aggregator.reviews} reviews for {len(aggregator)} movies")
         
-        return reviews_agg
+        return aggregator
     
-    def merge_data(self, movies_df, reviews_df):
-        """รวม movies และ reviews"""
+    def merge_data(self, movies_df, reviews):
+        """รวม movies และ reviews (left join on movie_id, ReviewAggregator lookups)"""
         self.log("\nMerging movies and reviews...")
         
-        # Left join
-        merged = movies_df.merge(
-            reviews_df,
-            left_on='movie_id',
-            right_index=True,
-            how='left'
-        )
-        
-        # Fill missing reviews
-        merged['reviews_text'] = merged['reviews_text'].fillna('')
-        merged['review_count'] = merged['review_count'].fillna(0).astype(int)
+        merged = movies_df.copy()
+        for name, values in reviews.columns(merged['movie_id'].tolist()).items():
+            merged[name] = values
         
         self.log(f"Merged data shape: {merged.shape}")
         
@@ -293,25 +906,26 @@ class DataCleaner:
             if isinstance(keywords, (list, tuple)) and len(keywords) > 0:
                 parts.append(" ".join(keywords))
 
-            # reviews
-            review_texts = row.get("review_texts", [])
-            if isinstance(review_texts, (list, tuple)) and len(review_texts) > 0:
-                parts.append(" ".join(review_texts))
+            # reviews (ReviewAggregator joins each movie's kept review text)
+            reviews_text = row.get("reviews_text", "")
+            if isinstance(reviews_text, str) and reviews_text:
+                parts.append(reviews_text)
 
             return " ".join(parts)
         
         # Combine all text
         df['raw_text'] = df.apply(combine_text, axis=1)
         
-        # Clean text
-        df['clean_text'] = df['raw_text'].apply(
-            lambda x: self.clean_text_field(x, remove_stops=True)
-        )
-        
-        # Clean overview separately (without removing stopwords)
-        df['clean_overview'] = df['overview'].apply(
-            lambda x: self.clean_text_field(x, remove_stops=False)
-        )
+        cache = self.open_text_cache()
+        if cache is not None:
+            # Unchanged movies come from the cache
+            df['clean_text'], df['clean_overview'] = self.clean_text_cached(cache, df['raw_text'], df['overview'])
+        else:
+            # Clean text
+            df['clean_text'] = self.clean_text_column(df['raw_text'], remove_stops=True)
+            
+            # Clean overview separately (without removing stopwords)
+            df['clean_overview'] = self.clean_text_column(df['overview'], remove_stops=False)
         
         self.log(f"Created clean_text for {len(df)} records")
         
@@ -320,8 +934,16 @@ class DataCleaner:
         
         return df
     
-    def handle_missing_values(self, df):
-        """จัดการ missing values"""
+    def handle_missing_values(self, df, vote_average_values=None):
+        """
+        จัดการ missing values
+
+        Args:
+            df (DataFrame): merged data
+            vote_average_values (SpilledColumn): streaming mode only; the median
+                is global, so observed vote_average values are appended here and
+                the nulls are left for run_streaming to fill
+        """
         self.log("\nHandling missing values...")
         
         initial_nulls = df.isnull().sum().sum()
@@ -332,7 +954,7 @@ class DataCleaner:
         before = len(df)
         df = df[df['overview'].notna() & (df['overview'] != '')]
         removed = before - len(df)
-        self.stats['removed_null_overview'] = removed
+        self.stats['removed_null_overview'] += removed
         self.log(f"Removed {removed} rows with null overview")
         
         # Remove rows with null clean_text
@@ -352,7 +974,12 @@ class DataCleaner:
                 self.log(f"Filled {filled} missing values in {field} with 0")
         
         # Fill vote_average with median
-        if df['vote_average'].isnull().sum() > 0:
+        deferred = 0
+        if vote_average_values is not None:
+            vote_average_values.append(df['vote_average'].dropna().to_numpy(dtype=float))
+            # counted as filled here, filled once all chunks are seen
+            deferred = df['vote_average'].isnull().sum()
+        elif df['vote_average'].isnull().sum() > 0:
             median_rating = df['vote_average'].median()
             filled = df['vote_average'].isnull().sum()
             df['vote_average'] = df['vote_average'].fillna(median_rating)
@@ -367,8 +994,8 @@ class DataCleaner:
             if filled > 0:
                 self.log(f"Filled {filled} missing values in {field} with empty string")
         
-        final_nulls = df.isnull().sum().sum()
-        self.stats['filled_missing_values'] = initial_nulls - final_nulls
+        final_nulls = df.isnull().sum().sum() - deferred
+        self.stats['filled_missing_values'] += initial_nulls - final_nulls
         
         self.log(f"Remaining nulls: {final_nulls}")
         
@@ -383,7 +1010,7 @@ class DataCleaner:
         before = len(df)
         df = df[df['year'].notna() & (df['year'] >= 1900) & (df['year'] <= 2030)]
         removed = before - len(df)
-        self.stats['removed_invalid_year'] = removed
+        self.stats['removed_invalid_year'] += removed
         self.log(f"Removed {removed} rows with invalid year")
         
         # ===== RATING VALIDATION =====
@@ -417,7 +1044,7 @@ class DataCleaner:
         df = df.drop_duplicates(subset=['movie_id'], keep='first')
         
         removed = before - len(df)
-        self.stats['removed_duplicates'] = removed
+        self.stats['removed_duplicates'] += removed
         self.log(f"Removed {removed} duplicate records")
         
         return df
@@ -427,35 +1054,10 @@ class DataCleaner:
         self.log("\nFinalizing dataset...")
         
         # Select and reorder columns
-        final_columns = [
-            'movie_id',
-            'title',
-            'original_title',
-            'year',
-            'runtime',
-            'genres',
-            'director',
-            'cast',
-            'overview',
-            'clean_overview',
-            'tagline',
-            'keywords',
-            'clean_text',
-            'vote_average',
-            'vote_count',
-            'popularity',
-            'budget',
-            'revenue',
-            'review_count',
-            'status',
-            'original_language',
-            'release_date'
-        ]
-        
-        df = df[final_columns]
-        
-        # Sort by popularity
-        df = df.sort_values('popularity', ascending=False)
+        df = df[self.final_columns]
+        
+        # Sort by popularity (stable, so ties keep input order like the streaming merge)
+        df = df.sort_values('popularity', ascending=False, kind='mergesort')
         
         # Reset index
         df = df.reset_index(drop=True)
@@ -466,8 +1068,14 @@ class DataCleaner:
         
         return df
     
-    def generate_report(self, df):
-        """สร้าง data quality report"""
+    def generate_report(self, profile):
+        """
+        สร้าง data quality report
+
+        Args:
+            profile (QualityProfile): sketches of the final dataset, built while
+                it was written; the report never reads the data itself
+        """
         self.log("\nGenerating data quality report...")
         
         report = []
@@ -498,25 +1106,23 @@ class DataCleaner:
         report.append(f"Removed invalid year: {self.stats['removed_invalid_year']}")
         report.append(f"Filled missing values: {self.stats['filled_missing_values']}")
         
+        if profile is None:
+            report.append("\n" + "="*80)
+            return '\n'.join(report)
+        
         # ===== COMPLETENESS ANALYSIS =====
         
         report.append("\n" + "="*80)
         report.append("COMPLETENESS ANALYSIS")
         report.append("="*80)
         
-        total_records = len(df)
+        total_records = max(profile.rows, 1)
         
-        for col in df.columns:
-            null_count = df[col].isnull().sum()
-            null_pct = (null_count / total_records) * 100
-            
-            empty_count = (df[col] == '').sum() if df[col].dtype == 'object' else 0
-            empty_pct = (empty_count / total_records) * 100
-            
+        for col, column in profile.columns.items():
             report.append(f"\n{col}:")
-            report.append(f"  Null: {null_count} ({null_pct:.2f}%)")
-            if df[col].dtype == 'object':
-                report.append(f"  Empty: {empty_count} ({empty_pct:.2f}%)")
+            report.append(f"  Null: {column.nulls} ({column.nulls / total_records * 100:.2f}%)")
+            if column.kind != 'numeric':
+                report.append(f"  Empty: {column.empties} ({column.empties / total_records * 100:.2f}%)")
         
         # ===== DESCRIPTIVE STATISTICS =====
         
@@ -527,8 +1133,9 @@ class DataCleaner:
         numeric_cols = ['year', 'runtime', 'vote_average', 'vote_count', 
                        'popularity', 'budget', 'revenue', 'review_count']
         
-        desc = df[numeric_cols].describe()
+        desc = pd.DataFrame({col: profile[col].describe() for col in numeric_cols})
         report.append("\n" + desc.to_string())
+        report.append(f"(quartiles are approximate, within {QUANTILE_ALPHA:.0%} relative error)")
         
         # ===== CATEGORICAL FIELDS =====
         
@@ -538,14 +1145,12 @@ class DataCleaner:
         
         # Top languages
         report.append("\nTop 10 Languages:")
-        lang_counts = df['original_language'].value_counts().head(10)
-        for lang, count in lang_counts.items():
+        for lang, count in profile['original_language'].top.top(10):
             report.append(f"  {lang}: {count} ({count/total_records*100:.2f}%)")
         
         # Status distribution
         report.append("\nStatus Distribution:")
-        status_counts = df['status'].value_counts()
-        for status, count in status_counts.items():
+        for status, count in profile['status'].top.top():
             report.append(f"  {status}: {count} ({count/total_records*100:.2f}%)")
         
         # ===== TEXT FIELDS ANALYSIS =====
@@ -554,15 +1159,12 @@ class DataCleaner:
         report.append("TEXT FIELDS ANALYSIS")
         report.append("="*80)
         
-        report.append(f"\nclean_text:")
-        report.append(f"  Avg length: {df['clean_text'].str.len().mean():.0f} characters")
-        report.append(f"  Min length: {df['clean_text'].str.len().min():.0f}")
-        report.append(f"  Max length: {df['clean_text'].str.len().max():.0f}")
-        
-        report.append(f"\nclean_overview:")
-        report.append(f"  Avg length: {df['clean_overview'].str.len().mean():.0f} characters")
-        report.append(f"  Min length: {df['clean_overview'].str.len().min():.0f}")
-        report.append(f"  Max length: {df['clean_overview'].str.len().max():.0f}")
+        for col in ['clean_text', 'clean_overview']:
+            lengths = profile[col].moments
+            report.append(f"\n{col}:")
+            report.append(f"  Avg length: {lengths.mean:.0f} characters")
+            report.append(f"  Min length: {lengths.min:.0f}")
+            report.append(f"  Max length: {lengths.max:.0f}")
         
         # ===== DATA QUALITY ISSUES =====
         
@@ -571,19 +1173,19 @@ class DataCleaner:
         report.append("="*80)
         
         # Movies with no reviews
-        no_reviews = (df['review_count'] == 0).sum()
+        no_reviews = profile['review_count'].quantiles.zeros
         report.append(f"\nMovies with no reviews: {no_reviews} ({no_reviews/total_records*100:.2f}%)")
         
         # Movies with no budget info
-        no_budget = (df['budget'] == 0).sum()
+        no_budget = profile['budget'].quantiles.zeros
         report.append(f"Movies with no budget info: {no_budget} ({no_budget/total_records*100:.2f}%)")
         
         # Movies with no revenue info
-        no_revenue = (df['revenue'] == 0).sum()
+        no_revenue = profile['revenue'].quantiles.zeros
         report.append(f"Movies with no revenue info: {no_revenue} ({no_revenue/total_records*100:.2f}%)")
         
         # Movies with low vote count
-        low_votes = (df['vote_count'] < 10).sum()
+        low_votes = profile['vote_count'].below
         report.append(f"Movies with <10 votes: {low_votes} ({low_votes/total_records*100:.2f}%)")
         
         # ===== RECOMMENDATIONS =====
@@ -614,11 +1216,28 @@ class DataCleaner:
         """บันทึกผลลัพธ์"""
         self.log("\nSaving results...")
         
+        # Save Parquet parts
+        writer = CleanedWriter(CLEANED_DIR, self.final_columns)
+        writer.write(df)
+        writer.close()
+        self.log(f"✅ Saved: {CLEANED_DIR}")
+        self.log(f"   Size: {writer.size() / 1024:.2f} KB")
+        
         # Save CSV
-        df.to_csv(OUTPUT_FILE, index=False, encoding='utf-8')
-        self.log(f"✅ Saved: {OUTPUT_FILE}")
-        self.log(f"   Size: {OUTPUT_FILE.stat().st_size / 1024:.2f} KB")
+        if WRITE_CSV:
+            df.to_csv(OUTPUT_FILE, index=False, encoding='utf-8')
+            self.log(f"✅ Saved: {OUTPUT_FILE}")
+            self.log(f"   Size: {OUTPUT_FILE.stat().st_size / 1024:.2f} KB")
         
+        self.save_report(report)
+    
+    def save_profile(self, profile):
+        """บันทึก quality profile (visualize_quality.py renders its charts from it)"""
+        profile.save(PROFILE_FILE)
+        self.log(f"✅ Saved: {PROFILE_FILE}")
+    
+    def save_report(self, report):
+        """บันทึก report และ cleaning log"""
         # Save report
         with open(REPORT_FILE, 'w', encoding='utf-8') as f:
             f.write(report)
@@ -646,13 +1265,15 @@ class DataCleaner:
         movies_df = self.process_movies(movies_raw)
         
         # Aggregate reviews
-        reviews_df = self.aggregate_reviews(reviews_raw)
+        reviews = self.aggregate_reviews(reviews_raw)
         
         # Merge
-        merged_df = self.merge_data(movies_df, reviews_df)
+        merged_df = self.merge_data(movies_df, reviews)
         
         # Create clean_text
         merged_df = self.create_clean_text(merged_df)
+        self.close_pool()
+        self.close_text_cache()
         
         # Handle missing values
         merged_df = self.handle_missing_values(merged_df)
@@ -666,8 +1287,11 @@ class DataCleaner:
         # Finalize
         final_df = self.finalize_dataset(merged_df)
         
-        # Generate report
-        report = self.generate_report(final_df)
+        # Profile (one pass over the final columns) + report
+        profile = QualityProfile()
+        profile.update(final_df)
+        self.save_profile(profile)
+        report = self.generate_report(profile)
         
         # Save
         self.save_results(final_df, report)
@@ -676,17 +1300,258 @@ class DataCleaner:
         print("✅ DATA CLEANING COMPLETE")
         print("="*80)
         print(f"\nOutput files:")
-        print(f"1. {OUTPUT_FILE}")
+        print(f"1. {CLEANED_DIR}" + (f" (+ {OUTPUT_FILE})" if WRITE_CSV else ""))
         print(f"2. {REPORT_FILE}")
         print(f"3. {OUTPUT_DIR / 'cleaning_log.txt'}")
         
         return final_df
 
+    # ----------------------------
+    # Streaming mode
+    # ----------------------------
+    def iter_raw(self, sources, columns, chunk_size, as_table=False):
+        """เหมือน load_raw แต่ส่งคืนทีละ chunk ขนาด chunk_size (legacy JSON ต้องโหลดทั้งไฟล์)"""
+        for path in sources:
+            if path.exists():
+                self.log(f"Streaming {path}")
+                if as_table and path.is_dir():
+                    yield from iter_raw_tables(path, columns, chunk_size)
+                    return
+                if path.suffix == '.json':
+                    with open(path, 'r', encoding='utf-8') as f:
+                        batches = [json.load(f)]
+                else:
+                    batches = iter_raw_records(path, columns, chunk_size)
+
+                # Parquet parts are small; regroup them into full chunks
+                buffer = []
+                for batch in batches:
+                    buffer.extend(batch)
+                    while len(buffer) >= chunk_size:
+                        yield buffer[:chunk_size]
+                        buffer = buffer[chunk_size:]
+                if buffer:
+                    yield buffer
+                return
+        raise FileNotFoundError(f"No raw data found in: {', '.join(str(p) for p in sources)}")
+
+    def count_raw(self, sources):
+        """Records in the first existing source (legacy JSON has to be loaded)"""
+        for path in sources:
+            if path.exists():
+                if path.suffix == '.json':
+                    with open(path, 'r', encoding='utf-8') as f:
+                        return len(json.load(f))
+                return count_raw_records(path)
+        raise FileNotFoundError(f"No raw data found in: {', '.join(str(p) for p in sources)}")
+
+    def clean_chunk(self, movies_raw, reviews, seqs, vote_average_values):
+        """
+        ทำความสะอาด movies หนึ่ง bucket ด้วยขั้นตอนเดียวกับ run()
+
+        Args:
+            movies_raw (list | pa.Table): raw movie records, every copy of each movie, in raw order
+            reviews (ReviewAggregator): review statistics of the same movies
+            seqs (ndarray): position of each record in the raw input
+            vote_average_values (SpilledColumn): see handle_missing_values
+
+        Returns:
+            DataFrame: final_columns plus _seq (raw position), sorted like finalize_dataset
+        """
+        movies_df = self.process_movies(movies_raw)
+        movies_df['_seq'] = seqs
+        if movies_df['year'].dtype == object:
+            # a chunk without a single valid date; keep the comparisons numeric
+            movies_df['year'] = pd.to_numeric(movies_df['year'])
+
+        df = self.merge_data(movies_df, reviews)
+        df = self.create_clean_text(df)
+        df = self.handle_missing_values(df, vote_average_values)
+        df = self.validate_data(df)
+        # the bucket holds every copy of its movies, so keep='first' matches run()
+        df = self.remove_duplicates(df)
+
+        df = df[self.final_columns + ['_seq']]
+        return df.sort_values(['popularity', '_seq'], ascending=[False, True], kind='mergesort')
+
+    @staticmethod
+    def _write_run(df, path, block_rows=RUN_BLOCK_ROWS):
+        """Sorted run: consecutive pickled slices so the merge reads one slice at a time"""
+        with open(path, 'wb') as f:
+            for start in range(0, len(df), block_rows):
+                pickle.dump(df.iloc[start:start + block_rows], f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _iter_run(path):
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    block = pickle.load(f)
+                except EOFError:
+                    return
+                yield from block.itertuples(index=False, name=None)
+
+    def _merged_blocks(self, runs, dtypes, median_rating, block_size):
+        """k-way merge of the sorted runs into DataFrames of block_size rows"""
+        columns = self.final_columns + ['_seq']
+        popularity = columns.index('popularity')
+        seq = columns.index('_seq')
+        rows = heapq.merge(*[self._iter_run(run) for run in runs],
+                           key=lambda row: (-row[popularity], row[seq]))
+
+        def to_frame(block):
+            df = pd.DataFrame(block, columns=columns).drop(columns='_seq')
+            for col, dtype in dtypes.items():
+                if dtype is not None and df[col].dtype != dtype:
+                    df[col] = df[col].astype(dtype)
+            if median_rating is not None:
+                df['vote_average'] = df['vote_average'].fillna(median_rating)
+            # same clip as validate_data, for the filled values
+            df.loc[df['vote_average'] < 0, 'vote_average'] = 0
+            df.loc[df['vote_average'] > 10, 'vote_average'] = 10
+            return df
+
+        block = []
+        for row in rows:
+            block.append(row)
+            if len(block) >= block_size:
+                yield to_frame(block)
+                block = []
+        if block:
+            yield to_frame(block)
+
+    def run_streaming(self, chunk_size=CHUNK_SIZE):
+        """
+        รัน cleaning pipeline แบบ streaming (memory คงที่ตามขนาด chunk)
+
+        Movies and reviews are first spilled to disk in buckets by movie_id
+        (about chunk_size movies per bucket, at most MAX_BUCKETS), so every
+        copy of a movie and all of its reviews share a bucket. Each bucket is
+        then cleaned on its own (its reviews aggregated, duplicates dropped),
+        sorted and spilled to a temporary run, and the runs are merged by
+        (popularity desc, raw position), which is exactly the stable
+        popularity sort of run(). The vote_average median is taken from a
+        spilled column (SpilledColumn), so no state grows with the input.
+
+        Returns:
+            int: number of rows written to CLEANED_DIR
+        """
+        print("="*80)
+        print(f"DATA CLEANING & INTEGRATION PIPELINE (STREAMING, {chunk_size} movies per chunk)")
+        print("="*80)
+
+        sources = [RAW_MOVIES_DIR, RAW_MOVIES_JSONL, RAW_MOVIES]
+        review_sources = [RAW_REVIEWS_DIR, RAW_REVIEWS_JSONL, RAW_REVIEWS]
+        num_buckets = max(1, min(MAX_BUCKETS, -(-self.count_raw(sources) // chunk_size)))
+        delta = self.load_delta()
+        dtypes = {}
+        written = 0
+        with tempfile.TemporaryDirectory(prefix='.runs-', dir=OUTPUT_DIR) as tmp:
+            # 1) partition by movie_id (refreshed movies from the delta replace their old records)
+            self.log(f"\nPartitioning movies and reviews into {num_buckets} buckets...")
+            movie_spill = BucketSpill(tmp, 'movies', num_buckets)
+            offset = 0
+            chunks = self.iter_raw(sources, RAW_MOVIE_COLUMNS, chunk_size, as_table=True)
+            for movies_raw in map(delta.apply_movies, chunks):
+                movie_spill.add_movies(movies_raw, np.arange(offset, offset + len(movies_raw)))
+                offset += len(movies_raw)
+            movie_spill.close()
+            self.stats['initial_movies'] += offset
+
+            # same review text cap as run(): the text goes into clean_text
+            review_spill = BucketSpill(tmp, 'reviews', num_buckets)
+            num_reviews = 0
+            for batch in delta.apply_reviews(self.iter_raw(review_sources, self.review_columns(), chunk_size)):
+                review_spill.add_records(batch, 'movie_id')
+                num_reviews += len(batch)
+            review_spill.close()
+            self.stats['initial_reviews'] += num_reviews
+
+            # 2) clean bucket by bucket into sorted runs
+            vote_average_values = SpilledColumn(Path(tmp) / 'vote_average.f8', chunk_size)
+            runs = []
+            run_block_rows = max(1, min(RUN_BLOCK_ROWS, chunk_size // num_buckets))
+            reviewed_movies = 0
+            for bucket in range(num_buckets):
+                pieces = list(movie_spill.read(bucket))
+                if not pieces:
+                    continue
+                seqs = np.concatenate([piece[0] for piece in pieces])
+                if isinstance(pieces[0][1], pa.Table):
+                    movies_raw = pa.concat_tables([piece[1] for piece in pieces])
+                else:
+                    movies_raw = [movie for piece in pieces for movie in piece[1]]
+                del pieces
+                reviews = ReviewAggregator(REVIEW_MAX_CHARS, self.review_ratings)
+                for batch in review_spill.read(bucket):
+                    reviews.add(batch)
+                reviewed_movies += len(reviews)
+
+                self.quiet = True
+                try:
+                    chunk = self.clean_chunk(movies_raw, reviews, seqs, vote_average_values)
+                finally:
+                    self.quiet = False
+                del movies_raw, reviews
+
+                # dtypes come from every bucket, also fully filtered ones, like one big frame
+                for col in self.final_columns:
+                    dtypes.setdefault(col, []).append(chunk[col].dtype)
+                if len(chunk):
+                    run = Path(tmp) / f"run-{len(runs):05d}.pkl"
+                    self._write_run(chunk, run, run_block_rows)
+                    runs.append(run)
+                self.log(f"Bucket {bucket + 1}/{num_buckets}: {len(seqs)} movies -> {len(chunk)} rows")
+            self.close_pool()
+            self.close_text_cache()
+            self.log(f"Aggregated {num_reviews} reviews for {reviewed_movies} movies")
+
+            dtypes = {col: promote_dtype(found) for col, found in dtypes.items()}
+
+            median_rating = vote_average_values.median()
+            vote_average_values.close()
+            if median_rating is not None:
+                self.log(f"Missing vote_average filled with median: {median_rating:.2f}")
+
+            self.log("\nMerging sorted runs...")
+            writer = CleanedWriter(CLEANED_DIR, self.final_columns)
+            profile = QualityProfile()
+            for df in self._merged_blocks(runs, dtypes, median_rating, chunk_size):
+                writer.write(df)
+                profile.update(df)
+                if WRITE_CSV:
+                    df.to_csv(OUTPUT_FILE, index=False, encoding='utf-8',
+                              mode='w' if written == 0 else 'a', header=written == 0)
+                written += len(df)
+            writer.close()
+
+        if written == 0 and WRITE_CSV:
+            pd.DataFrame(columns=self.final_columns).to_csv(OUTPUT_FILE, index=False, encoding='utf-8')
+
+        self.stats['final_records'] = written
+        self.log(f"Final dataset: {written} rows")
+        self.log(f"✅ Saved: {CLEANED_DIR}")
+        if WRITE_CSV:
+            self.log(f"✅ Saved: {OUTPUT_FILE}")
+
+        self.save_profile(profile)
+        self.save_report(self.generate_report(profile))
+
+        print("\n" + "="*80)
+        print("✅ DATA CLEANING COMPLETE (STREAMING)")
+        print("="*80)
+        return written
+
 
 def main():
     """Main execution"""
     cleaner = DataCleaner()
-    df = cleaner.run()
+    if sys.argv[1:] == ["stream"]:
+        # python scripts/clean_data.py stream
+        cleaner.run_streaming()
+        df = read_cleaned(columns=['title', 'year', 'genres', 'vote_average', 'vote_count', 'clean_text'], rows=3)
+    else:
+        df = cleaner.run()
     
     # Show sample
     print("\n📄 Sample Records (first 3):")
@@ -0,0 +1,172 @@
+"""
+Cleaned dataset as partitioned Parquet (data/cleaned/movies/part-*.parquet)
+
+DataCleaner writes the final dataset through CleanedWriter with an explicit
+compact schema: int32 ids and years, float32 metrics, dictionary-encoded
+(categorical) status and language, and native list<string> genres and
+keywords. Downstream scripts read it with read_cleaned(columns=[...]), so
+only the columns they use are decoded and nothing is re-inferred from CSV.
+"""
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from raw_store import COMPRESSION, PART_PATTERN
+
+CLEANED_DIR = Path("data/cleaned/movies")
+CLEANED_CSV = Path("data/cleaned/cleaned_movies.csv")
+
+# Rows per part file
+PART_ROWS = 100000
+
+# Bump when a column is added, removed or changes type
+SCHEMA_VERSION = 1
+SCHEMA_VERSION_KEY = b"micro_genre.cleaned_schema_version"
+
+_TEXT_LIST = pa.list_(pa.string())
+
+CLEANED_SCHEMA = pa.schema([
+    ("movie_id", pa.int32()),
+    ("title", pa.string()),
+    ("original_title", pa.string()),
+    ("year", pa.int32()),
+    ("runtime", pa.float32()),
+    ("genres", _TEXT_LIST),
+    ("director", pa.string()),
+    ("cast", pa.string()),
+    ("overview", pa.string()),
+    ("clean_overview", pa.string()),
+    ("tagline", pa.string()),
+    ("keywords", _TEXT_LIST),
+    ("clean_text", pa.string()),
+    ("vote_average", pa.float32()),
+    ("vote_count", pa.int32()),
+    ("popularity", pa.float32()),
+    ("budget", pa.int64()),
+    ("revenue", pa.int64()),
+    ("review_count", pa.int32()),
+    # only with CLEAN_REVIEW_RATINGS=1
+    ("review_rating_count", pa.int32()),
+    ("review_rating_mean", pa.float32()),
+    ("status", pa.dictionary(pa.int8(), pa.string())),
+    ("original_language", pa.dictionary(pa.int16(), pa.string())),
+    ("release_date", pa.string()),
+])
+
+
+def cleaned_schema(columns):
+    """CLEANED_SCHEMA restricted to columns (in that order), tagged with SCHEMA_VERSION"""
+    return pa.schema([CLEANED_SCHEMA.field(name) for name in columns],
+                     metadata={SCHEMA_VERSION_KEY: str(SCHEMA_VERSION).encode()})
+
+
+class CleanedWriter:
+    """
+    Write DataFrames of the final dataset as consecutive Parquet parts
+
+    Parts go to a hidden sibling directory that replaces path on close(),
+    so readers never see a half-written dataset.
+    """
+
+    def __init__(self, path=CLEANED_DIR, columns=None, part_rows=PART_ROWS):
+        self.path = Path(path)
+        self.columns = columns
+        self.part_rows = part_rows
+        self.rows = 0
+        self._parts = 0
+        self._tmp = self.path.with_name("." + self.path.name + ".tmp")
+        shutil.rmtree(self._tmp, ignore_errors=True)
+        self._tmp.mkdir(parents=True)
+
+    def write(self, df):
+        """Append df (columns in the writer's order) as one or more parts"""
+        if self.columns is None:
+            self.columns = list(df.columns)
+        schema = cleaned_schema(self.columns)
+        for start in range(0, len(df), self.part_rows):
+            block = df.iloc[start:start + self.part_rows][self.columns]
+            table = pa.Table.from_pandas(block, schema=schema, preserve_index=False)
+            self._write_table(table.replace_schema_metadata(schema.metadata))
+            self.rows += len(block)
+
+    def _write_table(self, table):
+        pq.write_table(table, self._tmp / f"part-{self._parts:05d}.parquet", compression=COMPRESSION)
+        self._parts += 1
+
+    def close(self):
+        """Publish the parts (an empty dataset still gets one part with the schema)"""
+        if self._parts == 0 and self.columns is not None:
+            self._write_table(cleaned_schema(self.columns).empty_table())
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self._tmp, self.path)
+
+    def size(self):
+        """Bytes on disk of the published dataset"""
+        return sum(part.stat().st_size for part in self.path.glob(PART_PATTERN))
+
+
+def cleaned_columns(path=CLEANED_DIR, csv_path=CLEANED_CSV):
+    """Column names of the cleaned dataset, from the Parquet schema (or the CSV header)"""
+    path = Path(path)
+    parts = sorted(path.glob(PART_PATTERN)) if path.is_dir() else []
+    if parts:
+        return pq.read_schema(parts[0]).names
+    if csv_path is not None and Path(csv_path).exists():
+        return list(pd.read_csv(csv_path, nrows=0).columns)
+    raise FileNotFoundError(f"{path} not found. Run: python scripts/clean_data.py")
+
+
+def _read_head(parts, columns, rows):
+    """First rows of the parts, decoding only the record batches that hold them"""
+    batches, left = [], rows
+    for part in parts:
+        for batch in pq.ParquetFile(part).iter_batches(batch_size=max(left, 1), columns=columns):
+            batches.append(batch.slice(0, left))
+            left -= batches[-1].num_rows
+            if left <= 0:
+                return pa.Table.from_batches(batches)
+    # fewer rows than asked for (the parts are small)
+    return pa.Table.from_batches(batches) if batches else pq.read_table(parts[0], columns=columns)
+
+
+def read_cleaned(path=CLEANED_DIR, columns=None, csv_path=CLEANED_CSV, rows=None):
+    """
+    โหลด cleaned dataset (เฉพาะ columns ที่ต้องใช้)
+
+    Args:
+        path: Parquet part directory written by clean_data.py
+        columns (list): columns to read (None = all)
+        csv_path: cleaned_movies.csv of an older clean_data.py, used when path does not exist
+        rows (int): only the first rows, e.g. for a preview (None = all)
+
+    Returns:
+        DataFrame: genres / keywords as lists, status / original_language as categoricals
+    """
+    path = Path(path)
+    if not path.is_dir():
+        if csv_path is not None and Path(csv_path).exists():
+            print(f"[WARN] {path} not found, reading {csv_path} (lists come back as strings)")
+            return pd.read_csv(csv_path, usecols=columns, nrows=rows)
+        raise FileNotFoundError(f"{path} not found. Run: python scripts/clean_data.py")
+
+    parts = sorted(path.glob(PART_PATTERN))
+    if not parts:
+        raise FileNotFoundError(f"No Parquet parts in {path}")
+    version = (pq.read_schema(parts[0]).metadata or {}).get(SCHEMA_VERSION_KEY)
+    if version != str(SCHEMA_VERSION).encode():
+        raise ValueError(f"{path} has cleaned schema version {version and version.decode()}, "
+                         f"expected {SCHEMA_VERSION}. Rerun: python scripts/clean_data.py")
+
+    if rows is None:
+        table = pa.concat_tables([pq.read_table(part, columns=columns) for part in parts])
+    else:
+        table = _read_head(parts, columns, rows)
+    df = table.to_pandas()
+    for name in table.column_names:
+        if pa.types.is_list(table.schema.field(name).type):
+            df[name] = table.column(name).to_pylist()
+    return df
@@ -0,0 +1,143 @@
+"""
+KMeans backends for perform_kmeans and the K sweep
+
+    full        sklearn KMeans on the whole matrix (every Lloyd iteration
+                touches all rows, which must be in memory)
+    minibatch   StreamingKMeans: sklearn MiniBatchKMeans fed block by block,
+                so the matrix can stay a memory-mapped file
+
+StreamingKMeans starts from k-means++ centers of a random row sample, then
+makes `epochs` passes over the rows BLOCK_ROWS at a time (blocks in random
+order, rows shuffled inside a block) with one partial_fit per mini-batch.
+Labels and inertia come from a final blockwise pass over every row, so they
+are exact for the fitted centers. partial_fit() keeps updating the same
+centers with new movies without refitting.
+
+fit_kmeans(vectors, k, backend) returns a model with labels_,
+cluster_centers_ and inertia_ for either backend.
+"""
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+from vector_store import BLOCK_ROWS, dequantize
+
+BACKENDS = ("full", "minibatch")
+MINIBATCH_SIZE = 4096
+MINIBATCH_EPOCHS = 3
+# rows sampled for the k-means++ start
+INIT_ROWS = 20000
+# stop early once no center moves more than this (relative to the mean center norm) in an epoch
+MINIBATCH_TOL = 1e-3
+
+
+def _blocks(vectors, header=None, block_rows=BLOCK_ROWS, order=None):
+    """(start, float32 block) over the rows, dequantized when header (from read_vectors) is given"""
+    starts = range(0, len(vectors), block_rows) if order is None else order
+    for start in starts:
+        block = vectors[start:start + block_rows]
+        yield start, dequantize(block, header) if header is not None else np.asarray(block, dtype=np.float32)
+
+
+class StreamingKMeans:
+    """
+    Mini-batch KMeans over row blocks of a (memory-mapped) matrix
+
+    Args:
+        n_clusters (int): k
+        random_state (int): seed for the init sample, block order and mini-batches
+        batch_size (int): rows per partial_fit
+        epochs (int): passes over the rows
+        init: (k, d) starting centers instead of k-means++ on a sample
+        block_rows (int): rows read (and dequantized) at a time
+    """
+
+    def __init__(self, n_clusters, random_state=42, batch_size=MINIBATCH_SIZE, epochs=MINIBATCH_EPOCHS, init=None,
+                 block_rows=BLOCK_ROWS, tol=MINIBATCH_TOL):
+        self.n_clusters = n_clusters
+        self.random_state = random_state
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.init = init
+        self.block_rows = block_rows
+        self.tol = tol
+        self._model = None
+        self._start_centers = None
+        self.labels_ = None
+        self.inertia_ = None
+        self.n_epochs_ = 0
+
+    @property
+    def cluster_centers_(self):
+        # MiniBatchKMeans has no centers before its first partial_fit
+        return getattr(self._model, "cluster_centers_", self._start_centers)
+
+    def _start(self, vectors, header, rng):
+        if self.init is not None:
+            centers = np.asarray(self.init, dtype=np.float32)
+        else:
+            rows = np.sort(rng.choice(len(vectors), min(len(vectors), max(INIT_ROWS, self.n_clusters)), replace=False))
+            sample = dequantize(vectors[rows], header) if header is not None else np.asarray(vectors[rows], np.float32)
+            centers = KMeans(n_clusters=self.n_clusters, random_state=self.random_state, n_init=1).fit(sample) \
+                .cluster_centers_
+        self._start_centers = centers
+        self._model = MiniBatchKMeans(n_clusters=self.n_clusters, init=centers, n_init=1,
+                                      batch_size=self.batch_size, random_state=self.random_state)
+
+    def partial_fit(self, block):
+        """Update the centers with new rows (labels_ / inertia_ are not recomputed)"""
+        block = np.asarray(block, dtype=np.float32)
+        if self._model is None:
+            self._start(block, None, np.random.default_rng(self.random_state))
+        for start in range(0, len(block), self.batch_size):
+            self._model.partial_fit(block[start:start + self.batch_size])
+        return self
+
+    def fit(self, vectors, header=None):
+        """Fit on every row of vectors (an array, memmap, or read_vectors' matrix with its header)"""
+        rng = np.random.default_rng(self.random_state)
+        self._start(vectors, header, rng)
+        starts = np.arange(0, len(vectors), self.block_rows)
+        for epoch in range(self.epochs):
+            previous = np.array(self.cluster_centers_)
+            for _, block in _blocks(vectors, header, self.block_rows, rng.permutation(starts)):
+                self.partial_fit(block[rng.permutation(len(block))])
+            self.n_epochs_ = epoch + 1
+            shift = np.sqrt(((self.cluster_centers_ - previous) ** 2).sum(axis=1)).max()
+            if shift <= self.tol * max(np.linalg.norm(previous, axis=1).mean(), 1e-12):
+                break
+        self.labels_, self.inertia_ = self.assign(vectors, header)
+        return self
+
+    def assign(self, vectors, header=None):
+        """(labels, inertia) of rows against the current centers, block by block"""
+        centers = np.asarray(self.cluster_centers_, dtype=np.float32)
+        center_norms = (centers * centers).sum(axis=1)[None, :]
+        labels = np.zeros(len(vectors), dtype=np.int64)
+        inertia = 0.0
+        for start, block in _blocks(vectors, header, self.block_rows):
+            distances = np.maximum((block * block).sum(axis=1)[:, None] - 2 * block @ centers.T + center_norms, 0)
+            nearest = distances.argmin(axis=1)
+            labels[start:start + len(block)] = nearest
+            inertia += float(distances[np.arange(len(block)), nearest].sum())
+        return labels, inertia
+
+    def predict(self, vectors, header=None):
+        return self.assign(vectors, header)[0]
+
+
+def fit_kmeans(vectors, k, backend="full", random_state=42, n_init=10, init=None, header=None):
+    """
+    KMeans with k clusters on the chosen backend
+
+    init (k x d centers) fits once from them; header (from read_vectors)
+    lets the minibatch backend read a quantized artifact directly.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend}")
+    if backend == "minibatch":
+        return StreamingKMeans(k, random_state=random_state, init=init).fit(vectors, header)
+    if header is not None:
+        vectors = dequantize(vectors, header)
+    if init is not None:
+        return KMeans(n_clusters=k, init=init, n_init=1, random_state=random_state).fit(vectors)
+    return KMeans(n_clusters=k, random_state=random_state, n_init=n_init).fit(vectors)
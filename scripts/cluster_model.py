@@ -0,0 +1,283 @@
+"""
+Persisted micro-genre model (data/processed/cluster_model.*)
+
+cluster_and_keywords1.py saves what is needed to place a movie without
+reclustering:
+
+    cluster_model.json            k, feature mode, embedding model, cluster ids,
+                                  labels, drift counters
+    cluster_model.npz             centroids, per-cluster training size and
+                                  RADIUS_QUANTILE distance to the centroid
+    cluster_model.transforms.joblib
+                                  fitted TF-IDF / PCA of the hybrid features
+                                  (feature modes other than emb_only)
+
+Cluster ids are stable: a new model's centroids are matched to the previous
+model's (nearest pairs first), matched clusters keep their old id and only
+new clusters get fresh ids, so micro-genre labels keyed by id survive a
+recluster.
+
+assign() puts rows into the nearest centroid and counts them for drift():
+
+    outlier_rate  share of assigned rows farther from their centroid than
+                  that cluster's training RADIUS_QUANTILE (expected 1 - quantile)
+    psi           population stability index of assigned vs training
+                  cluster shares
+    new_share     assigned rows relative to the training rows
+
+A full recluster is recommended once any of them passes its DRIFT_* limit.
+"""
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from vector_store import dequantize
+
+CLUSTER_MODEL_PATH = Path("data/processed/cluster_model")
+CLUSTER_MODEL_VERSION = 1
+RADIUS_QUANTILE = 0.95
+NUMERIC_FEATURES = ["desc_length", "num_keywords", "sentiment_score"]
+
+# drift limits that call for a full recluster
+DRIFT_OUTLIER_RATE = 0.15
+DRIFT_PSI = 0.25
+DRIFT_NEW_SHARE = 0.25
+# below this many assigned rows outlier_rate and psi are reported but not acted on
+DRIFT_MIN_ROWS = 200
+BLOCK_ROWS = 65536
+
+
+def _files(path):
+    path = Path(path)
+    return (path.with_name(path.name + ".json"), path.with_name(path.name + ".npz"),
+            path.with_name(path.name + ".transforms.joblib"))
+
+
+def hybrid_features(emb_matrix, df, mode='emb_only', transforms=None, tfidf_max_features=2000, tfidf_weight=2.0,
+                    tfidf_pca_dim=50):
+    """
+    Feature matrix for a feature mode from embeddings (in df order) and df
+
+    transforms: dict of fitted 'tfidf' / 'pca'. Missing ones are fitted on
+    df and stored in it; given ones are only applied (new movies land in the
+    space the model was fitted in).
+    """
+    if mode == 'emb_only':
+        return emb_matrix
+    if mode not in ('emb+tfidf_pca', 'full'):
+        raise ValueError("Unknown feature mode: " + str(mode))
+    transforms = {} if transforms is None else transforms
+
+    texts = df["clean_text"].fillna("")
+    if 'tfidf' not in transforms:
+        transforms['tfidf'] = TfidfVectorizer(max_features=tfidf_max_features, stop_words="english").fit(texts)
+    tfidf_vec = transforms['tfidf'].transform(texts).toarray()
+    print(f"[INFO] TF-IDF raw shape = {tfidf_vec.shape}")
+
+    numeric_vec = df[NUMERIC_FEATURES].values if set(NUMERIC_FEATURES).issubset(df.columns) else np.zeros((len(df), 0))
+
+    if mode == 'emb+tfidf_pca':
+        if 'pca' not in transforms:
+            print(f"[INFO] Reducing TF-IDF from {tfidf_vec.shape[1]} -> {tfidf_pca_dim} using PCA")
+            transforms['pca'] = PCA(n_components=tfidf_pca_dim, random_state=42).fit(tfidf_vec)
+        tfidf_reduced = transforms['pca'].transform(tfidf_vec)
+        hybrid_vec = np.hstack([emb_matrix, tfidf_reduced * tfidf_weight, numeric_vec])
+        print(f"[INFO] Hybrid shape = {hybrid_vec.shape} (emb + tfidf_pca + numeric)")
+        return hybrid_vec
+
+    hybrid_vec = np.hstack([emb_matrix, tfidf_vec * tfidf_weight, numeric_vec])
+    print(f"[INFO] Hybrid shape = {hybrid_vec.shape} (emb + full tfidf + numeric)")
+    return hybrid_vec
+
+
+def _nearest(vectors, centers):
+    """(row of the nearest center, euclidean distance to it) for every row, block by block"""
+    centers = np.asarray(centers, dtype=np.float64)
+    center_norms = (centers * centers).sum(axis=1)[None, :]
+    nearest = np.zeros(len(vectors), dtype=np.int64)
+    distances = np.zeros(len(vectors))
+    for start in range(0, len(vectors), BLOCK_ROWS):
+        block = np.asarray(vectors[start:start + BLOCK_ROWS], dtype=np.float64)
+        squared = np.maximum((block * block).sum(axis=1)[:, None] - 2 * block @ centers.T + center_norms, 0)
+        rows = squared.argmin(axis=1)
+        nearest[start:start + len(block)] = rows
+        distances[start:start + len(block)] = np.sqrt(squared[np.arange(len(block)), rows])
+    return nearest, distances
+
+
+class ClusterModel:
+    """
+    Centroids and state of one clustering run
+
+    Args:
+        centers: (k, d) centroids in the clustering feature space
+        cluster_ids: stable id of each centroid row (default 0..k-1)
+        radius: RADIUS_QUANTILE distance of each cluster's training rows to its centroid
+        train_counts: training rows per cluster
+        labels (dict): cluster id -> {output column: label}, e.g. micro_genre_name, micro_genre_keybert
+        meta (dict): feature_mode, embedding model / dtype, tfidf settings, ...
+        transforms (dict): fitted hybrid_features transforms
+    """
+
+    def __init__(self, centers, cluster_ids=None, radius=None, train_counts=None, labels=None, meta=None,
+                 transforms=None, drift_counts=None, drift_outliers=0):
+        self.centers = np.asarray(centers, dtype=np.float32)
+        k = len(self.centers)
+        self.cluster_ids = np.arange(k) if cluster_ids is None else np.asarray(cluster_ids, dtype=np.int64)
+        self.radius = np.full(k, np.inf) if radius is None else np.asarray(radius, dtype=float)
+        self.train_counts = np.zeros(k, dtype=np.int64) if train_counts is None else \
+            np.asarray(train_counts, dtype=np.int64)
+        self.labels = dict(labels or {})
+        self.meta = dict(meta or {})
+        self.transforms = dict(transforms or {})
+        self.drift_counts = np.zeros(k, dtype=np.int64) if drift_counts is None else \
+            np.asarray(drift_counts, dtype=np.int64)
+        self.drift_outliers = int(drift_outliers)
+
+    @property
+    def k(self):
+        return len(self.centers)
+
+    @classmethod
+    def from_fit(cls, vectors, labels, centers, header=None, **kwargs):
+        """
+        Model of a fitted clustering: training sizes and radii from its rows (labels are centroid rows)
+
+        header (from read_vectors): vectors is the stored artifact, dequantized block by block
+        """
+        labels = np.asarray(labels)
+        centers = np.asarray(centers, dtype=np.float64)
+        distances = np.zeros(len(labels))
+        for start in range(0, len(labels), BLOCK_ROWS):
+            block = vectors[start:start + BLOCK_ROWS]
+            block = np.asarray(dequantize(block, header) if header is not None else block, dtype=np.float64)
+            distances[start:start + len(block)] = np.linalg.norm(block - centers[labels[start:start + len(block)]],
+                                                                 axis=1)
+        counts = np.bincount(labels, minlength=len(centers))
+        order = np.argsort(labels, kind='stable')
+        radius = np.array([np.quantile(part, RADIUS_QUANTILE) if len(part) else 0.0
+                           for part in np.split(distances[order], np.cumsum(counts)[:-1])])
+        return cls(centers, radius=radius, train_counts=counts, **kwargs)
+
+    def match_ids(self, previous):
+        """
+        Give clusters the ids of the nearest clusters of previous (a ClusterModel or None)
+
+        Returns {centroid row: id}; self.cluster_ids is updated. Models of
+        another feature space (dim or feature mode) keep fresh ids.
+        """
+        if previous is None or previous.centers.shape[1] != self.centers.shape[1] or \
+                previous.meta.get('feature_mode') != self.meta.get('feature_mode'):
+            return dict(enumerate(self.cluster_ids.tolist()))
+        gaps = ((self.centers[:, None, :].astype(np.float64) - previous.centers[None, :, :]) ** 2).sum(axis=2)
+        ids = np.full(self.k, -1, dtype=np.int64)
+        taken = np.zeros(previous.k, dtype=bool)
+        for pair in np.argsort(gaps, axis=None, kind='stable'):
+            row, old = divmod(int(pair), previous.k)
+            if ids[row] < 0 and not taken[old]:
+                ids[row] = previous.cluster_ids[old]
+                taken[old] = True
+        fresh = ids < 0
+        ids[fresh] = max(int(previous.cluster_ids.max()), int(ids.max())) + 1 + np.arange(fresh.sum())
+        self.cluster_ids = ids
+        return dict(enumerate(ids.tolist()))
+
+    def assign(self, vectors, track=True):
+        """
+        Nearest micro-genre of each row
+
+        Returns:
+            (cluster ids, distances to the centroid, outlier mask); with
+            track=True the rows are counted for drift()
+        """
+        rows, distances = _nearest(vectors, self.centers)
+        outliers = distances > self.radius[rows]
+        if track:
+            self.drift_counts += np.bincount(rows, minlength=self.k)
+            self.drift_outliers += int(outliers.sum())
+        return self.cluster_ids[rows], distances, outliers
+
+    def drift(self):
+        """Drift of the rows assigned since the model was fitted, and whether to recluster"""
+        assigned, trained = int(self.drift_counts.sum()), int(self.train_counts.sum())
+        expected = np.maximum(self.train_counts / max(trained, 1), 1e-4)
+        observed = np.maximum(self.drift_counts / max(assigned, 1), 1e-4)
+        report = {
+            'assigned': assigned,
+            'outlier_rate': self.drift_outliers / assigned if assigned else 0.0,
+            'psi': float(((observed - expected) * np.log(observed / expected)).sum()) if assigned else 0.0,
+            'new_share': assigned / max(trained, 1),
+        }
+        reasons = []
+        if assigned >= DRIFT_MIN_ROWS and report['outlier_rate'] > DRIFT_OUTLIER_RATE:
+            reasons.append(f"{report['outlier_rate']:.1%} of new movies are outside their micro-genre "
+                           f"(expected {1 - RADIUS_QUANTILE:.0%}, limit {DRIFT_OUTLIER_RATE:.0%})")
+        if assigned >= DRIFT_MIN_ROWS and report['psi'] > DRIFT_PSI:
+            reasons.append(f"micro-genre shares shifted (PSI {report['psi']:.3f} > {DRIFT_PSI})")
+        if report['new_share'] > DRIFT_NEW_SHARE:
+            reasons.append(f"{report['new_share']:.1%} of the catalogue was added after clustering "
+                           f"(limit {DRIFT_NEW_SHARE:.0%})")
+        report['recluster'] = bool(reasons)
+        report['reasons'] = reasons
+        return report
+
+    def save(self, path=CLUSTER_MODEL_PATH, arrays=True):
+        """Write the artifact (arrays=False rewrites only the header, e.g. after assign)"""
+        header_path, arrays_path, transforms_path = _files(path)
+        header_path.parent.mkdir(parents=True, exist_ok=True)
+        header = {
+            'version': CLUSTER_MODEL_VERSION, 'k': self.k, 'dim': int(self.centers.shape[1]),
+            'cluster_ids': self.cluster_ids.tolist(),
+            'labels': {str(cluster): name for cluster, name in self.labels.items()},
+            'meta': self.meta, 'transforms': sorted(self.transforms),
+            'drift_counts': self.drift_counts.tolist(), 'drift_outliers': self.drift_outliers,
+            'updated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+        writes = []
+        if arrays:
+            writes.append((arrays_path, lambda f: np.savez(f, centers=self.centers, radius=self.radius,
+                                                           train_counts=self.train_counts)))
+            if self.transforms:
+                writes.append((transforms_path, lambda f: joblib.dump(self.transforms, f)))
+            elif transforms_path.exists():
+                transforms_path.unlink()
+        # header last: a reader that finds it finds matching arrays
+        writes.append((header_path, lambda f: f.write(json.dumps(header, indent=2).encode('utf-8'))))
+        for target, write in writes:
+            tmp = target.with_name(target.name + ".tmp")
+            with open(tmp, 'wb') as f:
+                write(f)
+            os.replace(tmp, target)
+
+    @classmethod
+    def load(cls, path=CLUSTER_MODEL_PATH):
+        header_path, arrays_path, transforms_path = _files(path)
+        if not header_path.exists():
+            raise FileNotFoundError(f"{header_path} not found. Run: python scripts/areeya/cluster_and_keywords1.py")
+        with open(header_path, 'r', encoding='utf-8') as f:
+            header = json.load(f)
+        if header.get('version') != CLUSTER_MODEL_VERSION:
+            raise ValueError(f"{header_path} has version {header.get('version')}, expected {CLUSTER_MODEL_VERSION}")
+        arrays = np.load(arrays_path)
+        if arrays['centers'].shape != (header['k'], header['dim']):
+            raise ValueError(f"{arrays_path} does not match its header {header_path}")
+        transforms = joblib.load(transforms_path) if header['transforms'] else {}
+        return cls(arrays['centers'], cluster_ids=header['cluster_ids'], radius=arrays['radius'],
+                   train_counts=arrays['train_counts'],
+                   labels={int(cluster): name for cluster, name in header['labels'].items()},
+                   meta=header['meta'], transforms=transforms, drift_counts=header['drift_counts'],
+                   drift_outliers=header['drift_outliers'])
+
+
+def load_cluster_model(path=CLUSTER_MODEL_PATH):
+    """The saved model, or None when there is none (first run)"""
+    try:
+        return ClusterModel.load(path)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,297 @@
+"""
+Clustering quality scores that scale past sklearn's O(N^2) silhouette_score
+
+    sampled_silhouette      silhouette of a cluster-stratified sample; a and b
+                            are mean distances to the sampled members
+    simplified_silhouette   a = distance to the own centroid, b = to the
+                            nearest other centroid; every row, O(N k)
+    davies_bouldin          lower is better
+    calinski_harabasz       higher is better
+
+Every function returns {'score', 'low', 'high', 'rows', 'exact'}: the
+estimate, a 95% confidence interval and the rows it used. Intervals are
+delete-one-group jackknife estimates over QUALITY_GROUPS random row groups
+(of the sample for sampled_silhouette; the other three are exact point
+estimates). The simplified silhouette's comes from the spread of its
+per-row values. A silhouette whose sample covers every row is the exact
+value, not an estimate: 'exact' is True, low / high equal the score and
+format_score prints "exact" instead of an interval.
+Distances are computed in row blocks sized so no temporary exceeds memory_mb.
+With header (from read_vectors) vectors is the stored float16 / int8
+artifact and only those blocks are dequantized.
+"""
+import numpy as np
+
+from vector_store import dequantize
+
+# find_k_elbow keeps sklearn's exact silhouette_score up to this many rows
+EXACT_MAX_ROWS = 20000
+# Rows in the stratified silhouette sample
+SILHOUETTE_SAMPLE = 10000
+# Ceiling for distance blocks and other temporaries (MB)
+QUALITY_MEMORY_MB = 256
+# Random row groups for the jackknife intervals
+QUALITY_GROUPS = 20
+Z_95 = 1.959964
+
+
+def _block_rows(width, memory_mb, arrays=3):
+    """Rows per block so `arrays` float64 (rows x width) temporaries fit in memory_mb"""
+    return max(1, int(memory_mb * 1024 * 1024 // (8 * arrays * max(width, 1))))
+
+
+def _distances(block, others, other_norms):
+    squared = (block * block).sum(axis=1)[:, None] - 2 * block @ others.T + other_norms[None, :]
+    return np.sqrt(np.maximum(squared, 0))
+
+
+def _rows(vectors, rows, header):
+    """float64 copy of vectors[rows], dequantized when header is given"""
+    block = vectors[rows]
+    return np.asarray(dequantize(block, header) if header is not None else block, dtype=np.float64)
+
+
+def _result(score, se, rows, exact=False):
+    se = 0.0 if exact else se
+    return {'score': float(score), 'low': float(score - Z_95 * se), 'high': float(score + Z_95 * se),
+            'rows': int(rows), 'exact': exact}
+
+
+def _add_cells(target, cell, values):
+    """target[cell[i]] += values[i] over rows (sorted segment sums, much faster than np.add.at for wide rows)"""
+    order = np.argsort(cell, kind='stable')
+    cells, starts = np.unique(cell[order], return_index=True)
+    target[cells] += np.add.reduceat(values[order], starts, axis=0)
+
+
+def _centroids(vectors, labels, clusters, memory_mb, header=None):
+    sums = np.zeros((len(clusters), vectors.shape[1]))
+    counts = np.zeros(len(clusters))
+    index = np.searchsorted(clusters, labels)
+    step = _block_rows(vectors.shape[1], memory_mb, arrays=2)
+    for start in range(0, len(vectors), step):
+        rows = index[start:start + step]
+        _add_cells(sums, rows, _rows(vectors, slice(start, start + step), header))
+        counts += np.bincount(rows, minlength=len(clusters))
+    return sums / counts[:, None], counts
+
+
+def stratified_sample(labels, size, random_state=0):
+    """
+    Row indices of a sample with every cluster in proportion (at least 2 rows where it has them)
+
+    Returns:
+        (rows, weights): sorted row indices and {cluster: share of all rows}
+    """
+    labels = np.asarray(labels)
+    clusters, counts = np.unique(labels, return_counts=True)
+    weights = dict(zip(clusters.tolist(), (counts / len(labels)).tolist()))
+    if size >= len(labels):
+        return np.arange(len(labels)), weights
+    rng = np.random.default_rng(random_state)
+    take = np.minimum(counts, np.maximum(np.rint(counts * size / len(labels)).astype(int), 2))
+    rows = [rng.choice(np.flatnonzero(labels == cluster), n, replace=False) for cluster, n in zip(clusters, take)]
+    return np.sort(np.concatenate(rows)), weights
+
+
+def _silhouettes(totals, counts, index):
+    """Per-row silhouette from summed distances to each cluster's rows (the row itself included in its own)"""
+    own = np.arange(len(index)), index
+    own_size = counts[index] - 1
+    a = np.divide(totals[own], own_size, out=np.zeros(len(index)), where=own_size > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = totals / counts
+    means[:, counts == 0] = np.inf
+    means[own] = np.inf
+    b = means.min(axis=1)
+    values = (b - a) / np.maximum(np.maximum(a, b), 1e-12)
+    values[own_size <= 0] = 0.0  # singleton clusters score 0, like sklearn
+    return values
+
+
+def sampled_silhouette(vectors, labels, sample_size=SILHOUETTE_SAMPLE, groups=QUALITY_GROUPS, random_state=0,
+                       memory_mb=QUALITY_MEMORY_MB, header=None):
+    """
+    Silhouette of a stratified sample (sample_size >= N: the exact silhouette_score)
+
+    The interval is a delete-one-group jackknife over random groups of the
+    sample, so it covers the noise of a and b (distances to sampled rows only)
+    as well as that of the sampled rows themselves. A sample of every row has
+    no interval (exact).
+    """
+    labels = np.asarray(labels)
+    rows, weights = stratified_sample(labels, sample_size, random_state)
+    exact = len(rows) == len(labels)
+    sample_labels = labels[rows]
+    clusters, index = np.unique(sample_labels, return_inverse=True)
+    if len(clusters) < 2:
+        return _result(0.0, 0.0, len(rows), exact)
+    num_clusters = len(clusters)
+    num_groups = 1 if exact else min(groups, len(rows))
+    group = np.random.default_rng(random_state).integers(num_groups, size=len(rows))
+    strata = np.array([weights[cluster] for cluster in clusters.tolist()])
+
+    # order the sample by (group, cluster) so each cell's distances are one contiguous column range
+    cell = group * num_clusters + index
+    order = np.argsort(cell, kind='stable')
+    rows, index, group, cell = rows[order], index[order], group[order], cell[order]
+    sample = _rows(vectors, rows, header)
+    norms = (sample * sample).sum(axis=1)
+    cells, starts = np.unique(cell, return_index=True)
+    cell_counts = np.bincount(cell, minlength=num_groups * num_clusters).reshape(num_groups, num_clusters)
+    counts = cell_counts.sum(axis=0)
+
+    values = np.zeros(len(rows))
+    # per left-out group: summed silhouettes and rows of each cluster
+    held_sums = np.zeros((num_groups, num_clusters))
+    held_rows = np.zeros((num_groups, num_clusters))
+    step = _block_rows(max(len(rows), num_groups * num_clusters), memory_mb)
+    for start in range(0, len(rows), step):
+        block_index, block_group = index[start:start + step], group[start:start + step]
+        parts = np.zeros((len(block_index), num_groups * num_clusters))
+        parts[:, cells] = np.add.reduceat(_distances(sample[start:start + step], sample, norms), starts, axis=1)
+        parts = parts.reshape(len(block_index), num_groups, num_clusters)
+        totals = parts.sum(axis=1)
+        values[start:start + step] = _silhouettes(totals, counts, block_index)
+        for g in range(num_groups if num_groups > 1 else 0):
+            keep = block_group != g
+            held = _silhouettes(totals[keep] - parts[keep, g], counts - cell_counts[g], block_index[keep])
+            np.add.at(held_sums[g], block_index[keep], held)
+            held_rows[g] += np.bincount(block_index[keep], minlength=num_clusters)
+
+    per_cluster = np.bincount(index, weights=values, minlength=num_clusters) / np.maximum(counts, 1)
+    score = (strata * per_cluster).sum()
+    if num_groups < 2:
+        return _result(score, 0.0, len(rows), exact)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        leave_out = (strata * np.where(held_rows > 0, held_sums / held_rows, 0.0)).sum(axis=1)
+    se = np.sqrt((num_groups - 1) / num_groups * ((leave_out - leave_out.mean()) ** 2).sum())
+    return _result(score, se, len(rows))
+
+
+def simplified_silhouette(vectors, labels, memory_mb=QUALITY_MEMORY_MB, header=None):
+    """Centroid-based silhouette over every row"""
+    labels = np.asarray(labels)
+    clusters = np.unique(labels)
+    if len(clusters) < 2:
+        return _result(0.0, 0.0, len(labels))
+    centers, _ = _centroids(vectors, labels, clusters, memory_mb, header)
+    center_norms = (centers * centers).sum(axis=1)
+    index = np.searchsorted(clusters, labels)
+
+    values = np.zeros(len(labels))
+    step = _block_rows(len(clusters), memory_mb)
+    for start in range(0, len(labels), step):
+        distances = _distances(_rows(vectors, slice(start, start + step), header), centers, center_norms)
+        own = np.arange(len(distances)), index[start:start + step]
+        a = distances[own].copy()
+        distances[own] = np.inf
+        b = distances.min(axis=1)
+        values[start:start + step] = (b - a) / np.maximum(np.maximum(a, b), 1e-12)
+    return _result(values.mean(), values.std(ddof=1) / np.sqrt(len(values)) if len(values) > 1 else 0.0,
+                   len(values))
+
+
+def _group_stats(vectors, labels, clusters, groups, memory_mb, header=None):
+    """Per (group, cluster): rows, vector sums, squared norms, distances to the global centroid"""
+    num_groups = groups.max() + 1
+    index = np.searchsorted(clusters, labels)
+    centers, _ = _centroids(vectors, labels, clusters, memory_mb, header)
+    center_norms = (centers * centers).sum(axis=1)
+    num_cells = num_groups * len(clusters)
+    counts, squares, distances = np.zeros(num_cells), np.zeros(num_cells), np.zeros(num_cells)
+    sums = np.zeros((num_cells, vectors.shape[1]))
+    step = _block_rows(max(vectors.shape[1], len(clusters)), memory_mb)
+    for start in range(0, len(labels), step):
+        block = _rows(vectors, slice(start, start + step), header)
+        block_index = index[start:start + step]
+        cell = groups[start:start + step] * len(clusters) + block_index
+        own = _distances(block, centers, center_norms)[np.arange(len(block)), block_index]
+        counts += np.bincount(cell, minlength=num_cells)
+        squares += np.bincount(cell, weights=(block * block).sum(axis=1), minlength=num_cells)
+        distances += np.bincount(cell, weights=own, minlength=num_cells)
+        _add_cells(sums, cell, block)
+    shape = (num_groups, len(clusters))
+    return counts.reshape(shape), sums.reshape(shape + (vectors.shape[1],)), squares.reshape(shape), \
+        distances.reshape(shape)
+
+
+def _jackknife(statistic, stats):
+    """statistic(totals) on all groups, and the delete-one-group standard error"""
+    totals = [part.sum(axis=0) for part in stats]
+    score = statistic(*totals)
+    num_groups = len(stats[0])
+    if num_groups < 2:
+        return score, 0.0
+    leave_out = np.array([statistic(*[total - part[g] for total, part in zip(totals, stats)])
+                          for g in range(num_groups)])
+    return score, np.sqrt((num_groups - 1) / num_groups * ((leave_out - leave_out.mean()) ** 2).sum())
+
+
+def _groups(num_rows, num_groups, random_state):
+    return np.random.default_rng(random_state).integers(min(num_groups, max(num_rows, 1)), size=num_rows)
+
+
+def _davies_bouldin(counts, sums, squares, distances):
+    present = counts > 0
+    centers = sums[present] / counts[present, None]
+    scatter = distances[present] / counts[present]
+    if len(centers) < 2:
+        return 0.0
+    gaps = np.sqrt(np.maximum((centers * centers).sum(axis=1)[:, None] - 2 * centers @ centers.T
+                              + (centers * centers).sum(axis=1)[None, :], 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = (scatter[:, None] + scatter[None, :]) / gaps
+    np.fill_diagonal(ratios, -np.inf)
+    ratios[~np.isfinite(ratios)] = 0.0
+    return float(ratios.max(axis=1).mean())
+
+
+def _calinski_harabasz(counts, sums, squares, distances):
+    present = counts > 0
+    n, k = counts.sum(), int(present.sum())
+    if k < 2 or n <= k:
+        return 0.0
+    centers = sums[present] / counts[present, None]
+    mean = sums.sum(axis=0) / n
+    between = (counts[present] * ((centers - mean) ** 2).sum(axis=1)).sum()
+    within = (squares[present] - counts[present] * (centers * centers).sum(axis=1)).sum()
+    return float(between * (n - k) / (max(within, 1e-12) * (k - 1)))
+
+
+def _scores(statistics, vectors, labels, groups, random_state, memory_mb, header=None):
+    labels = np.asarray(labels)
+    stats = _group_stats(vectors, labels, np.unique(labels), _groups(len(labels), groups, random_state), memory_mb,
+                         header)
+    return [_result(*_jackknife(statistic, stats), len(labels)) for statistic in statistics]
+
+
+def davies_bouldin(vectors, labels, groups=QUALITY_GROUPS, random_state=0, memory_mb=QUALITY_MEMORY_MB, header=None):
+    """Davies-Bouldin index (sklearn's definition), jackknife interval over row groups"""
+    return _scores([_davies_bouldin], vectors, labels, groups, random_state, memory_mb, header)[0]
+
+
+def calinski_harabasz(vectors, labels, groups=QUALITY_GROUPS, random_state=0, memory_mb=QUALITY_MEMORY_MB,
+                      header=None):
+    """Calinski-Harabasz index (sklearn's definition), jackknife interval over row groups"""
+    return _scores([_calinski_harabasz], vectors, labels, groups, random_state, memory_mb, header)[0]
+
+
+def quality_report(vectors, labels, sample_size=SILHOUETTE_SAMPLE, random_state=0, memory_mb=QUALITY_MEMORY_MB,
+                   header=None):
+    """All four scores: {name: result} (Davies-Bouldin and Calinski-Harabasz share one pass)"""
+    db, ch = _scores([_davies_bouldin, _calinski_harabasz], vectors, labels, QUALITY_GROUPS, random_state, memory_mb,
+                     header)
+    return {
+        'silhouette': sampled_silhouette(vectors, labels, sample_size, random_state=random_state,
+                                         memory_mb=memory_mb, header=header),
+        'simplified_silhouette': simplified_silhouette(vectors, labels, memory_mb, header),
+        'davies_bouldin': db,
+        'calinski_harabasz': ch,
+    }
+
+
+def format_score(name, result):
+    if result.get('exact'):
+        return f"{name}={result['score']:.4f} (exact, {result['rows']} rows)"
+    return f"{name}={result['score']:.4f} (95% CI {result['low']:.4f}..{result['high']:.4f}, {result['rows']} rows)"
@@ -7,6 +7,7 @@ print("Downloading NLTK data...")
 # Download stopwords
 nltk.download('stopwords')
 nltk.download('punkt')
+nltk.download('punkt_tab')
 nltk.download('wordnet')
 
 print("✅ NLTK data downloaded successfully")
\ No newline at end of file
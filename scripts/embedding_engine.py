@@ -0,0 +1,173 @@
+"""
+Length-bucketed CPU sentence embedding for vectorize_cluster.vectorize_text
+
+SentenceTransformer.encode(texts) runs fixed-size batches and truncates
+every text at the model's max_seq_length, so a batch mixing an overview
+with a review dump is padded to the longest one and the review is cut.
+EmbeddingEngine instead:
+
+    1. counts real tokens per text with the model's own tokenizer
+    2. splits texts longer than one window into overlapping token windows
+       (cut at the tokenizer's character offsets, so pieces stay plain text)
+    3. sorts all pieces by token length and packs them into batches bounded
+       by a padded-token budget (many short pieces or a few long ones)
+    4. mean-pools the pieces of each text, weighted by their token counts,
+       and writes the vectors back in the original row order
+
+stats holds texts/s and tokens/s of the last encode(), plus how many of the
+tokens fed to the model were padding.
+"""
+import time
+
+import numpy as np
+
+# Most pieces per batch
+BATCH_SIZE = 128
+# Padded tokens per batch (batch size x longest piece); bounds activation memory
+TOKEN_BUDGET = 8192
+# Tokens shared by consecutive windows of a long text
+CHUNK_OVERLAP = 32
+# Windows kept per text (the tail of very long texts is dropped)
+MAX_CHUNKS = 16
+# Texts tokenized per tokenizer call
+TOKENIZE_BATCH = 4096
+
+
+class EmbeddingEngine:
+    """
+    Embed texts with a SentenceTransformer in token-length buckets
+
+    Args:
+        model: loaded SentenceTransformer (tokenizer and max_seq_length are used)
+        batch_size (int): most pieces per batch
+        token_budget (int): padded tokens per batch
+        chunk (bool): split long texts into windows and pool them; False
+            truncates at max_seq_length like model.encode
+        overlap (int): tokens shared by consecutive windows
+        max_chunks (int): windows kept per text
+    """
+
+    def __init__(self, model, batch_size=BATCH_SIZE, token_budget=TOKEN_BUDGET, chunk=True,
+                 overlap=CHUNK_OVERLAP, max_chunks=MAX_CHUNKS):
+        self.model = model
+        self.tokenizer = model.tokenizer
+        self.batch_size = batch_size
+        self.token_budget = token_budget
+        self.chunk = chunk
+        self.max_chunks = max_chunks
+        self.specials = self.tokenizer.num_special_tokens_to_add()
+        # content tokens per window
+        self.window = model.max_seq_length - self.specials
+        self.overlap = min(overlap, self.window // 2)
+        self.stats = {}
+
+    @property
+    def config(self):
+        """Settings that change the vectors (batching does not)"""
+        return {'max_seq_length': self.model.max_seq_length, 'chunk': self.chunk,
+                'overlap': self.overlap, 'max_chunks': self.max_chunks}
+
+    def _tokenize(self, texts):
+        """Per text: content token count and token character offsets (None without a fast tokenizer)"""
+        counts, offsets = [], []
+        fast = getattr(self.tokenizer, 'is_fast', False)
+        for start in range(0, len(texts), TOKENIZE_BATCH):
+            batch = texts[start:start + TOKENIZE_BATCH]
+            encoded = self.tokenizer(batch, add_special_tokens=False, truncation=False,
+                                     return_offsets_mapping=fast, verbose=False)
+            counts.extend(len(ids) for ids in encoded['input_ids'])
+            offsets.extend(encoded['offset_mapping'] if fast else [None] * len(batch))
+        return counts, offsets
+
+    def _split(self, text, count, offsets):
+        """(piece, content tokens) windows of one text"""
+        if count <= self.window or not self.chunk:
+            return [(text, min(count, self.window))]
+        step = self.window - self.overlap
+        starts = range(0, count - self.overlap, step)[:self.max_chunks]
+        if offsets is None:
+            # slow tokenizer: cut on words, assuming tokens spread evenly over them
+            words = text.split()
+            per_token = len(words) / count
+            return [(' '.join(words[int(s * per_token):int(min(s + self.window, count) * per_token)]),
+                     min(self.window, count - s)) for s in starts]
+        return [(text[offsets[s][0]:offsets[min(s + self.window, count) - 1][1]], min(self.window, count - s))
+                for s in starts]
+
+    def _batches(self, lengths):
+        """Index batches over pieces sorted by decreasing length, within batch_size and token_budget"""
+        order = np.argsort(-lengths, kind='stable')
+        batches, start = [], 0
+        while start < len(order):
+            padded = int(lengths[order[start]]) + self.specials
+            size = max(1, min(self.batch_size, self.token_budget // padded))
+            batches.append(order[start:start + size])
+            start += size
+        return batches
+
+    def encode(self, texts):
+        """
+        Embed texts
+
+        Returns:
+            ndarray (len(texts), dim) float32, in the order of texts
+        """
+        texts = ['' if text is None else str(text) for text in texts]
+        started = time.perf_counter()
+        counts, offsets = self._tokenize(texts)
+
+        pieces, owners, lengths = [], [], []
+        for row, (text, count, text_offsets) in enumerate(zip(texts, counts, offsets)):
+            for piece, length in self._split(text, count, text_offsets):
+                pieces.append(piece)
+                owners.append(row)
+                lengths.append(length)
+        owners = np.asarray(owners, dtype=np.int64)
+        lengths = np.asarray(lengths, dtype=np.int64)
+
+        dim = self.model.get_sentence_embedding_dimension()
+        piece_vectors = np.zeros((len(pieces), dim), dtype=np.float32)
+        padded_tokens = 0
+        for batch in self._batches(lengths):
+            piece_vectors[batch] = self.model.encode([pieces[i] for i in batch], batch_size=len(batch),
+                                                     convert_to_numpy=True, show_progress_bar=False)
+            padded_tokens += len(batch) * (int(lengths[batch].max()) + self.specials)
+
+        vectors = self._pool(piece_vectors, owners, lengths, len(texts))
+        elapsed = time.perf_counter() - started
+
+        tokens = int(lengths.sum()) + self.specials * len(pieces)
+        self.stats = {
+            'texts': len(texts),
+            'pieces': len(pieces),
+            'chunked_texts': int(np.count_nonzero(np.bincount(owners, minlength=len(texts)) > 1)),
+            'tokens': tokens,
+            'padding': 1 - tokens / padded_tokens if padded_tokens else 0.0,
+            'seconds': elapsed,
+            'texts_per_sec': len(texts) / elapsed if elapsed else 0.0,
+            'tokens_per_sec': tokens / elapsed if elapsed else 0.0,
+        }
+        return vectors
+
+    @staticmethod
+    def _pool(piece_vectors, owners, lengths, num_texts):
+        """Token-weighted mean of each text's pieces (re-normalized if the model normalizes)"""
+        if len(piece_vectors) == num_texts:
+            return piece_vectors
+        weights = np.maximum(lengths, 1).astype(np.float32)
+        vectors = np.zeros((num_texts, piece_vectors.shape[1]), dtype=np.float32)
+        np.add.at(vectors, owners, piece_vectors * weights[:, None])
+        vectors /= np.bincount(owners, weights=weights, minlength=num_texts).astype(np.float32)[:, None]
+
+        norms = np.linalg.norm(piece_vectors, axis=1)
+        if np.allclose(norms[norms > 0], 1.0, atol=1e-3):
+            pooled = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(pooled > 0, pooled, 1.0)
+        return vectors
+
+    def summary(self):
+        """One-line throughput report of the last encode()"""
+        s = self.stats
+        return (f"{s['texts']} texts ({s['pieces']} pieces, {s['chunked_texts']} chunked) in {s['seconds']:.1f}s: "
+                f"{s['texts_per_sec']:.1f} texts/s, {s['tokens_per_sec']:.0f} tokens/s, "
+                f"{s['padding']:.1%} padding")
@@ -0,0 +1,138 @@
+"""
+Persistent per-text embedding store for vectorize_cluster.vectorize_text
+
+One directory per (model, chunking config) under data/cache/embeddings/:
+
+    vectors.f32   float32 rows, appended; read through np.memmap
+    keys.bin      16-byte blake2b hash of each row's text, same order
+    header.json   model, config, dim and the number of committed rows
+
+Rows past header.json's count (a crash between appending and committing)
+are cut off on open, like CheckpointStore's sidecar index. A rerun looks
+up every text's hash and only embeds the texts it has not seen.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+STORE_DIR = Path("data/cache/embeddings")
+KEY_SIZE = 16
+HEADER = "header.json"
+VECTORS = "vectors.f32"
+KEYS = "keys.bin"
+
+
+def _fsync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _namespace(model_name, config):
+    spec = json.dumps({'model': model_name, 'config': config}, sort_keys=True)
+    return hashlib.blake2b(spec.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Append-only, memory-mapped text -> vector store
+
+    Args:
+        model_name (str): embedding model; part of the namespace
+        config (dict): settings that change the vectors (window, chunking)
+        dim (int): vector size
+        root: parent directory of the per-namespace stores
+    """
+
+    def __init__(self, model_name, config, dim, root=STORE_DIR):
+        self.model_name = model_name
+        self.config = config
+        self.dim = int(dim)
+        self.path = Path(root) / _namespace(model_name, config)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._prefix = hashlib.blake2b(json.dumps(config, sort_keys=True).encode('utf-8'), digest_size=16).digest()
+
+        header = self._read_header()
+        if header is not None and header['dim'] != self.dim:
+            raise ValueError(f"{self.path} holds {header['dim']}-d vectors, expected {self.dim}")
+        self.rows = header['rows'] if header else 0
+        self._truncate()
+
+        keys = np.fromfile(self.path / KEYS, dtype=f'V{KEY_SIZE}') if self.rows else []
+        self.index = {bytes(key): row for row, key in enumerate(keys)}
+        self._vectors = None
+
+    def _read_header(self):
+        try:
+            with open(self.path / HEADER, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_header(self):
+        tmp = self.path / (HEADER + ".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'model': self.model_name, 'config': self.config, 'dim': self.dim,
+                       'dtype': 'float32', 'rows': self.rows}, f, indent=2)
+            _fsync(f)
+        os.replace(tmp, self.path / HEADER)
+
+    def _truncate(self):
+        """Cut vectors / keys back to the committed rows"""
+        for name, row_size in ((VECTORS, self.dim * 4), (KEYS, KEY_SIZE)):
+            with open(self.path / name, 'ab') as f:
+                f.truncate(self.rows * row_size)
+
+    def key(self, text):
+        """16-byte hash of one text (the config is folded in)"""
+        digest = hashlib.blake2b(self._prefix, digest_size=KEY_SIZE)
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.digest()
+
+    def lookup(self, keys):
+        """Row of each key, -1 where missing"""
+        return np.fromiter((self.index.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+
+    def vectors(self):
+        """Every committed row as a read-only memmap (rows x dim)"""
+        if self._vectors is None or len(self._vectors) != self.rows:
+            self._vectors = np.memmap(self.path / VECTORS, dtype=np.float32, mode='r',
+                                      shape=(self.rows, self.dim)) if self.rows else \
+                np.empty((0, self.dim), dtype=np.float32)
+        return self._vectors
+
+    def get(self, rows):
+        """Vectors of rows (an in-memory copy, in the given order)"""
+        return np.asarray(self.vectors()[np.asarray(rows, dtype=np.int64)])
+
+    def add(self, keys, vectors):
+        """Append new (key, vector) pairs and commit them"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        fresh = []
+        for i, key in enumerate(keys):
+            if key not in self.index:
+                self.index[key] = self.rows + len(fresh)
+                fresh.append(i)
+        if not fresh:
+            return
+        with open(self.path / VECTORS, 'ab') as f:
+            f.write(vectors[fresh].tobytes())
+            _fsync(f)
+        with open(self.path / KEYS, 'ab') as f:
+            f.write(b''.join(keys[i] for i in fresh))
+            _fsync(f)
+        self.rows += len(fresh)
+        self._write_header()
+
+    def compact(self, keep):
+        """Rewrite the store with only the rows of keys in keep (in that order)"""
+        keep = [key for key in dict.fromkeys(keep) if key in self.index]
+        vectors = self.get([self.index[key] for key in keep])
+        self._vectors = None
+        self.rows = 0
+        self.index = {}
+        self._write_header()
+        self._truncate()
+        self.add(keep, vectors)
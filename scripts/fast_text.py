@@ -0,0 +1,239 @@
+"""
+Fast text primitives for DataCleaner
+
+strip_html() returns exactly what
+    ' '.join(BeautifulSoup(text, 'html.parser').get_text().split())
+returns, without building a tree for the common cases:
+
+    1. plain text (no '<' and no '&')        -> whitespace collapse only
+    2. simple tags and common entities       -> one compiled scanner
+    3. anything else (comments, <script>, unknown entities, stray '<', ...)
+                                             -> BeautifulSoup
+"""
+import re
+
+from bs4 import BeautifulSoup
+from nltk.tokenize.punkt import PunktTokenizer
+
+# Bump whenever a change here alters strip_html or StopwordRemover output
+# (invalidates text_cache entries)
+RULES_VERSION = 2
+
+# Start/end tags with plain attributes; anything fancier is left for bs4
+_TAG = re.compile(r"""
+    <(?:
+        (?P<start>[A-Za-z][A-Za-z0-9]*)
+        (?:\s+[A-Za-z_:][-\w:.]*(?:\s*=\s*(?:"[^"<]*"|'[^'<]*'|[^\s"'=<>`]+))?)*
+        \s*/?
+      |
+        /(?P<end>[A-Za-z][A-Za-z0-9]*)\s*
+    )>
+""", re.VERBOSE)
+
+# Elements whose content html.parser does not parse as markup (varies by Python version)
+_RAW_TEXT_TAGS = {'script', 'style', 'textarea', 'title', 'xmp', 'iframe',
+                  'noembed', 'noframes', 'noscript', 'plaintext'}
+
+# '&' forms bs4 resolves the same way as this table; other entities go to bs4
+_ENTITY = re.compile(r"&(?:(?P<name>amp|lt|gt|quot|apos|nbsp);|#(?P<dec>[0-9]{1,7});"
+                     r"|#[xX](?P<hex>[0-9a-fA-F]{1,6});|(?P<bare>)(?![A-Za-z#])|(?P<other>))")
+_NAMED = {'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"', 'apos': "'", 'nbsp': '\xa0'}
+
+
+class _NeedsParser(Exception):
+    """Raised by the scanner when the text is beyond the fast path"""
+
+
+def _entity(match):
+    if match.group('name'):
+        return _NAMED[match.group('name')]
+    if match.group('bare') is not None:
+        return '&'
+    if match.group('other') is not None:
+        raise _NeedsParser
+    code = int(match.group('dec')) if match.group('dec') else int(match.group('hex'), 16)
+    # bs4 maps 0, 128-159 (windows-1252) and surrogates differently from chr()
+    if code in (9, 10, 13) or 32 <= code <= 126 or 160 <= code <= 0xD7FF or 0xE000 <= code <= 0x10FFFF:
+        return chr(code)
+    raise _NeedsParser
+
+
+def _unescape(segment):
+    if '&' not in segment:
+        return segment
+    return _ENTITY.sub(_entity, segment)
+
+
+def bs4_strip_html(text):
+    """Reference implementation (the original DataCleaner.clean_html body)"""
+    return ' '.join(BeautifulSoup(text, 'html.parser').get_text().split())
+
+
+def strip_html(text):
+    """
+    ลบ HTML tags และ decode entities แล้วรวม whitespace
+
+    Args:
+        text (str): overview / review text
+
+    Returns:
+        str: same result as bs4_strip_html(text)
+    """
+    if '<' not in text:
+        if '&' not in text:
+            return ' '.join(text.split())
+        try:
+            return ' '.join(_unescape(text).split())
+        except _NeedsParser:
+            return bs4_strip_html(text)
+
+    try:
+        parts = []
+        pos = 0
+        for match in _TAG.finditer(text):
+            segment = text[pos:match.start()]
+            name = match.group('start') or match.group('end')
+            # '<' outside a simple tag: comment, doctype, CDATA, "a <3 b", broken markup
+            if '<' in segment or name.lower() in _RAW_TEXT_TAGS:
+                raise _NeedsParser
+            parts.append(_unescape(segment))
+            pos = match.end()
+        tail = text[pos:]
+        if '<' in tail:
+            raise _NeedsParser
+        parts.append(_unescape(tail))
+    except _NeedsParser:
+        return bs4_strip_html(text)
+    return ' '.join(''.join(parts).split())
+
+
+# ----------------------------
+# Tokenizing / stopwords
+# ----------------------------
+# The word_tokenize (NLTK Treebank) rules that can fire on remove_special_chars
+# output, which only contains word characters, single spaces and . , ! ? -
+# The Treebank final-period rule fires once per punkt sentence, so those
+# periods are spaced out per row beforehand (StopwordRemover._split_sentence_ends);
+# a period inside a sentence ("1942. the", "j. r. r.") stays on its word.
+_TOKEN_RULES = [
+    # a comma not before a digit; like Treebank the next character is consumed,
+    # so in ",,x" only the first comma is split off
+    (re.compile(r",(\D)"), r" , \1"),
+    (re.compile(r",$", re.M), " , "),
+    # "..", "?", "!", "--"
+    (re.compile(r"[.?!-](?:(?<=[?!])|(?<=-)-|(?<=\.)\.+)"), r" \g<0> "),
+]
+# MacIntyre contractions, split into separate tokens even inside hyphenated
+# words ("he-who-cannot" -> "he-who- can not"); the literal comes first so the
+# regex engine can skip ahead
+for _word, _split in (("cannot", " can not "), ("gimme", " gim me "), ("gonna", " gon na "),
+                      ("gotta", " got ta "), ("lemme", " lem me ")):
+    _TOKEN_RULES.append((re.compile(_word + r"(?<=\b" + _word + r")\b"), _split))
+_TOKEN_RULES.append((re.compile(r"wanna(?<=\bwanna)(?=\s|$)", re.M), " wan na "))
+# A period before a space or the row end, when every one of them closes a sentence
+_PERIOD_END = re.compile(r"(?<!\.)\.(?= |$)")
+# Periods punkt looks at inside a row, and the words it always ends a sentence after
+_PERIOD_NEXT = re.compile(r"\.[ ?!]")
+_PLAIN_WORD = re.compile(r"[a-z]{2,}")
+
+
+def _trie_pattern(words):
+    """Alternation of words nested by shared prefix, so the regex engine branches per character"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+def punctuation_tokens(punctuation):
+    """
+    Tokens the NLTK path drops as punctuation
+
+    remove_stopwords tests `w not in string.punctuation`, a substring test,
+    so '()' or '.' are dropped but '--' and '...' are kept.
+    """
+    return {punctuation[i:j] for i in range(len(punctuation)) for j in range(i + 1, len(punctuation) + 1)}
+
+
+class StopwordRemover:
+    """
+    Column-at-once lowercase + tokenize + stopword/punctuation removal
+
+    Sentence-final periods are spaced out per row first. Punkt always ends
+    a sentence at "word. " when the word is plain (letters only, not a
+    known abbreviation or collocation start), so only rows with another
+    kind of period ("u.s. ", "1942. ", "j. ", "mr.?", "...") go through the
+    punkt sentence tokenizer word_tokenize uses. The column is then joined
+    into one newline-separated string (cleaned rows never contain a
+    newline), tokenized with a handful of compiled substitutions, and
+    stopwords are deleted by one compiled alternation. The output matches
+    word_tokenize + the NLTK filter.
+    """
+
+    def __init__(self, stop_words, punctuation, language="english"):
+        drop = set(stop_words) | punctuation_tokens(punctuation)
+        self._drop = re.compile(r"(?<!\S)" + _trie_pattern(drop) + r"(?!\S)")
+        self._sentences = PunktTokenizer(language)
+        # abbreviations and collocation starts are not plain words
+        params = self._sentences._params
+        self._not_plain = set(params.abbrev_types) | {first for first, _ in params.collocations}
+
+    def _ambiguous(self, row):
+        """True if punkt has to decide on a period of row: before "?" / "!", or after a word that is not plain"""
+        for match in _PERIOD_NEXT.finditer(row):
+            if row[match.end() - 1] != " ":
+                return True
+            word = row[row.rfind(" ", 0, match.start()) + 1:match.start()]
+            # "" is a lone ".", and an ellipsis never gets the final-period split
+            if word and word[-1] != "." and (word in self._not_plain or not _PLAIN_WORD.fullmatch(word)):
+                return True
+        return False
+
+    def _split_sentence_ends(self, row):
+        """Space out the period that ends a punkt sentence (Treebank's final-period rule)"""
+        if "." not in row:
+            return row
+        if not self._ambiguous(row):
+            return _PERIOD_END.sub(" . ", row)
+        parts, pos = [], 0
+        for start, end in self._sentences.span_tokenize(row):
+            if end - start > 1 and row[end - 1] == "." and row[end - 2] != ".":
+                parts.append(row[pos:end - 1])
+                parts.append(" . ")
+                pos = end
+        parts.append(row[pos:])
+        return "".join(parts)
+
+    def remove_column(self, texts):
+        """
+        Args:
+            texts (list): remove_special_chars output, one str per row (no newlines)
+
+        Returns:
+            list: space-joined kept tokens per row
+        """
+        if not texts:
+            return []
+        blob = "\n".join(self._split_sentence_ends(text.lower()) for text in texts)
+        for pattern, repl in _TOKEN_RULES:
+            blob = pattern.sub(repl, blob)
+        blob = self._drop.sub("", blob)
+        return [" ".join(line.split()) for line in blob.split("\n")]
+
+    def remove(self, text):
+        """Single row; any text (newlines are plain whitespace here)"""
+        return self.remove_column([" ".join(text.split())])[0]
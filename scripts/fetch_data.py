@@ -2,10 +2,21 @@ import requests
 import json
 import time
 import os
+import re
+import random
+import threading
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+from checkpoint_store import FetchState, content_hash
+from raw_store import open_checkpoint
+
 # Load environment variables
 load_dotenv()
 
@@ -24,58 +35,277 @@ MOVIES_FILE = DATA_DIR / "raw_movies.json"
 REVIEWS_FILE = DATA_DIR / "raw_reviews.json"
 MOVIE_JSONL = DATA_DIR / "raw_movies.jsonl"
 REVIEWS_JSONL = DATA_DIR / "raw_reviews.jsonl"
+RAW_MOVIES_DIR = DATA_DIR / "movies"    # zstd Parquet parts
+RAW_REVIEWS_DIR = DATA_DIR / "reviews"
+
+# 'parquet' (default) or 'jsonl'
+RAW_FORMAT = os.getenv('TMDB_RAW_FORMAT', 'parquet')
+RAW_MOVIES = RAW_MOVIES_DIR if RAW_FORMAT == 'parquet' else MOVIE_JSONL
+RAW_REVIEWS = RAW_REVIEWS_DIR if RAW_FORMAT == 'parquet' else REVIEWS_JSONL
+STATE_FILE = DATA_DIR / "fetch_state.json"  # last_refresh; per-movie fetches in fetch_state.json.idx
+DELTA_DIR = DATA_DIR / "delta"
+
+# Incremental refresh
+REFRESH_BUDGET = 500        # max movies re-fetched per refresh run
+REFRESH_MAX_AGE_DAYS = 30   # re-fetch anything older than this even if TMDB reports no change
+CHANGES_WINDOW_DAYS = 14    # movie/changes accepts at most 14 days
+
+# API rate limiting (one token bucket shared by every worker)
+REQUESTS_PER_SECOND = float(os.getenv('TMDB_REQUESTS_PER_SECOND', 40))
+RATE_BURST = 10
+MAX_WORKERS = int(os.getenv('TMDB_MAX_WORKERS', 8))
+
+# Review pagination
+MAX_REVIEW_PAGES = 10     # cap on review pages fetched per movie (20 reviews/page)
+REVIEW_PAGE_FANOUT = 4    # review pages of one movie fetched at the same time
+
+# Retry policy
+PERMANENT_STATUSES = {400, 401, 403, 404, 405, 422}  # never succeed on retry
+BACKOFF_BASE = 0.5   # seconds, doubled per attempt (full jitter)
+BACKOFF_CAP = 30.0
+MIN_RATE_FRACTION = 0.1  # 429s never push the rate below 10% of the target
+
+
+def parse_retry_after(value):
+    """Retry-After header (delta-seconds or HTTP date) -> seconds, None if missing or invalid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
 
-# API rate limiting
-REQUEST_DELAY = 0.20  # 5 requests/second
 
+def retry_delay(status, retry_after, attempt):
+    """
+    Decide how long to wait before retrying a failed request
 
-def append_jsonl(path, record):
-    """Append record to JSONL file"""
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    Args:
+        status (int): HTTP status, None for network errors
+        retry_after (float): parsed Retry-After seconds, None if absent
+        attempt (int): 0-based attempt number that just failed
 
+    Returns:
+        float: seconds to wait, or None when the error is permanent
+    """
+    if status in PERMANENT_STATUSES:
+        return None
+    if status == 429 and retry_after is not None:
+        # small jitter so workers released together do not collide again
+        return retry_after + random.uniform(0, BACKOFF_BASE)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def tag_reviews(movie_id, details, reviews):
+    """Link reviews back to their movie"""
+    for r in reviews:
+        r["movie_id"] = movie_id
+        r["movie_title"] = details.get("title", "")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that caps the global request rate
+
+    The rate adapts AIMD-style: every 429 halves it and pauses all workers
+    for Retry-After, every success adds back a small step until the target
+    rate is reached again.
+    """
+
+    def __init__(self, rate, capacity=RATE_BURST):
+        self.max_rate = float(rate)
+        self.min_rate = self.max_rate * MIN_RATE_FRACTION
+        self.rate = self.max_rate
+        self.capacity = float(max(1, capacity))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.cooldown_until = 0.0
+        self.lock = threading.Lock()
+
+    def throttle(self, retry_after=None):
+        """Back off after a 429: halve the rate (once per cooldown) and pause every worker"""
+        with self.lock:
+            now = time.monotonic()
+            pause = retry_after if retry_after is not None else 1.0
+            self.paused_until = max(self.paused_until, now + pause)
+            self.tokens = 0.0
+            self.updated = max(self.updated, self.paused_until)
+            # a 429 storm hits many workers at once; count it as one signal
+            if now >= self.cooldown_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.cooldown_until = now + max(pause, 1.0)
+
+    def recover(self):
+        """Additive increase after a successful request"""
+        with self.lock:
+            if self.rate < self.max_rate and time.monotonic() >= self.cooldown_until:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+
+    def reserve(self):
+        """
+        Take one token if available
 
-def load_processed_ids(path):
-    """Load processed movie IDs from JSONL file"""
-    ids = set()
-    if path.exists():
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    obj = json.loads(line)
-                    ids.add(obj["id"])
-                except:
-                    continue
-    return ids 
+        Returns:
+            float: 0 when a token was taken, otherwise seconds to wait before trying again
+        """
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block until a request token is available"""
+        wait = self.reserve()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.reserve()
+
+
+class EndpointStats:
+    """Per-endpoint latency and retry counters (thread-safe)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    @staticmethod
+    def endpoint_key(endpoint):
+        """Collapse movie ids so movie/550/reviews -> movie/{id}/reviews"""
+        return re.sub(r'\d+', '{id}', endpoint)
+
+    def _counter(self, endpoint):
+        key = self.endpoint_key(endpoint)
+        if key not in self.counters:
+            self.counters[key] = {'requests': 0, 'ok': 0, 'retries': 0, 'failures': 0,
+                                  'total_latency': 0.0, 'max_latency': 0.0}
+        return self.counters[key]
+
+    def record(self, endpoint, latency, ok):
+        """Record one HTTP round trip"""
+        with self.lock:
+            c = self._counter(endpoint)
+            c['requests'] += 1
+            c['ok'] += int(ok)
+            c['total_latency'] += latency
+            c['max_latency'] = max(c['max_latency'], latency)
+
+    def record_retry(self, endpoint):
+        with self.lock:
+            self._counter(endpoint)['retries'] += 1
+
+    def record_failure(self, endpoint):
+        """Record a request that gave up after all retries"""
+        with self.lock:
+            self._counter(endpoint)['failures'] += 1
+
+    def summary(self):
+        """
+        Returns:
+            dict: endpoint -> requests, ok, retries, failures, mean_ms, max_ms
+        """
+        with self.lock:
+            out = {}
+            for key, c in sorted(self.counters.items()):
+                out[key] = {
+                    'requests': c['requests'],
+                    'ok': c['ok'],
+                    'retries': c['retries'],
+                    'failures': c['failures'],
+                    'mean_ms': c['total_latency'] / c['requests'] * 1000 if c['requests'] else 0.0,
+                    'max_ms': c['max_latency'] * 1000,
+                }
+            return out
+
+    def print_summary(self):
+        for key, c in self.summary().items():
+            print(f"   {key}: {c['requests']} requests, {c['retries']} retries, "
+                  f"{c['failures']} failures, mean {c['mean_ms']:.1f} ms, max {c['max_ms']:.1f} ms")
 
 
 class TMDBFetcher:
     """Class สำหรับดึงข้อมูลจาก TMDB API"""
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, base_url=None, workers=MAX_WORKERS,
+                 requests_per_second=REQUESTS_PER_SECOND,
+                 movies_path=RAW_MOVIES, reviews_path=RAW_REVIEWS,
+                 state_path=STATE_FILE, delta_dir=DELTA_DIR):
         self.api_key = api_key
-        self.base_url = TMDB_BASE_URL
+        self.base_url = base_url or TMDB_BASE_URL
+        self.workers = max(1, int(workers))
+        self.movies_path = Path(movies_path)
+        self.reviews_path = Path(reviews_path)
+        self.state_path = Path(state_path)
+        self.delta_dir = Path(delta_dir)
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.stats = EndpointStats()
         self.session = requests.Session()
+        self.pool_size = 0
+        self.size_pool(self.workers)
         
+    def size_pool(self, workers):
+        """
+        Keep one pooled keep-alive connection per request that can be in flight:
+        every worker fans its review pages out to REVIEW_PAGE_FANOUT threads
+        """
+        size = max(1, int(workers)) * REVIEW_PAGE_FANOUT
+        if size > self.pool_size:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+            self.pool_size = size
+
     def safe_get(self, endpoint, params=None, retries=5):
-        """Safe HTTP request with retry logic and exponential backoff"""
-        if params is None:
-            params = {}
+        """Safe HTTP request with status-aware retries (see retry_delay)"""
+        params = dict(params or {})
         params['api_key'] = self.api_key
         url = f"{self.base_url}/{endpoint}"
 
         for attempt in range(retries):
+            if attempt:
+                self.stats.record_retry(endpoint)
+            status, retry_after = None, None
             try:
+                self.rate_limiter.acquire()
+                started = time.perf_counter()
                 r = self.session.get(url, params=params, timeout=15)
+                self.stats.record(endpoint, time.perf_counter() - started, r.status_code == 200)
                 if r.status_code == 200:
-                    time.sleep(REQUEST_DELAY)
-                    return r.json()
-                else:
-                    print(f"{endpoint} status {r.status_code}, retry {attempt+1}/{retries}")
+                    data = r.json()
+                    self.rate_limiter.recover()
+                    return data
+                status = r.status_code
+                if status == 429:
+                    retry_after = parse_retry_after(r.headers.get('Retry-After'))
+                    self.rate_limiter.throttle(retry_after)
             except Exception as e:
                 print(f"{endpoint} error: {e}, retry {attempt+1}/{retries}")
-            time.sleep(1 + attempt * 1.5)  # exponential backoff
 
+            delay = retry_delay(status, retry_after, attempt)
+            if delay is None:
+                print(f"{endpoint} status {status}, not retrying")
+                break
+            if attempt + 1 < retries:
+                if status is not None:
+                    print(f"{endpoint} status {status}, retry {attempt+1}/{retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+        self.stats.record_failure(endpoint)
         return None
     
     def fetch_popular_movies(self, num_pages=20):
@@ -119,35 +349,83 @@ class TMDBFetcher:
         
         return details
     
-    def fetch_movie_reviews(self, movie_id):
+    def fetch_movie_reviews(self, movie_id, max_pages=MAX_REVIEW_PAGES):
         """
-        ดึง reviews ของภาพยนตร์
+        ดึง reviews ของภาพยนตร์ทุกหน้า (ไม่เกิน max_pages)
+        
+        หน้าแรกบอก total_pages แล้วหน้าที่เหลือถูกดึงพร้อมกัน
+        ไม่เกิน REVIEW_PAGE_FANOUT หน้าต่อเรื่อง
         
         Args:
             movie_id (int): TMDB movie ID
+            max_pages (int): จำนวนหน้าสูงสุดต่อเรื่อง
         
         Returns:
-            list: รายการ reviews
+            list: รายการ reviews เรียงตามหน้า
         """
-        data = self.safe_get(f'movie/{movie_id}/reviews', {'page': 1})
+        endpoint = f'movie/{movie_id}/reviews'
+        data = self.safe_get(endpoint, {'page': 1})
+        
+        if not data or 'results' not in data:
+            return []
         
-        if data and 'results' in data:
-            return data['results']
+        reviews = list(data['results'])
+        last_page = min(int(data.get('total_pages') or 1), max_pages)
+        if last_page < 2:
+            return reviews
         
-        return []
+        pages = range(2, last_page + 1)
+        with ThreadPoolExecutor(max_workers=min(REVIEW_PAGE_FANOUT, len(pages))) as pool:
+            for page_data in pool.map(lambda page: self.safe_get(endpoint, {'page': page}), pages):
+                if page_data and 'results' in page_data:
+                    reviews.extend(page_data['results'])
+        
+        return reviews
     
-    def fetch_complete_dataset(self, num_movies=5000):
+    def fetch_movie(self, movie_id):
+        """
+        ดึงรายละเอียดและ reviews ของภาพยนตร์หนึ่งเรื่อง (thread-safe)
+        
+        Args:
+            movie_id (int): TMDB movie ID
+        
+        Returns:
+            tuple: (details, reviews) หรือ (None, []) ถ้าดึงรายละเอียดไม่ได้
+        """
+        details = self.fetch_movie_details(movie_id)
+        if not details:
+            return None, []
+
+        return details, self.fetch_movie_reviews(movie_id)
+
+    def fetch_complete_dataset(self, num_movies=5000, workers=None):
         """
         ดึงข้อมูลภาพยนตร์ครบชุด (resumable mode)
         
         Args:
             num_movies (int): จำนวนภาพยนตร์ที่ต้องการ
+            workers (int): จำนวน threads ที่ดึงพร้อมกัน (default: self.workers)
         """
-        # Load checkpoint
-        processed_ids = load_processed_ids(MOVIE_JSONL)
+        workers = max(1, int(workers or self.workers))
+
+        # Load checkpoint (sidecar index, buffered appends)
+        state = FetchState(self.state_path)
+        with open_checkpoint(self.movies_path, self.reviews_path) as store:
+            try:
+                self._fetch_pending(num_movies, workers, store, state)
+            finally:
+                state.save()
+
+        print("\n⭐ Fetching complete (safe mode)")
+        print(f"Movies saved to: {self.movies_path}")
+        print(f"Reviews saved to: {self.reviews_path}")
+        self.stats.print_summary()
+
+    def _fetch_pending(self, num_movies, workers, store, state):
+        processed_ids = store.ids
 
         print("="*80)
-        print("TMDB DATA FETCHING (RESUMABLE MODE)")
+        print(f"TMDB DATA FETCHING (RESUMABLE MODE, {workers} workers)")
         print("="*80)
 
         num_pages = (num_movies // 20) + 1
@@ -155,38 +433,148 @@ class TMDBFetcher:
 
         print(f"\nFetched {len(popular_movies)} popular movies\n")
 
-        # Loop
-        for movie in tqdm(popular_movies[:num_movies]):
+        # Skip if already done (popular pages can repeat ids)
+        pending = [m["id"] for m in popular_movies[:num_movies] if m["id"] not in processed_ids]
+        pending = list(dict.fromkeys(pending))
 
-            movie_id = movie["id"]
+        def handle(movie_id, details, reviews):
+            if self.save_movie(movie_id, details, reviews, store):
+                state.record(movie_id, content_hash(details, reviews))
 
-            # Skip if already done
-            if movie_id in processed_ids:
-                continue
+        self._run_pool(pending, workers, handle)
 
-            # Fetch details
-            details = self.fetch_movie_details(movie_id)
-            if not details:
-                print(f"❌ Skip details for {movie_id}")
-                continue
+    def _run_pool(self, movie_ids, workers, handle):
+        """Fetch movie_ids on `workers` threads and call handle(movie_id, details, reviews) in order of completion"""
+        self.size_pool(workers)
+        if workers == 1:
+            for movie_id in tqdm(movie_ids):
+                handle(movie_id, *self.fetch_movie(movie_id))
+            return
 
-            # Save movie details
-            append_jsonl(MOVIE_JSONL, details)
+        # Workers only fetch; records are written from this thread so
+        # the JSONL checkpoint is never interleaved
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self.fetch_movie, movie_id): movie_id for movie_id in movie_ids}
+            try:
+                for future in tqdm(as_completed(futures), total=len(futures)):
+                    details, reviews = future.result()
+                    handle(futures[future], details, reviews)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def save_movie(self, movie_id, details, reviews, store):
+        """
+        Hand one fetched movie and its reviews to the checkpoint store
 
-            # Fetch reviews
-            reviews = self.fetch_movie_reviews(movie_id)
-            if reviews:
-                for r in reviews:
-                    r["movie_id"] = movie_id
-                    r["movie_title"] = details.get("title", "")
-                    append_jsonl(REVIEWS_JSONL, r)
+        Returns:
+            bool: False when the details could not be fetched
+        """
+        if not details:
+            print(f"❌ Skip details for {movie_id}")
+            return False
 
-            # Mark as done
-            processed_ids.add(movie_id)
+        tag_reviews(movie_id, details, reviews)
 
-        print("\n⭐ Fetching complete (safe mode)")
-        print(f"Movies saved to: {MOVIE_JSONL}")
-        print(f"Reviews saved to: {REVIEWS_JSONL}")
+        # Save and mark as done
+        store.add_movie(details, reviews)
+        return True
+
+    def fetch_changed_ids(self, since):
+        """
+        ดึง id ภาพยนตร์ที่ TMDB แจ้งว่ามีการเปลี่ยนแปลงตั้งแต่ `since`
+        
+        Args:
+            since (datetime): เวลาเริ่มต้น (ถูกจำกัดไว้ไม่เกิน CHANGES_WINDOW_DAYS วัน)
+        
+        Returns:
+            list: movie IDs
+        """
+        now = datetime.now(timezone.utc)
+        start = max(since, now - timedelta(days=CHANGES_WINDOW_DAYS))
+        params = {'start_date': start.strftime('%Y-%m-%d'), 'end_date': now.strftime('%Y-%m-%d')}
+
+        ids = []
+        page, total_pages = 1, 1
+        while page <= total_pages:
+            data = self.safe_get('movie/changes', {**params, 'page': page})
+            if not data:
+                print(f"Failed to fetch changes page {page}")
+                break
+            ids.extend(r['id'] for r in data.get('results', []))
+            total_pages = data.get('total_pages', 1)
+            page += 1
+
+        return ids
+
+    def refresh_dataset(self, budget=REFRESH_BUDGET, max_age_days=REFRESH_MAX_AGE_DAYS, workers=None):
+        """
+        Incremental refresh: re-fetch known movies that TMDB reports as changed,
+        then the stalest ones, up to `budget` movies. Only movies whose content
+        hash changed are written, to a new file pair in DELTA_DIR; clean_data.py
+        applies the pairs over the main store (raw_store.RawDelta, latest wins).
+        
+        Args:
+            budget (int): จำนวนภาพยนตร์สูงสุดที่จะดึงใหม่
+            max_age_days (int): ดึงใหม่ถ้าดึงครั้งล่าสุดเก่ากว่านี้
+            workers (int): จำนวน threads ที่ดึงพร้อมกัน
+        """
+        workers = max(1, int(workers or self.workers))
+        run_started = time.time()
+        state = FetchState(self.state_path)
+
+        with open_checkpoint(self.movies_path, self.reviews_path) as store:
+            known = set(store.ids)
+
+        print("="*80)
+        print(f"TMDB INCREMENTAL REFRESH ({len(known)} known movies, budget {budget})")
+        print("="*80)
+
+        if state.last_refresh:
+            since = datetime.fromtimestamp(state.last_refresh, timezone.utc)
+        else:
+            since = datetime.now(timezone.utc) - timedelta(days=CHANGES_WINDOW_DAYS)
+        changed = [movie_id for movie_id in self.fetch_changed_ids(since) if movie_id in known]
+        stale = state.stale_ids(known, max_age_days * 86400)
+        candidates = list(dict.fromkeys(changed + stale))[:budget]
+        print(f"Changed upstream: {len(changed)}, stale: {len(stale)}, refreshing: {len(candidates)}")
+
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        suffix = self.movies_path.suffix  # '.jsonl' or '' for Parquet part directories
+        delta_movies = self.delta_dir / f"{stamp}_movies{suffix}"
+        delta_reviews = self.delta_dir / f"{stamp}_reviews{suffix}"
+        updated = []
+
+        with open_checkpoint(delta_movies, delta_reviews) as delta:
+            def handle(movie_id, details, reviews):
+                if not details:
+                    print(f"❌ Skip details for {movie_id}")
+                    return
+                tag_reviews(movie_id, details, reviews)
+                if state.mark(movie_id, content_hash(details, reviews)):
+                    delta.add_movie(details, reviews)
+                    updated.append(movie_id)
+
+            try:
+                self._run_pool(candidates, workers, handle)
+            finally:
+                state.save()
+
+        # Only advance the changes window once every changed movie fit in the budget
+        if len(dict.fromkeys(changed)) <= budget:
+            state.last_refresh = run_started
+            state.save()
+
+        if not updated:
+            delta.remove()
+
+        print(f"\n⭐ Refresh complete: {len(updated)} of {len(candidates)} refreshed movies changed")
+        if updated:
+            print(f"Delta saved to: {delta_movies}")
+            print(f"Delta reviews saved to: {delta_reviews}")
+        self.stats.print_summary()
+        return updated
 
 def save_data(movies, reviews):
     """บันทึกข้อมูลเป็น JSON files"""
@@ -243,6 +631,11 @@ def main():
     # Initialize fetcher
     fetcher = TMDBFetcher(TMDB_API_KEY)
     
+    # Nightly mode: python scripts/fetch_data.py refresh
+    if sys.argv[1:] == ["refresh"]:
+        fetcher.refresh_dataset()
+        return
+    
     # Fetch data (5000 movies by default)
     fetcher.fetch_complete_dataset(num_movies=5000)
     
@@ -250,8 +643,8 @@ def main():
     print("✅ DATA FETCHING COMPLETE")
     print("="*80)
     print(f"\nNext steps:")
-    print(f"1. Check data/raw/raw_movies.jsonl")
-    print(f"2. Check data/raw/raw_reviews.jsonl")
+    print(f"1. Check {RAW_MOVIES}")
+    print(f"2. Check {RAW_REVIEWS}")
     print(f"3. Run data quality checks")
 
 
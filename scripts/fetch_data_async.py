@@ -0,0 +1,248 @@
+import asyncio
+import time
+from pathlib import Path
+
+import aiohttp
+from tqdm import tqdm
+
+from fetch_data import (
+    TMDB_API_KEY,
+    TMDB_BASE_URL,
+    RAW_MOVIES,
+    RAW_REVIEWS,
+    MAX_WORKERS,
+    REQUESTS_PER_SECOND,
+    MAX_REVIEW_PAGES,
+    REVIEW_PAGE_FANOUT,
+    TokenBucket,
+    EndpointStats,
+    STATE_FILE,
+    parse_retry_after,
+    retry_delay,
+    tag_reviews,
+)
+from checkpoint_store import FetchState, content_hash
+from raw_store import open_checkpoint
+
+# Movies kept in flight at once, and the keep-alive connection pool they share
+MAX_IN_FLIGHT = MAX_WORKERS * 4
+POOL_SIZE = MAX_WORKERS * 2
+
+
+class AsyncTMDBFetcher:
+    """Asyncio variant of TMDBFetcher: details and reviews of a movie are requested together"""
+
+    def __init__(self, api_key, base_url=None, max_in_flight=MAX_IN_FLIGHT, pool_size=POOL_SIZE,
+                 requests_per_second=REQUESTS_PER_SECOND,
+                 movies_path=RAW_MOVIES, reviews_path=RAW_REVIEWS, state_path=STATE_FILE):
+        self.api_key = api_key
+        self.base_url = base_url or TMDB_BASE_URL
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.pool_size = max(1, int(pool_size))
+        self.movies_path = Path(movies_path)
+        self.reviews_path = Path(reviews_path)
+        self.state = FetchState(state_path)
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.stats = EndpointStats()
+        self.session = None
+
+    async def _acquire(self):
+        wait = self.rate_limiter.reserve()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self.rate_limiter.reserve()
+
+    async def safe_get(self, endpoint, params=None, retries=5):
+        """Safe HTTP request with status-aware retries (see fetch_data.retry_delay)"""
+        params = dict(params or {})
+        params['api_key'] = self.api_key
+        url = f"{self.base_url}/{endpoint}"
+
+        for attempt in range(retries):
+            if attempt:
+                self.stats.record_retry(endpoint)
+            status, retry_after = None, None
+            try:
+                await self._acquire()
+                started = time.perf_counter()
+                async with self.session.get(url, params=params) as r:
+                    body = await r.json() if r.status == 200 else None
+                    retry_header = r.headers.get('Retry-After')
+                self.stats.record(endpoint, time.perf_counter() - started, r.status == 200)
+                if r.status == 200:
+                    self.rate_limiter.recover()
+                    return body
+                status = r.status
+                if status == 429:
+                    retry_after = parse_retry_after(retry_header)
+                    self.rate_limiter.throttle(retry_after)
+            except Exception as e:
+                print(f"{endpoint} error: {e}, retry {attempt+1}/{retries}")
+
+            delay = retry_delay(status, retry_after, attempt)
+            if delay is None:
+                print(f"{endpoint} status {status}, not retrying")
+                break
+            if attempt + 1 < retries:
+                if status is not None:
+                    print(f"{endpoint} status {status}, retry {attempt+1}/{retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        self.stats.record_failure(endpoint)
+        return None
+
+    async def fetch_popular_movies(self, num_pages=20):
+        """ดึงรายการภาพยนตร์ยอดนิยม (ทุกหน้าพร้อมกัน, เรียงตามหน้า)"""
+        print(f"Fetching popular movies ({num_pages} pages)...")
+        pages = await asyncio.gather(*[
+            self.safe_get('movie/popular', {'page': page, 'language': 'en-US'})
+            for page in range(1, num_pages + 1)
+        ])
+
+        movies = []
+        for page, data in enumerate(pages, start=1):
+            if data and 'results' in data:
+                movies.extend(data['results'])
+            else:
+                print(f"Failed to fetch page {page}")
+        return movies
+
+    async def fetch_movie_reviews(self, movie_id, max_pages=MAX_REVIEW_PAGES):
+        """ดึง reviews ทุกหน้า (ไม่เกิน max_pages) โดยดึงพร้อมกันไม่เกิน REVIEW_PAGE_FANOUT หน้า"""
+        endpoint = f'movie/{movie_id}/reviews'
+        data = await self.safe_get(endpoint, {'page': 1})
+        if not data or 'results' not in data:
+            return []
+
+        reviews = list(data['results'])
+        last_page = min(int(data.get('total_pages') or 1), max_pages)
+        if last_page < 2:
+            return reviews
+
+        fanout = asyncio.Semaphore(REVIEW_PAGE_FANOUT)
+
+        async def fetch_page(page):
+            async with fanout:
+                return await self.safe_get(endpoint, {'page': page})
+
+        for page_data in await asyncio.gather(*[fetch_page(page) for page in range(2, last_page + 1)]):
+            if page_data and 'results' in page_data:
+                reviews.extend(page_data['results'])
+        return reviews
+
+    async def fetch_movie(self, movie_id):
+        """
+        ดึงรายละเอียดและ reviews พร้อมกันใน round trip เดียว
+
+        Returns:
+            tuple: (details, reviews) หรือ (None, []) ถ้าดึงรายละเอียดไม่ได้
+        """
+        details, reviews = await asyncio.gather(
+            self.safe_get(f'movie/{movie_id}', {'append_to_response': 'keywords,credits'}),
+            self.fetch_movie_reviews(movie_id),
+        )
+        if not details:
+            return None, []
+        return details, reviews
+
+    def save_movie(self, movie_id, details, reviews, store):
+        """Hand one fetched movie and its reviews to the checkpoint store"""
+        if not details:
+            print(f"❌ Skip details for {movie_id}")
+            return
+
+        tag_reviews(movie_id, details, reviews)
+        store.add_movie(details, reviews)
+        self.state.record(movie_id, content_hash(details, reviews))
+
+    async def _worker(self, queue, store, progress):
+        while True:
+            movie_id = await queue.get()
+            try:
+                details, reviews = await self.fetch_movie(movie_id)
+                # Writes happen on the event loop thread, one record at a time
+                self.save_movie(movie_id, details, reviews, store)
+                progress.update(1)
+            except Exception as e:
+                # Fatal for the crawl (like the threaded pool): _crawl cancels the other workers
+                print(f"❌ Failed on movie {movie_id}: {e}")
+                raise
+            finally:
+                queue.task_done()
+
+    async def crawl(self, num_movies=5000):
+        """ดึงข้อมูลภาพยนตร์ครบชุด (resumable mode) บน event loop ที่กำลังทำงาน"""
+        with open_checkpoint(self.movies_path, self.reviews_path) as store:
+            try:
+                return await self._crawl(num_movies, store)
+            finally:
+                self.state.save()
+
+    async def _crawl(self, num_movies, store):
+        processed_ids = store.ids
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=15)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            self.session = session
+
+            num_pages = (num_movies // 20) + 1
+            popular_movies = await self.fetch_popular_movies(num_pages)
+            print(f"\nFetched {len(popular_movies)} popular movies\n")
+
+            pending = [m["id"] for m in popular_movies[:num_movies] if m["id"] not in processed_ids]
+            pending = list(dict.fromkeys(pending))
+
+            queue = asyncio.Queue()
+            for movie_id in pending:
+                queue.put_nowait(movie_id)
+
+            with tqdm(total=len(pending)) as progress:
+                workers = [
+                    asyncio.create_task(self._worker(queue, store, progress))
+                    for _ in range(min(self.max_in_flight, max(1, len(pending))))
+                ]
+                # Workers only return by raising, so stop at the first failure
+                # instead of waiting on a queue nobody drains
+                joined = asyncio.ensure_future(queue.join())
+                try:
+                    await asyncio.wait([joined, *workers], return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    joined.cancel()
+                    for w in workers:
+                        w.cancel()
+                    results = await asyncio.gather(*workers, return_exceptions=True)
+                errors = [r for r in results if isinstance(r, Exception)]
+                if errors:
+                    raise errors[0]
+
+        self.session = None
+        return len(pending)
+
+    def fetch_complete_dataset(self, num_movies=5000):
+        """
+        ดึงข้อมูลภาพยนตร์ครบชุด (resumable mode, asyncio)
+
+        Args:
+            num_movies (int): จำนวนภาพยนตร์ที่ต้องการ
+        """
+        print("="*80)
+        print(f"TMDB DATA FETCHING (ASYNC, {self.max_in_flight} movies in flight, "
+              f"{self.pool_size} connections)")
+        print("="*80)
+
+        asyncio.run(self.crawl(num_movies))
+
+        print("\n⭐ Fetching complete (async mode)")
+        print(f"Movies saved to: {self.movies_path}")
+        print(f"Reviews saved to: {self.reviews_path}")
+        self.stats.print_summary()
+
+
+def main():
+    """Main execution"""
+    fetcher = AsyncTMDBFetcher(TMDB_API_KEY)
+    fetcher.fetch_complete_dataset(num_movies=5000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Parallel KMeans sweep over candidate k with a per-run fit cache
+
+cluster_and_keywords1.find_k_elbow needs the inertia of every k in a
+range, the silhouette fallback needs the labels of the same fits, and the
+final clustering refits the chosen k. KSweep fits each k once:
+
+    - candidate k values are split into contiguous runs fitted by
+      SWEEP_JOBS joblib workers (each with its share of the BLAS/OpenMP
+      threads, so workers do not oversubscribe the cores)
+    - every fitted model (inertia_, labels_, cluster_centers_) is cached;
+      asking for a k again returns the cached fit
+    - warm_start=True starts each k from the previous k's centroids
+      (plus k-means++ picks for the new ones) with a single init. That is
+      much cheaper than n_init fresh starts but gives different inertias,
+      so the elbow can land on another k; it is off by default, and with
+      it off every fit is KMeans(n_clusters=k, random_state, n_init)
+      exactly as before
+    - backend="minibatch" fits each k with cluster_backends.StreamingKMeans
+      (block-wise mini-batches, for matrices too large for full KMeans);
+      with header (from read_vectors) the stored, possibly quantized
+      memmap is fitted as is, one dequantized block at a time
+"""
+import os
+
+import numpy as np
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+
+from cluster_backends import INIT_ROWS, fit_kmeans
+from vector_store import dequantize
+
+SWEEP_JOBS = int(os.getenv("SWEEP_JOBS", os.cpu_count() or 1))
+
+
+def _plus_plus(vectors, centers, count, rng):
+    """count more initial centers, k-means++ style (prob. ~ squared distance to the nearest center)"""
+    centers = list(centers)
+    nearest = ((vectors - centers[0]) ** 2).sum(axis=1)
+    for center in centers[1:]:
+        nearest = np.minimum(nearest, ((vectors - center) ** 2).sum(axis=1))
+    for _ in range(count):
+        total = nearest.sum()
+        pick = rng.choice(len(vectors), p=nearest / total) if total > 0 else rng.integers(len(vectors))
+        centers.append(vectors[pick])
+        nearest = np.minimum(nearest, ((vectors - vectors[pick]) ** 2).sum(axis=1))
+    return np.asarray(centers)
+
+
+def _seed_rows(vectors, header, random_state):
+    """Rows the warm-start centers are picked from: all of them, or a dequantized sample of a stored matrix"""
+    if header is None:
+        return vectors
+    rng = np.random.default_rng(random_state)
+    rows = np.sort(rng.choice(len(vectors), min(len(vectors), INIT_ROWS), replace=False))
+    return dequantize(vectors[rows], header)
+
+
+def _fit_run(vectors, ks, random_state, n_init, warm_start, threads, backend="full", header=None):
+    """Worker: fit ks in order, each warm-started from the previous one if asked"""
+    models = []
+    previous = None
+    seeds = None
+    with threadpool_limits(limits=threads):
+        for k in ks:
+            init = None
+            if warm_start and previous is not None and previous.n_clusters < k:
+                rng = np.random.default_rng(random_state + k)
+                if seeds is None:
+                    seeds = _seed_rows(vectors, header, random_state)
+                init = _plus_plus(seeds, previous.cluster_centers_, k - previous.n_clusters, rng)
+            model = fit_kmeans(vectors, k, backend, random_state=random_state, n_init=n_init, init=init,
+                               header=header)
+            models.append(model)
+            previous = model
+    return models
+
+
+class KSweep:
+    """
+    Cached KMeans fits of one matrix for many k
+
+    Args:
+        vectors: (n, d) matrix (large arrays are memory-mapped to the workers)
+        random_state (int): KMeans seed, as in perform_kmeans
+        n_init (int): KMeans restarts per k (warm-started k use 1)
+        n_jobs (int): parallel workers
+        warm_start (bool): start each k from the previous k's centroids
+        backend (str): "full" (KMeans) or "minibatch" (StreamingKMeans), see cluster_backends
+        header (dict): read_vectors header when vectors is the stored artifact (float16 / int8 rows)
+    """
+
+    def __init__(self, vectors, random_state=42, n_init=10, n_jobs=SWEEP_JOBS, warm_start=False, backend="full",
+                 header=None):
+        self.vectors = vectors
+        self.header = header
+        self.random_state = random_state
+        self.n_init = n_init
+        self.n_jobs = max(1, n_jobs)
+        self.warm_start = warm_start
+        self.backend = backend
+        self.fits = {}
+
+    def fit(self, ks):
+        """Fit every k not cached yet (in parallel) and return {k: fitted KMeans}"""
+        todo = sorted(k for k in dict.fromkeys(ks) if k not in self.fits)
+        if todo:
+            jobs = min(self.n_jobs, len(todo))
+            # contiguous runs keep warm starts chained; one run per worker
+            runs = [[int(k) for k in run] for run in np.array_split(todo, jobs) if len(run)]
+            threads = max(1, (os.cpu_count() or 1) // jobs)
+            if jobs == 1:
+                results = [_fit_run(self.vectors, runs[0], self.random_state, self.n_init, self.warm_start, threads,
+                                    self.backend, self.header)]
+            else:
+                results = Parallel(n_jobs=jobs)(
+                    delayed(_fit_run)(self.vectors, run, self.random_state, self.n_init, self.warm_start, threads,
+                                      self.backend, self.header)
+                    for run in runs)
+            for models in results:
+                for model in models:
+                    self.fits[model.n_clusters] = model
+        return {k: self.fits[k] for k in ks}
+
+    def model(self, k):
+        return self.fit([k])[k]
+
+    def inertia(self, k):
+        return self.model(k).inertia_
+
+    def labels(self, k):
+        return self.model(k).labels_
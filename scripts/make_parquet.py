@@ -1,6 +1,7 @@
-import pandas as pd
+from cleaned_store import read_cleaned
 
-df = pd.read_csv("data/cleaned/cleaned_movies.csv")
+# the whole cleaned dataset, with its compact dtypes and list columns
+df = read_cleaned()
 
 df.to_parquet("app/micro_genre.parquet")
 print("✔ Parquet saved to app/micro_genre.parquet")
@@ -0,0 +1,413 @@
+"""
+Single-pass data quality profile of the cleaned dataset
+
+QualityProfile.update(df) reads every column of a chunk once and folds it
+into small mergeable sketches:
+
+    - null / empty counts                      (exact)
+    - count, mean, std, min, max               (Moments, Chan et al. merge)
+    - quantiles and histograms                 (QuantileSketch, DDSketch-style
+                                                log buckets, relative error alpha)
+    - top-k categories / list items / years    (TopK, Space-Saving)
+
+Profiles of different chunks merge exactly like the data would, and the
+whole state round-trips through JSON, so DataCleaner's text report and
+visualize_quality.py's PNGs render from data/cleaned/quality_profile.json
+without reading the dataset again.
+"""
+import json
+import math
+from collections import Counter
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROFILE_FILE = Path("data/cleaned/quality_profile.json")
+PROFILE_VERSION = 1
+
+# Relative accuracy of quantiles (and of histogram bin edges derived from them)
+QUANTILE_ALPHA = 0.01
+# Integral values: buckets holding fewer integers than this are histogrammed per integer
+INTEGRAL_SPREAD = 64
+# Distinct categories tracked per column (exact while fewer than this)
+TOPK_CAPACITY = 512
+# Columns profiled as categories (value counts) whatever their dtype
+CATEGORY_COLUMNS = {'status', 'original_language'}
+# Numeric columns that also get exact-ish value counts (movies per year)
+VALUE_COUNT_COLUMNS = {'year'}
+# Exact "< threshold" counters reported as quality issues
+THRESHOLDS = {'vote_count': 10}
+
+
+class Moments:
+    """Count, mean, M2, min, max; merges with Chan et al.'s parallel update"""
+
+    def __init__(self, n=0, mean=0.0, m2=0.0, min=math.inf, max=-math.inf):
+        self.n, self.mean, self.m2, self.min, self.max = n, mean, m2, min, max
+
+    def update(self, values):
+        if len(values):
+            self.merge(Moments(len(values), float(values.mean()), float(((values - values.mean()) ** 2).sum()),
+                               float(values.min()), float(values.max())))
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, like DataFrame.describe)"""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else math.nan
+
+    def to_dict(self):
+        if self.n == 0:
+            return {'n': 0}
+        return {'n': self.n, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class QuantileSketch:
+    """
+    DDSketch-style quantile sketch: log-spaced buckets with relative accuracy alpha
+
+    A value x > 0 falls in bucket ceil(log_gamma(x)), gamma = (1+alpha)/(1-alpha);
+    every quantile is within alpha (relative) of the true value. Buckets are
+    plain counts, so two sketches merge by adding them.
+    """
+
+    def __init__(self, alpha=QUANTILE_ALPHA):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.zeros = 0
+        self.positive = Counter()
+        self.negative = Counter()
+
+    def update(self, values):
+        self.zeros += int((values == 0).sum())
+        for store, part in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if len(part):
+                keys, counts = np.unique(np.ceil(np.log(part) / self._log_gamma).astype(np.int64),
+                                         return_counts=True)
+                store.update(dict(zip(keys.tolist(), counts.tolist())))
+
+    def merge(self, other):
+        self.zeros += other.zeros
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+
+    @property
+    def count(self):
+        return self.zeros + sum(self.positive.values()) + sum(self.negative.values())
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def buckets(self):
+        """(representative value, count) in increasing value order"""
+        items = [(-self._value(k), c) for k, c in sorted(self.negative.items(), reverse=True)]
+        if self.zeros:
+            items.append((0.0, self.zeros))
+        items.extend((self._value(k), c) for k, c in sorted(self.positive.items()))
+        return items
+
+    def quantile(self, q):
+        total = self.count
+        if total == 0:
+            return math.nan
+        rank = q * (total - 1)
+        seen = 0
+        for value, count in self.buckets():
+            seen += count
+            if seen > rank:
+                return value
+        return value
+
+    def histogram(self, bins, lo, hi, integral=False):
+        """
+        Counts in `bins` equal-width bins over [lo, hi]
+
+        Each bucket's count is spread evenly over the value range the bucket
+        covers (clipped to [lo, hi]), so counts are fractional. With integral
+        values, a bucket holding a few integers spreads over those integers.
+        """
+        counts = np.zeros(bins)
+        if hi <= lo:
+            counts[0] = self.count
+            return counts
+        edges = np.linspace(lo, hi, bins + 1)
+        intervals = [(-self.gamma ** k, -self.gamma ** (k - 1), c) for k, c in self.negative.items()]
+        intervals += [(self.gamma ** (k - 1), self.gamma ** k, c) for k, c in self.positive.items()]
+        if self.zeros:
+            intervals.append((0.0, 0.0, self.zeros))
+        for start, end, count in intervals:
+            start, end = min(max(start, lo), hi), min(max(end, lo), hi)
+            if integral and math.floor(end) - math.ceil(start) < INTEGRAL_SPREAD:
+                points = np.arange(math.ceil(start), math.floor(end) + 1)
+                if len(points):
+                    positions = np.minimum(((points - lo) / (hi - lo) * bins).astype(int), bins - 1)
+                    np.add.at(counts, positions, count / len(points))
+                    continue
+            overlap = np.clip(np.minimum(edges[1:], end) - np.maximum(edges[:-1], start), 0, None)
+            if overlap.sum() > 0:
+                counts += count * overlap / overlap.sum()
+            else:
+                counts[min(int((start - lo) / (hi - lo) * bins), bins - 1)] += count
+        return counts
+
+    def to_dict(self):
+        return {'alpha': self.alpha, 'zeros': self.zeros,
+                'positive': {str(k): c for k, c in self.positive.items()},
+                'negative': {str(k): c for k, c in self.negative.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['alpha'])
+        sketch.zeros = data['zeros']
+        sketch.positive = Counter({int(k): c for k, c in data['positive'].items()})
+        sketch.negative = Counter({int(k): c for k, c in data['negative'].items()})
+        return sketch
+
+
+class TopK:
+    """
+    Space-Saving heavy hitters: at most `capacity` counters
+
+    Exact while a column has fewer distinct values than capacity; beyond
+    that a new value takes over the smallest counter (counts are then upper
+    bounds off by at most that counter). Merging adds counters and keeps
+    the largest `capacity`.
+    """
+
+    def __init__(self, capacity=TOPK_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+
+    def update(self, counts):
+        """Add a {value: count} mapping (e.g. one chunk's value_counts)"""
+        for value, count in counts.items():
+            if value in self.counts:
+                self.counts[value] += count
+            elif len(self.counts) < self.capacity:
+                self.counts[value] = count
+            else:
+                smallest = min(self.counts, key=self.counts.get)
+                self.counts[value] = self.counts.pop(smallest) + count
+
+    def merge(self, other):
+        merged = Counter(self.counts)
+        merged.update(other.counts)
+        self.counts = dict(merged.most_common(self.capacity))
+
+    def top(self, k=None):
+        return sorted(self.counts.items(), key=lambda item: (-item[1], str(item[0])))[:k]
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'counts': [[value, count] for value, count in self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        topk = cls(data['capacity'])
+        topk.counts = {value: count for value, count in data['counts']}
+        return topk
+
+
+def _column_kind(name, series):
+    if name in CATEGORY_COLUMNS or isinstance(series.dtype, pd.CategoricalDtype):
+        return 'category'
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return 'category'
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return 'numeric'
+    first = series.dropna().head(1)
+    if len(first) and isinstance(first.iloc[0], (list, tuple, np.ndarray)):
+        return 'list'
+    return 'text'
+
+
+class ColumnProfile:
+    """
+    Sketches of one column
+
+    numeric: values -> moments, quantiles (+ value counts / thresholds)
+    text:    lengths -> moments, quantiles
+    list:    lengths -> moments, quantiles; items -> top-k
+    category: values -> top-k
+    """
+
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.rows = 0
+        self.nulls = 0
+        self.empties = 0
+        self.moments = Moments()
+        self.quantiles = QuantileSketch()
+        self.top = TopK()
+        self.below = 0
+        # every value (or length) so far is a whole number
+        self.integral = True
+
+    def update(self, series):
+        self.rows += len(series)
+        null = series.isna().to_numpy(dtype=bool) if self.kind != 'list' else \
+            ~series.map(lambda v: isinstance(v, (list, tuple, np.ndarray))).to_numpy(dtype=bool)
+        self.nulls += int(null.sum())
+        present = series[~null]
+
+        if self.kind == 'numeric':
+            values = present.to_numpy(dtype=float)
+            values = values[np.isfinite(values)]
+            self._add_values(values)
+            if self.name in VALUE_COUNT_COLUMNS:
+                self.top.update(pd.Series(values).value_counts().to_dict())
+            if self.name in THRESHOLDS:
+                self.below += int((values < THRESHOLDS[self.name]).sum())
+        elif self.kind == 'text':
+            lengths = present.astype(str).str.len().to_numpy(dtype=float)
+            self.empties += int((lengths == 0).sum())
+            self._add_values(lengths)
+        elif self.kind == 'list':
+            lengths = np.fromiter((len(v) for v in present), dtype=float, count=len(present))
+            self.empties += int((lengths == 0).sum())
+            self._add_values(lengths)
+            self.top.update(Counter(chain.from_iterable(present)))
+        else:
+            self.empties += int((present.astype(str) == '').sum())
+            self.top.update(present.astype(str).value_counts().to_dict())
+
+    def _add_values(self, values):
+        self.integral = self.integral and bool(np.all(values == np.floor(values)))
+        self.moments.update(values)
+        self.quantiles.update(values)
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.empties += other.empties
+        self.below += other.below
+        self.integral = self.integral and other.integral
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.top.merge(other.top)
+
+    def quantile(self, q):
+        """Exact from value counts while they are complete, else from the sketch"""
+        if self.name not in VALUE_COUNT_COLUMNS or len(self.top.counts) >= self.top.capacity:
+            return min(max(self.quantiles.quantile(q), self.moments.min), self.moments.max)
+        values = sorted(self.top.counts.items())
+        if not values:
+            return math.nan
+        # linear interpolation between the neighbouring ranks, like pandas
+        position = q * (self.moments.n - 1)
+        below, above = math.floor(position), math.ceil(position)
+        seen, low, high = 0, None, None
+        for value, count in values:
+            seen += count
+            if low is None and seen > below:
+                low = value
+            if seen > above:
+                high = value
+                break
+        return low + (high - low) * (position - below)
+
+    def describe(self):
+        """describe()-style statistics of the values (or lengths)"""
+        if self.moments.n == 0:
+            return {'count': 0} | dict.fromkeys(['mean', 'std', 'min', '25%', '50%', '75%', 'max'], math.nan)
+        return {'count': self.moments.n, 'mean': self.moments.mean, 'std': self.moments.std,
+                'min': self.moments.min, '25%': self.quantile(0.25), '50%': self.quantile(0.5),
+                '75%': self.quantile(0.75), 'max': self.moments.max}
+
+    def histogram(self, bins):
+        """(counts, edges) of the values (or lengths) between their min and max"""
+        lo, hi = (self.moments.min, self.moments.max) if self.moments.n else (0.0, 0.0)
+        edges = np.linspace(lo, hi if hi > lo else lo + 1, bins + 1)
+        return self.quantiles.histogram(bins, lo, hi, self.integral), edges
+
+    def to_dict(self):
+        return {'kind': self.kind, 'rows': self.rows, 'nulls': self.nulls, 'empties': self.empties,
+                'below': self.below, 'integral': self.integral, 'moments': self.moments.to_dict(),
+                'quantiles': self.quantiles.to_dict(), 'top': self.top.to_dict()}
+
+    @classmethod
+    def from_dict(cls, name, data):
+        column = cls(name, data['kind'])
+        column.rows, column.nulls, column.empties, column.below = \
+            data['rows'], data['nulls'], data['empties'], data['below']
+        column.integral = data['integral']
+        column.moments = Moments.from_dict(data['moments'])
+        column.quantiles = QuantileSketch.from_dict(data['quantiles'])
+        column.top = TopK.from_dict(data['top'])
+        return column
+
+
+class QualityProfile:
+    """Column profiles of the whole dataset, updated chunk by chunk"""
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+
+    def update(self, df):
+        """Fold one chunk (DataFrame) into the profile; each column is read once"""
+        self.rows += len(df)
+        for name in df.columns:
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = ColumnProfile(name, _column_kind(name, df[name]))
+            column.update(df[name])
+
+    def merge(self, other):
+        self.rows += other.rows
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def to_dict(self):
+        return {'version': PROFILE_VERSION, 'rows': self.rows,
+                'columns': {name: column.to_dict() for name, column in self.columns.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != PROFILE_VERSION:
+            raise ValueError(f"Quality profile version {data.get('version')}, expected {PROFILE_VERSION}")
+        profile = cls()
+        profile.rows = data['rows']
+        profile.columns = {name: ColumnProfile.from_dict(name, column) for name, column in data['columns'].items()}
+        return profile
+
+    def save(self, path=PROFILE_FILE):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, default=_json_default)
+
+    @classmethod
+    def load(cls, path=PROFILE_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def _json_default(value):
+    # numpy scalars from value_counts keys
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value)}")
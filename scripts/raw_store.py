@@ -0,0 +1,447 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from checkpoint_store import FLUSH_EVERY, FLUSH_INTERVAL, CheckpointStore
+
+COMPRESSION = "zstd"
+PART_PATTERN = "part-*.parquet"
+# Flush parts are merged into one part once they hold this many movies or bytes (and on close)
+COMPACT_ROWS = 100_000
+COMPACT_BYTES = 128 * 1024 * 1024
+ROW_GROUP_ROWS = 20_000
+# Parquet key-value metadata of a merged part: "first-last" sequence numbers of the parts it replaces
+COMPACTS_KEY = b"compacts"
+
+# ----------------------------
+# Schemas (nested credits / keywords kept as structs)
+# ----------------------------
+_NAMED = pa.struct([("id", pa.int64()), ("name", pa.string())])
+
+RAW_MOVIE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("imdb_id", pa.string()),
+    ("title", pa.string()),
+    ("original_title", pa.string()),
+    ("overview", pa.string()),
+    ("tagline", pa.string()),
+    ("release_date", pa.string()),
+    ("runtime", pa.int64()),
+    ("budget", pa.int64()),
+    ("revenue", pa.int64()),
+    ("vote_average", pa.float64()),
+    ("vote_count", pa.int64()),
+    ("popularity", pa.float64()),
+    ("status", pa.string()),
+    ("original_language", pa.string()),
+    ("adult", pa.bool_()),
+    ("video", pa.bool_()),
+    ("homepage", pa.string()),
+    ("poster_path", pa.string()),
+    ("backdrop_path", pa.string()),
+    ("belongs_to_collection", _NAMED),
+    ("genres", pa.list_(_NAMED)),
+    ("production_companies", pa.list_(pa.struct([
+        ("id", pa.int64()), ("name", pa.string()), ("origin_country", pa.string()),
+    ]))),
+    ("production_countries", pa.list_(pa.struct([
+        ("iso_3166_1", pa.string()), ("name", pa.string()),
+    ]))),
+    ("spoken_languages", pa.list_(pa.struct([
+        ("iso_639_1", pa.string()), ("english_name", pa.string()), ("name", pa.string()),
+    ]))),
+    ("keywords", pa.struct([("keywords", pa.list_(_NAMED))])),
+    ("credits", pa.struct([
+        ("cast", pa.list_(pa.struct([
+            ("id", pa.int64()), ("name", pa.string()), ("character", pa.string()),
+            ("order", pa.int64()), ("known_for_department", pa.string()),
+        ]))),
+        ("crew", pa.list_(pa.struct([
+            ("id", pa.int64()), ("name", pa.string()), ("job", pa.string()),
+            ("department", pa.string()),
+        ]))),
+    ])),
+])
+
+RAW_REVIEW_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("movie_id", pa.int64()),
+    ("movie_title", pa.string()),
+    ("author", pa.string()),
+    ("author_details", pa.struct([
+        ("name", pa.string()), ("username", pa.string()),
+        ("avatar_path", pa.string()), ("rating", pa.float64()),
+    ])),
+    ("content", pa.string()),
+    ("created_at", pa.string()),
+    ("updated_at", pa.string()),
+    ("url", pa.string()),
+])
+
+
+def _fsync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def write_part(records, schema, path):
+    """Write one zstd Parquet part atomically (hidden temp file + rename)"""
+    table = pa.Table.from_pylist(records, schema=schema)
+    tmp = path.with_name("." + path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        pq.write_table(table, f, compression=COMPRESSION)
+        _fsync(f)
+    os.replace(tmp, path)
+
+
+def merge_parts(parts, schema, path, metadata=None):
+    """Rewrite parts (in order) as one part atomically, in row groups of ROW_GROUP_ROWS"""
+    tmp = path.with_name("." + path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        with pq.ParquetWriter(f, schema.with_metadata(metadata), compression=COMPRESSION) as writer:
+            pending, rows = [], 0
+            for part in parts:
+                table = pq.read_table(part)
+                pending.append(table)
+                rows += table.num_rows
+                if rows >= ROW_GROUP_ROWS:
+                    writer.write_table(pa.concat_tables(pending), row_group_size=ROW_GROUP_ROWS)
+                    pending, rows = [], 0
+            if rows:
+                writer.write_table(pa.concat_tables(pending), row_group_size=ROW_GROUP_ROWS)
+        _fsync(f)
+    os.replace(tmp, path)
+
+
+def _part_seq(path):
+    return int(path.name[len("part-"):-len(".parquet")])
+
+
+class ParquetCheckpointStore:
+    """
+    Resumable raw store writing zstd Parquet parts instead of JSONL
+
+    Every flush becomes one part per table (data/raw/movies/part-000042.parquet
+    and data/raw/reviews/part-000042.parquet). The reviews part is renamed into
+    place first, so a movies part is the commit marker: on resume, reviews
+    parts without a movies part of the same number are discarded, and the
+    processed ids come from reading only the id column of each movies part.
+
+    Flush parts are small, so once they hold COMPACT_ROWS movies or
+    COMPACT_BYTES (and on close) they are merged into one part with the next
+    number, committed the same way; its metadata names the range of parts it
+    replaces, which are then deleted (again on resume, after a crash between
+    the two steps). A crawl ends up with a few large parts per table.
+    """
+
+    def __init__(self, movies_dir, reviews_dir, flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL):
+        self.movies_dir = Path(movies_dir)
+        self.reviews_dir = Path(reviews_dir)
+        self.flush_every = max(1, int(flush_every))
+        self.flush_interval = flush_interval
+        self.movies_dir.mkdir(parents=True, exist_ok=True)
+        self.reviews_dir.mkdir(parents=True, exist_ok=True)
+
+        self.ids = set()
+        self._pending_movies = []
+        self._pending_reviews = []
+        self._last_flush = time.monotonic()
+        self._next_seq = 0
+        self._small = []  # (seq, movies, bytes) of flush parts not merged yet
+        self._recover()
+
+    def _recover(self):
+        for directory in (self.movies_dir, self.reviews_dir):
+            for tmp in directory.glob(".part-*.tmp"):
+                tmp.unlink()
+
+        movie_parts = sorted(self.movies_dir.glob(PART_PATTERN))
+        metadata = {part: pq.read_metadata(part) for part in movie_parts}
+        # parts a committed merge replaced, left over by a crash before they were deleted
+        replaced = set()
+        for part, meta in metadata.items():
+            merged = (meta.metadata or {}).get(COMPACTS_KEY)
+            if merged:
+                first, last = (int(seq) for seq in merged.decode().split("-"))
+                replaced.update(seq for seq in range(first, last + 1) if seq != _part_seq(part))
+        for part in movie_parts:
+            if _part_seq(part) in replaced:
+                part.unlink()
+        movie_parts = [part for part in movie_parts if _part_seq(part) not in replaced]
+
+        committed = {_part_seq(p) for p in movie_parts}
+        for part in self.reviews_dir.glob(PART_PATTERN):
+            if _part_seq(part) not in committed:
+                part.unlink()
+
+        for part in movie_parts:
+            self.ids.update(pq.read_table(part, columns=["id"]).column("id").to_pylist())
+            if not (metadata[part].metadata or {}).get(COMPACTS_KEY):
+                self._small.append((_part_seq(part), metadata[part].num_rows, self._part_bytes(part.name)))
+        self._next_seq = max(committed) + 1 if committed else 0
+        self._compact(COMPACT_ROWS, COMPACT_BYTES)
+
+    def _part_bytes(self, name):
+        return sum((directory / name).stat().st_size for directory in (self.movies_dir, self.reviews_dir)
+                   if (directory / name).exists())
+
+    def add_movie(self, details, reviews):
+        """Buffer one movie and its reviews; flushes when the batch is full or old enough"""
+        self._pending_movies.append(details)
+        self._pending_reviews.extend(reviews)
+        self.ids.add(details["id"])
+
+        if (len(self._pending_movies) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def write_parts(self, movies, reviews):
+        """Commit one pair of parts: reviews first, then the movies part that commits them"""
+        name = f"part-{self._next_seq:06d}.parquet"
+        if reviews:
+            write_part(reviews, RAW_REVIEW_SCHEMA, self.reviews_dir / name)
+        write_part(movies, RAW_MOVIE_SCHEMA, self.movies_dir / name)
+        self._small.append((self._next_seq, len(movies), self._part_bytes(name)))
+        self._next_seq += 1
+        self._compact(COMPACT_ROWS, COMPACT_BYTES)
+
+    def _compact(self, max_rows, max_bytes):
+        """Merge the flush parts into one part once they hold max_rows movies or max_bytes"""
+        if len(self._small) < 2 or (sum(rows for _, rows, _ in self._small) < max_rows
+                                    and sum(size for _, _, size in self._small) < max_bytes):
+            return
+        names = [f"part-{seq:06d}.parquet" for seq, _, _ in self._small]
+        name = f"part-{self._next_seq:06d}.parquet"
+        metadata = {COMPACTS_KEY: f"{self._small[0][0]}-{self._small[-1][0]}".encode()}
+        reviews = [self.reviews_dir / n for n in names if (self.reviews_dir / n).exists()]
+        if reviews:
+            merge_parts(reviews, RAW_REVIEW_SCHEMA, self.reviews_dir / name, metadata)
+        merge_parts([self.movies_dir / n for n in names], RAW_MOVIE_SCHEMA, self.movies_dir / name, metadata)
+        for n in names:
+            (self.movies_dir / n).unlink()
+            if (self.reviews_dir / n).exists():
+                (self.reviews_dir / n).unlink()
+        self._small = []
+        self._next_seq += 1
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._pending_movies:
+            return
+        self.write_parts(self._pending_movies, self._pending_reviews)
+        self._pending_movies = []
+        self._pending_reviews = []
+
+    def close(self):
+        self.flush()
+        self._compact(0, 0)
+
+    def remove(self):
+        """Delete the (empty) store directories"""
+        for directory in (self.movies_dir, self.reviews_dir):
+            for part in directory.glob(PART_PATTERN):
+                part.unlink()
+            directory.rmdir()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_checkpoint(movies_path, reviews_path, **kwargs):
+    """JSONL store for *.jsonl paths, Parquet part store for directories"""
+    if Path(movies_path).suffix == ".jsonl":
+        return CheckpointStore(movies_path, reviews_path, **kwargs)
+    return ParquetCheckpointStore(movies_path, reviews_path, **kwargs)
+
+
+# ----------------------------
+# Reading
+# ----------------------------
+def _iter_jsonl(path, batch_size):
+    batch = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                batch.append(json.loads(line))
+            except ValueError:
+                continue
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def iter_raw_records(path, columns=None, batch_size=10000):
+    """
+    Yield lists of raw record dicts from a Parquet part directory or a JSONL file
+
+    Args:
+        path: data/raw/movies (Parquet parts) or data/raw/raw_movies.jsonl
+        columns (list): columns to read (Parquet only reads these from disk)
+        batch_size (int): records per yielded list
+    """
+    path = Path(path)
+    if path.is_dir():
+        for part in sorted(path.glob(PART_PATTERN)):
+            parquet_file = pq.ParquetFile(part)
+            cols = [c for c in columns if c in parquet_file.schema_arrow.names] if columns else None
+            for batch in parquet_file.iter_batches(batch_size=batch_size, columns=cols):
+                yield batch.to_pylist()
+    else:
+        for batch in _iter_jsonl(path, batch_size):
+            if columns:
+                batch = [{c: record.get(c) for c in columns} for record in batch]
+            yield batch
+
+
+def count_raw_records(path):
+    """Records in a Parquet part directory (footer metadata only) or JSONL file (lines)"""
+    path = Path(path)
+    if path.is_dir():
+        return sum(pq.ParquetFile(part).metadata.num_rows for part in path.glob(PART_PATTERN))
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def iter_raw_tables(path, columns=None, batch_size=10000):
+    """
+    Yield Arrow tables of batch_size rows (the last may be shorter) from a Parquet part directory
+
+    Rows of consecutive parts are regrouped, so small crawl parts still give full batches.
+    """
+    pending, rows = [], 0
+    for part in sorted(Path(path).glob(PART_PATTERN)):
+        parquet_file = pq.ParquetFile(part)
+        cols = [c for c in columns if c in parquet_file.schema_arrow.names] if columns else None
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=cols):
+            pending.append(batch)
+            rows += batch.num_rows
+            while rows >= batch_size:
+                table = pa.Table.from_batches(pending)
+                yield table.slice(0, batch_size)
+                pending = table.slice(batch_size).to_batches()
+                rows -= batch_size
+    if rows:
+        yield pa.Table.from_batches(pending)
+
+
+def read_raw_table(path, columns=None):
+    """All rows of a movies Parquet part directory as one Arrow table"""
+    tables = [pq.read_table(part, columns=columns) for part in sorted(Path(path).glob(PART_PATTERN))]
+    if not tables:
+        schema = RAW_MOVIE_SCHEMA if columns is None else pa.schema([RAW_MOVIE_SCHEMA.field(c) for c in columns])
+        return schema.empty_table()
+    return pa.concat_tables(tables)
+
+
+def read_raw_records(path, columns=None):
+    """All raw records of a Parquet part directory or JSONL file as a list of dicts"""
+    records = []
+    for batch in iter_raw_records(path, columns):
+        records.extend(batch)
+    return records
+
+
+# ----------------------------
+# Refresh deltas
+# ----------------------------
+class RawDelta:
+    """
+    Movies re-fetched by `fetch_data.py refresh`, read from its delta directory
+
+    Every refresh writes a <stamp>_movies / <stamp>_reviews pair (Parquet part
+    directories or JSONL files, like the main store). Pairs are read in stamp
+    order and the latest one wins per movie: its record replaces the movie's
+    record of the main store, and its reviews replace all of the movie's
+    reviews. Only the (small) deltas are held in memory.
+
+    Args:
+        delta_dir: data/raw/delta
+        movie_columns (list): movie fields to keep (None = all)
+        review_columns (list): review fields to keep (None = all)
+    """
+
+    def __init__(self, delta_dir, movie_columns=None, review_columns=None):
+        self.movies = {}
+        self.reviews = {}
+        self.pairs = 0
+        delta_dir = Path(delta_dir)
+        if not delta_dir.is_dir():
+            return
+        for movies_path in sorted(delta_dir.iterdir()):
+            if not movies_path.name.endswith(("_movies", "_movies.jsonl")):
+                continue
+            reviews_path = movies_path.with_name(movies_path.name.replace("_movies", "_reviews", 1))
+            ids = set()
+            for batch in iter_raw_records(movies_path, movie_columns):
+                for record in batch:
+                    self.movies[record["id"]] = record
+                    self.reviews[record["id"]] = []
+                    ids.add(record["id"])
+            if reviews_path.exists():
+                for batch in iter_raw_records(reviews_path, review_columns):
+                    for review in batch:
+                        if review.get("movie_id") in ids:
+                            self.reviews[review["movie_id"]].append(review)
+            self.pairs += 1
+
+    def __len__(self):
+        return len(self.movies)
+
+    def apply_movies(self, movies):
+        """Replace refreshed movies in a list of records or an Arrow table, keeping row positions"""
+        if not self.movies:
+            return movies
+        if isinstance(movies, pa.Table):
+            ids = movies.column("id").to_pylist()
+            rows = [i for i, movie_id in enumerate(ids) if movie_id in self.movies]
+            if not rows:
+                return movies
+            names = movies.column_names
+            updates = pa.Table.from_pylist([{c: self.movies[ids[i]].get(c) for c in names} for i in rows],
+                                           schema=movies.schema)
+            order = list(range(len(ids)))
+            for n, i in enumerate(rows):
+                order[i] = len(ids) + n
+            return pa.concat_tables([movies, updates]).take(order)
+        return [self.movies.get(movie.get("id"), movie) for movie in movies]
+
+    def apply_reviews(self, batches):
+        """Review batches without the refreshed movies' old reviews, then the refreshed reviews"""
+        for batch in batches:
+            if self.reviews:
+                batch = [review for review in batch if review.get("movie_id") not in self.reviews]
+            yield batch
+        refreshed = [review for reviews in self.reviews.values() for review in reviews]
+        if refreshed:
+            yield refreshed
+
+
+def convert_jsonl(movies_jsonl, reviews_jsonl, movies_dir, reviews_dir, chunk_size=FLUSH_EVERY * 10):
+    """One-time migration of a JSONL crawl into Parquet parts (streams both files)"""
+    store = ParquetCheckpointStore(movies_dir, reviews_dir)
+    if store.ids:
+        raise ValueError(f"{movies_dir} already contains movies; refusing to convert twice")
+
+    movie_batches = _iter_jsonl(movies_jsonl, chunk_size)
+    review_batches = _iter_jsonl(reviews_jsonl, chunk_size) if Path(reviews_jsonl).exists() else iter(())
+    n_movies = n_reviews = 0
+    while True:
+        movies = next(movie_batches, None)
+        reviews = next(review_batches, None)
+        if movies is None and reviews is None:
+            break
+        # pairs keep the commit rule: every reviews part has a movies part (possibly empty)
+        store.write_parts(movies or [], reviews or [])
+        n_movies += len(movies or [])
+        n_reviews += len(reviews or [])
+    store.close()
+    return n_movies, n_reviews
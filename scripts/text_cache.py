@@ -0,0 +1,125 @@
+"""
+Persistent cache of cleaned text for DataCleaner.create_clean_text
+
+One SQLite table maps a content hash of a movie's raw text inputs and the
+cleaning configuration to its clean_text and clean_overview, so a rerun
+only cleans movies whose text changed since the last run.
+
+    - key: blake2b(config, raw_text, overview); config holds the stopword
+      mode and the stopword list, so switching modes keeps both entries
+    - version: stored in a meta table; a different cleaning logic version
+      on open wipes every entry
+    - size bound: entries not used for the most runs are evicted on close
+      until the stored text fits in max_bytes
+"""
+import hashlib
+import sqlite3
+from pathlib import Path
+
+# SQLite host parameters per IN (...) query (the default limit is 999 on old builds)
+QUERY_BATCH = 500
+
+
+def _utf8_size(text):
+    return len(text.encode('utf-8', 'surrogatepass'))
+
+
+class TextCache:
+    """
+    Content-hash cache of (clean_text, clean_overview) pairs
+
+    Args:
+        path: SQLite file (created with its directory)
+        version (str): cleaning logic version; entries of other versions are dropped
+        config (str): cleaning configuration folded into every key
+        max_bytes (int): stored text kept after close()
+    """
+
+    def __init__(self, path, version, config, max_bytes):
+        self.path = Path(path)
+        self.version = str(version)
+        self.max_bytes = max_bytes
+        self._prefix = hashlib.blake2b(config.encode('utf-8'), digest_size=16).digest()
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS cleaned (key BLOB PRIMARY KEY, clean_text TEXT,"
+                         " clean_overview TEXT, size INTEGER, used INTEGER)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS cleaned_used ON cleaned (used)")
+
+        meta = dict(self._db.execute("SELECT key, value FROM meta"))
+        if meta.get('version') != self.version:
+            self._db.execute("DELETE FROM cleaned")
+            meta = {'version': self.version, 'run': '0'}
+        # runs since the cache was created; entries remember the last run that used them
+        self.run = int(meta.get('run', 0)) + 1
+        self._db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                             [('version', self.version), ('run', str(self.run))])
+        self._db.commit()
+
+    def key(self, raw_text, overview):
+        """16-byte content hash of one movie's cleaning inputs"""
+        digest = hashlib.blake2b(self._prefix, digest_size=16)
+        digest.update(raw_text.encode('utf-8', 'surrogatepass'))
+        digest.update(b'\0')
+        digest.update(overview.encode('utf-8', 'surrogatepass'))
+        return digest.digest()
+
+    def get_many(self, keys):
+        """
+        Look up keys and mark the hits as used by this run
+
+        Returns:
+            dict: key -> (clean_text, clean_overview) for the keys found
+        """
+        unique = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(unique), QUERY_BATCH):
+            batch = unique[start:start + QUERY_BATCH]
+            marks = ','.join('?' * len(batch))
+            rows = self._db.execute(
+                f"SELECT key, clean_text, clean_overview FROM cleaned WHERE key IN ({marks})", batch)
+            for key, clean_text, clean_overview in rows:
+                found[key] = (clean_text, clean_overview)
+            self._db.execute(f"UPDATE cleaned SET used = ? WHERE key IN ({marks})", [self.run] + batch)
+        self._db.commit()
+
+        hits = sum(key in found for key in keys)
+        self.stats['hits'] += hits
+        self.stats['misses'] += len(keys) - hits
+        return found
+
+    def put_many(self, entries):
+        """Store (key, clean_text, clean_overview) triples"""
+        self._db.executemany(
+            "INSERT OR REPLACE INTO cleaned VALUES (?, ?, ?, ?, ?)",
+            [(key, text, overview, _utf8_size(text) + _utf8_size(overview), self.run)
+             for key, text, overview in entries])
+        self._db.commit()
+
+    def evict(self):
+        """Drop least recently used entries until the stored text fits in max_bytes"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cleaned").fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM cleaned ORDER BY used, key").fetchall():
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM cleaned WHERE key = ?", doomed)
+        self._db.commit()
+        self.stats['evicted'] += len(doomed)
+        return len(doomed)
+
+    def close(self):
+        """Evict down to max_bytes and close the database"""
+        self.evict()
+        self._db.close()
@@ -0,0 +1,204 @@
+"""
+Movie vector artifact (data/processed/movie_embeddings.*)
+
+vectorize_cluster.py writes the feature matrix as:
+
+    movie_embeddings.bin       raw float32, float16 or int8 rows, np.memmap-able
+    movie_embeddings.ids.npy   int64 movie_id of each row
+    movie_embeddings.json      model, dim, dtype, rows and what the columns hold
+    movie_embeddings.quant.npy int8 only: per-dimension (scale, offset)
+
+read_vectors() maps them without copying, and align_vectors() puts the
+rows in the order of any movie_id column with one searchsorted join,
+so consumers never depend on row positions.
+
+float16 halves the file and int8 quarters it. int8 maps each dimension's
+[min, max] onto [-127, 127] with its own scale, so a small-range embedding
+dimension keeps its resolution next to a large-range numeric feature.
+Stored rows are turned back into float32 only block by block
+(dequantize / iter_blocks), and nearest_neighbors / assign_nearest compute
+distances that way.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+VECTORS_PATH = Path("data/processed/movie_embeddings")
+VECTORS_VERSION = 1
+DTYPES = ("float32", "float16", "int8")
+# rows dequantized at a time by distance computations
+BLOCK_ROWS = 65536
+
+
+def _files(path):
+    path = Path(path)
+    return (path.with_name(path.name + ".bin"), path.with_name(path.name + ".ids.npy"),
+            path.with_name(path.name + ".json"), path.with_name(path.name + ".quant.npy"))
+
+
+def quantize(vectors, dtype):
+    """
+    Stored form of float vectors
+
+    Returns:
+        (stored, quant): quant is the (2, dim) float32 [scale, offset] for int8, else None
+    """
+    if dtype != "int8":
+        return np.ascontiguousarray(vectors, dtype=dtype), None
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors):
+        lo, hi = vectors.min(axis=0), vectors.max(axis=0)
+    else:
+        lo = hi = np.zeros(vectors.shape[1], dtype=np.float32)
+    offset = (hi + lo) / 2
+    scale = (hi - lo) / 254
+    scale[scale == 0] = 1.0
+    stored = np.clip(np.rint((vectors - offset) / scale), -127, 127).astype(np.int8)
+    return stored, np.stack([scale, offset]).astype(np.float32)
+
+
+def dequantize(block, header):
+    """float32 copy of stored rows (any slice or gather of read_vectors' matrix)"""
+    if header['dtype'] == "int8":
+        scale, offset = header['quant']
+        return block.astype(np.float32) * scale + offset
+    return np.asarray(block, dtype=np.float32)
+
+
+def iter_blocks(vectors, header, block_rows=BLOCK_ROWS):
+    """(start, float32 block) over the stored rows, block_rows at a time"""
+    for start in range(0, len(vectors), block_rows):
+        yield start, dequantize(vectors[start:start + block_rows], header)
+
+
+def write_vectors(path, ids, vectors, model, dtype="float32", **meta):
+    """
+    Write vectors (rows x dim) with their movie ids
+
+    Args:
+        path: artifact path without extension
+        ids: movie_id of each row (unique)
+        vectors: 2-d array
+        model (str): embedding model name, kept in the header
+        dtype (str): "float32", "float16" or "int8" (per-dimension scaled) on disk
+        **meta: extra header fields (e.g. column layout)
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype must be one of {DTYPES}, got {dtype}")
+    ids = np.asarray(ids, dtype=np.int64)
+    vectors = np.asarray(vectors)
+    if vectors.ndim != 2 or len(vectors) != len(ids):
+        raise ValueError(f"{len(ids)} ids for vectors of shape {vectors.shape}")
+    if len(np.unique(ids)) != len(ids):
+        raise ValueError("movie ids must be unique")
+
+    bin_path, ids_path, header_path, quant_path = _files(path)
+    bin_path.parent.mkdir(parents=True, exist_ok=True)
+    header = {'version': VECTORS_VERSION, 'model': model, 'dim': int(vectors.shape[1]),
+              'rows': int(len(ids)), 'dtype': dtype, **meta}
+    stored, quant = quantize(vectors, dtype)
+
+    writes = [(bin_path, lambda f: f.write(stored.tobytes())), (ids_path, lambda f: np.save(f, ids))]
+    if quant is not None:
+        writes.append((quant_path, lambda f: np.save(f, quant)))
+    # header last: a reader that finds it finds matching data files
+    writes.append((header_path, lambda f: f.write(json.dumps(header, indent=2).encode('utf-8'))))
+    for target, write in writes:
+        tmp = target.with_name(target.name + ".tmp")
+        with open(tmp, 'wb') as f:
+            write(f)
+        os.replace(tmp, target)
+
+
+def read_vectors(path=VECTORS_PATH):
+    """
+    Map the artifact (no copy)
+
+    Returns:
+        (ids, vectors, header): int64 ids and a read-only (rows x dim) memmap
+        of the stored dtype; for int8, header['quant'] holds [scale, offset]
+        (pass header to dequantize)
+    """
+    bin_path, ids_path, header_path, quant_path = _files(path)
+    if not header_path.exists():
+        raise FileNotFoundError(f"{header_path} not found. Run: python scripts/vectorize_cluster.py")
+    with open(header_path, 'r', encoding='utf-8') as f:
+        header = json.load(f)
+    if header.get('version') != VECTORS_VERSION:
+        raise ValueError(f"{header_path} has version {header.get('version')}, expected {VECTORS_VERSION}")
+
+    ids = np.load(ids_path, mmap_mode='r')
+    shape = (header['rows'], header['dim'])
+    if len(ids) != shape[0] or bin_path.stat().st_size != shape[0] * shape[1] * np.dtype(header['dtype']).itemsize:
+        raise ValueError(f"{bin_path} does not match its header {header_path}")
+    vectors = np.memmap(bin_path, dtype=header['dtype'], mode='r', shape=shape) if shape[0] else \
+        np.empty(shape, dtype=header['dtype'])
+    if header['dtype'] == "int8":
+        header['quant'] = np.load(quant_path)
+    return ids, vectors, header
+
+
+def align_vectors(ids, vectors, movie_ids):
+    """
+    Rows of vectors in the order of movie_ids (a vectorized join on id)
+
+    Returns:
+        (matrix, missing): matrix has one row per movie_id (zeros where the
+        id has no vector) and missing is the boolean mask of those rows. When
+        the ids already match, matrix is vectors itself (no copy).
+    """
+    ids = np.asarray(ids)
+    movie_ids = np.asarray(movie_ids, dtype=np.int64)
+    if len(ids) == len(movie_ids) and np.array_equal(ids, movie_ids):
+        return vectors, np.zeros(len(movie_ids), dtype=bool)
+
+    order = np.argsort(ids, kind='stable')
+    positions = np.searchsorted(ids, movie_ids, sorter=order)
+    positions = np.minimum(positions, max(len(ids) - 1, 0))
+    rows = order[positions] if len(ids) else np.zeros(len(movie_ids), dtype=np.int64)
+    missing = ids[rows] != movie_ids if len(ids) else np.ones(len(movie_ids), dtype=bool)
+
+    matrix = np.zeros((len(movie_ids), vectors.shape[1]), dtype=vectors.dtype)
+    matrix[~missing] = vectors[rows[~missing]]
+    return matrix, missing
+
+
+def _squared_distances(block, queries, query_norms):
+    return np.maximum((block * block).sum(axis=1)[:, None] - 2 * block @ queries.T + query_norms, 0)
+
+
+def nearest_neighbors(queries, vectors, header, k=10, block_rows=BLOCK_ROWS):
+    """
+    Exact k nearest stored rows (euclidean) of each query, dequantizing block by block
+
+    Returns:
+        (rows, distances): (len(queries), k) row indices and distances, nearest first
+    """
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    query_norms = (queries * queries).sum(axis=1)[None, :]
+    k = min(k, len(vectors))
+    best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+    best = np.zeros((len(queries), 0), dtype=np.float32)
+    for start, block in iter_blocks(vectors, header, block_rows):
+        distances = _squared_distances(block, queries, query_norms).T
+        rows = np.broadcast_to(np.arange(start, start + len(block)), distances.shape)
+        best = np.hstack([best, distances])
+        best_rows = np.hstack([best_rows, rows])
+        if best.shape[1] > k:
+            keep = np.argpartition(best, k - 1, axis=1)[:, :k]
+            best = np.take_along_axis(best, keep, axis=1)
+            best_rows = np.take_along_axis(best_rows, keep, axis=1)
+    order = np.argsort(best, axis=1, kind='stable')
+    return np.take_along_axis(best_rows, order, axis=1), np.sqrt(np.take_along_axis(best, order, axis=1))
+
+
+def assign_nearest(vectors, header, centers, block_rows=BLOCK_ROWS):
+    """Index of the nearest center for every stored row, dequantizing block by block"""
+    centers = np.asarray(centers, dtype=np.float32)
+    center_norms = (centers * centers).sum(axis=1)[None, :]
+    labels = np.zeros(len(vectors), dtype=np.int64)
+    for start, block in iter_blocks(vectors, header, block_rows):
+        labels[start:start + len(block)] = _squared_distances(block, centers, center_norms).argmin(axis=1)
+    return labels
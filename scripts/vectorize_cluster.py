@@ -1,29 +1,39 @@
 import os
-import pickle
 import numpy as np
-import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sentence_transformers import SentenceTransformer
 from sklearn.decomposition import PCA
 import umap
 import matplotlib.pyplot as plt
-from textblob import TextBlob
+
+from basic_features import FEATURES, FEATURES_PATH, extract_basic_features, save_features
+from cleaned_store import read_cleaned
+from embedding_engine import EmbeddingEngine
+from embedding_store import STORE_DIR, EmbeddingStore
+from vector_store import VECTORS_PATH, write_vectors
 
 
 # ----------------------------
 # CONFIG
 # ----------------------------
-INPUT_PATH = "data/cleaned/cleaned_movies.csv"
-OUTPUT_PATH = "data/processed/movie_embeddings.pkl"
+INPUT_PATH = "data/cleaned/movies"
+OUTPUT_PATH = VECTORS_PATH      # movie_embeddings.bin / .ids.npy / .json
+OUTPUT_DTYPE = "float32"        # "float16" halves the file, "int8" (per-dimension scaled) quarters it
 USE_EMBEDDING = True         # False = TF-IDF, True = SentenceTransformers
 EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBED_BATCH_SIZE = 128       # most texts per batch
+EMBED_TOKEN_BUDGET = 8192    # padded tokens per batch (short texts get bigger batches)
+EMBED_CHUNK_LONG = True      # True = embed long texts window by window and pool, False = truncate
+EMBED_CACHE = True           # True = reuse vectors of unchanged texts from EMBED_STORE_DIR
+EMBED_STORE_DIR = STORE_DIR
 
 
 # ----------------------------
 # 1) Load Cleaned Data
 # ----------------------------
 def load_data(path):
-    df = pd.read_csv(path)
+    # only clean_text is used; movie_id keeps rows identifiable
+    df = read_cleaned(path, columns=["movie_id", "clean_text"])
     if "clean_text" not in df.columns:
         raise ValueError("ERROR: ต้องมี column clean_text ในไฟล์ cleaned data")
     return df
@@ -32,11 +42,8 @@ def load_data(path):
 # ----------------------------
 # 2) Basic Feature Engineering
 # ----------------------------
-def extract_basic_features(df):
-    df["desc_length"] = df["clean_text"].str.len()
-    df["num_keywords"] = df["clean_text"].str.split().apply(len)
-    df["sentiment_score"] = df["clean_text"].apply(lambda x: TextBlob(x).sentiment.polarity)
-    return df
+# extract_basic_features (basic_features.py): desc_length, num_keywords, sentiment_score;
+# saved to FEATURES_PATH for the clustering stage
 
 
 # ----------------------------
@@ -48,7 +55,11 @@ def vectorize_text(df):
     if USE_EMBEDDING:
         print(">> Using Sentence Embedding:", EMBED_MODEL)
         model = SentenceTransformer(EMBED_MODEL)
-        vectors = model.encode(texts, show_progress_bar=True)
+        engine = EmbeddingEngine(model, batch_size=EMBED_BATCH_SIZE,
+                                 token_budget=EMBED_TOKEN_BUDGET, chunk=EMBED_CHUNK_LONG)
+        vectors = embed_cached(engine, texts) if EMBED_CACHE else engine.encode(texts)
+        if engine.stats:
+            print(">>", engine.summary())
     else:
         print(">> Using TF-IDF Vectorizer")
         vectorizer = TfidfVectorizer(max_features=2000)
@@ -57,11 +68,33 @@ def vectorize_text(df):
     return vectors
 
 
+def embed_cached(engine, texts):
+    """Embed only texts missing from the embedding store; the rest come from disk"""
+    store = EmbeddingStore(EMBED_MODEL, engine.config, engine.model.get_sentence_embedding_dimension(),
+                           root=EMBED_STORE_DIR)
+    texts = ["" if text is None else str(text) for text in texts]
+    keys = [store.key(text) for text in texts]
+    rows = store.lookup(keys)
+
+    # each distinct unseen text is embedded once
+    missing = {}
+    for i in np.flatnonzero(rows < 0):
+        missing.setdefault(keys[i], texts[i])
+    print(f">> Embedding store: {len(texts) - np.count_nonzero(rows < 0)} cached, {len(missing)} to embed")
+    if missing:
+        store.add(list(missing), engine.encode(list(missing.values())))
+
+    # drop vectors of texts that changed since, once they outnumber the live ones
+    if store.rows > 2 * len(set(keys)):
+        store.compact(keys)
+    return store.get(store.lookup(keys))
+
+
 # ----------------------------
 # 4) Combine vectors + basic features
 # ----------------------------
 def combine_features(text_vec, df):
-    numeric = df[["desc_length", "num_keywords", "sentiment_score"]].values
+    numeric = df[FEATURES].values
     return np.hstack([text_vec, numeric])
 
 
@@ -97,10 +130,12 @@ def plot_distribution(vectors, output_dir="data/processed"):
 # ----------------------------
 # 6) Save Output
 # ----------------------------
-def save_pickle(data, path):
-    with open(path, "wb") as f:
-        pickle.dump(data, f)
-    print(f">> Saved: {path}")
+def save_vectors(vectors, df, path, text_dim):
+    # rows are keyed by movie_id; consumers join on it instead of trusting positions
+    write_vectors(path, df["movie_id"].to_numpy(), vectors,
+                  model=EMBED_MODEL if USE_EMBEDDING else "tfidf", dtype=OUTPUT_DTYPE,
+                  columns={"text": text_dim, "numeric": FEATURES})
+    print(f">> Saved: {path}.bin ({vectors.shape[0]} x {vectors.shape[1]} {OUTPUT_DTYPE})")
 
 
 # ----------------------------
@@ -111,11 +146,13 @@ if __name__ == "__main__":
 
     df = load_data(INPUT_PATH)
     df = extract_basic_features(df)
+    save_features(df, FEATURES_PATH)
+    print(f">> Saved: {FEATURES_PATH}")
 
     vec = vectorize_text(df)
     combined = combine_features(vec, df)
 
-    save_pickle(combined, OUTPUT_PATH)
+    save_vectors(combined, df, OUTPUT_PATH, vec.shape[1])
 
     plot_distribution(combined)
 
@@ -1,26 +1,18 @@
-import pandas as pd
-from pathlib import Path
+from cleaned_store import cleaned_columns, read_cleaned
 
 def verify_cleaned_data():
     print("="*80)
     print("CLEANED DATA VERIFICATION")
     print("="*80)
     
-    # Load cleaned data
-    file_path = Path("../../data/cleaned/cleaned_movies.csv")
-    
-    if not file_path.exists():
-        print("❌ Error: cleaned_movies.csv not found!")
+    # Load cleaned data (schema first, then only the columns checked below)
+    try:
+        columns = cleaned_columns()
+    except FileNotFoundError:
+        print("❌ Error: cleaned dataset (data/cleaned/movies) not found!")
         print("   Run: python scripts/clean_data.py")
         return False
     
-    df = pd.read_csv(file_path)
-    
-    print(f"\n📊 Dataset Info:")
-    print(f"   Total records: {len(df)}")
-    print(f"   Total columns: {len(df.columns)}")
-    print(f"   Memory usage: {df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB")
-    
     # Check required columns
     required_cols = [
         'movie_id', 'title', 'year', 'genres', 
@@ -28,7 +20,7 @@ def verify_cleaned_data():
     ]
     
     print(f"\n✓ Checking required columns...")
-    missing_cols = [col for col in required_cols if col not in df.columns]
+    missing_cols = [col for col in required_cols if col not in columns]
     
     if missing_cols:
         print(f"   ❌ Missing columns: {missing_cols}")
@@ -36,6 +28,13 @@ def verify_cleaned_data():
     else:
         print(f"   ✅ All required columns present")
     
+    df = read_cleaned(columns=required_cols + ['review_count'])
+    
+    print(f"\n📊 Dataset Info:")
+    print(f"   Total records: {len(df)}")
+    print(f"   Total columns: {len(columns)}")
+    print(f"   Memory usage (checked columns): {df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB")
+    
     # Check for nulls
     print(f"\n✓ Checking for null values...")
     critical_cols = ['movie_id', 'title', 'overview', 'clean_text', 'year']
@@ -3,15 +3,34 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 
+from cleaned_store import read_cleaned
+from quality_profile import PROFILE_FILE, QualityProfile
+
 # Set style
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 8)
 
+def load_profile():
+    """Quality profile saved by clean_data.py (profiled once from the dataset if missing)"""
+    if PROFILE_FILE.exists():
+        return QualityProfile.load(PROFILE_FILE)
+    print(f"[WARN] {PROFILE_FILE} not found, profiling the cleaned dataset")
+    profile = QualityProfile()
+    profile.update(read_cleaned())
+    return profile
+
+
+def plot_histogram(ax, column, bins, **style):
+    """Histogram of a column from its sketch (bars at the sketched counts)"""
+    counts, edges = column.histogram(bins)
+    ax.hist(edges[:-1], bins=edges, weights=counts, **style)
+
+
 def create_visualizations():
     print("Creating data quality visualizations...")
     
-    # Load data
-    df = pd.read_csv("data/cleaned/cleaned_movies.csv")
+    # Every chart comes from the profile; the dataset itself is not read
+    profile = load_profile()
     
     # Create output directory
     viz_dir = Path("data/cleaned/visualizations")
@@ -21,13 +40,9 @@ def create_visualizations():
     plt.figure(figsize=(10, 6))
     
     completeness = {}
-    for col in df.columns:
-        if df[col].dtype == 'object':
-            complete = ((df[col].notna()) & (df[col] != '')).sum()
-        else:
-            complete = df[col].notna().sum()
-        
-        completeness[col] = (complete / len(df)) * 100
+    for col, column in profile.columns.items():
+        complete = column.rows - column.nulls - column.empties
+        completeness[col] = (complete / max(column.rows, 1)) * 100
     
     completeness_df = pd.DataFrame.from_dict(
         completeness, 
@@ -46,12 +61,13 @@ def create_visualizations():
     # 2. Rating distribution
     plt.figure(figsize=(10, 6))
     
-    plt.hist(df['vote_average'], bins=20, color='coral', edgecolor='black', alpha=0.7)
+    vote_average = profile['vote_average']
+    plot_histogram(plt.gca(), vote_average, 20, color='coral', edgecolor='black', alpha=0.7)
     plt.xlabel('Vote Average (0-10)')
     plt.ylabel('Number of Movies')
     plt.title('Distribution of Movie Ratings')
-    plt.axvline(df['vote_average'].mean(), color='red', linestyle='--', 
-                label=f'Mean: {df["vote_average"].mean():.2f}')
+    plt.axvline(vote_average.moments.mean, color='red', linestyle='--', 
+                label=f'Mean: {vote_average.moments.mean:.2f}')
     plt.legend()
     plt.tight_layout()
     plt.savefig(viz_dir / 'rating_distribution.png', dpi=300, bbox_inches='tight')
@@ -61,7 +77,7 @@ def create_visualizations():
     # 3. Movies per year
     plt.figure(figsize=(12, 6))
     
-    year_counts = df['year'].value_counts().sort_index()
+    year_counts = pd.Series(dict(profile['year'].top.counts)).sort_index()
     plt.plot(year_counts.index, year_counts.values, marker='o', linewidth=2, color='teal')
     plt.xlabel('Year')
     plt.ylabel('Number of Movies')
@@ -75,14 +91,7 @@ def create_visualizations():
     # 4. Top genres
     plt.figure(figsize=(10, 6))
     
-    # Extract genres
-    all_genres = []
-    for genres_str in df['genres'].dropna():
-        if genres_str:
-            all_genres.extend(genres_str.split())
-    
-    from collections import Counter
-    genre_counts = Counter(all_genres).most_common(10)
+    genre_counts = profile['genres'].top.top(10)
     
     genres, counts = zip(*genre_counts)
     plt.barh(genres, counts, color='mediumpurple')
@@ -97,21 +106,23 @@ def create_visualizations():
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     
     # clean_text
-    axes[0].hist(df['clean_text'].str.len(), bins=30, color='skyblue', edgecolor='black', alpha=0.7)
+    clean_text = profile['clean_text']
+    plot_histogram(axes[0], clean_text, 30, color='skyblue', edgecolor='black', alpha=0.7)
     axes[0].set_xlabel('Text Length (characters)')
     axes[0].set_ylabel('Number of Movies')
     axes[0].set_title('Distribution of clean_text Length')
-    axes[0].axvline(df['clean_text'].str.len().mean(), color='red', linestyle='--',
-                    label=f'Mean: {df["clean_text"].str.len().mean():.0f}')
+    axes[0].axvline(clean_text.moments.mean, color='red', linestyle='--',
+                    label=f'Mean: {clean_text.moments.mean:.0f}')
     axes[0].legend()
     
     # clean_overview
-    axes[1].hist(df['clean_overview'].str.len(), bins=30, color='lightcoral', edgecolor='black', alpha=0.7)
+    clean_overview = profile['clean_overview']
+    plot_histogram(axes[1], clean_overview, 30, color='lightcoral', edgecolor='black', alpha=0.7)
     axes[1].set_xlabel('Text Length (characters)')
     axes[1].set_ylabel('Number of Movies')
     axes[1].set_title('Distribution of clean_overview Length')
-    axes[1].axvline(df['clean_overview'].str.len().mean(), color='red', linestyle='--',
-                    label=f'Mean: {df["clean_overview"].str.len().mean():.0f}')
+    axes[1].axvline(clean_overview.moments.mean, color='red', linestyle='--',
+                    label=f'Mean: {clean_overview.moments.mean:.0f}')
     axes[1].legend()
     
     plt.tight_layout()
@@ -122,12 +133,13 @@ def create_visualizations():
     # 6. Review count distribution
     plt.figure(figsize=(10, 6))
     
-    plt.hist(df['review_count'], bins=20, color='gold', edgecolor='black', alpha=0.7)
+    review_count = profile['review_count']
+    plot_histogram(plt.gca(), review_count, 20, color='gold', edgecolor='black', alpha=0.7)
     plt.xlabel('Number of Reviews')
     plt.ylabel('Number of Movies')
     plt.title('Distribution of Review Counts')
-    plt.axvline(df['review_count'].mean(), color='red', linestyle='--',
-                label=f'Mean: {df["review_count"].mean():.1f}')
+    plt.axvline(review_count.moments.mean, color='red', linestyle='--',
+                label=f'Mean: {review_count.moments.mean:.1f}')
     plt.legend()
     plt.tight_layout()
     plt.savefig(viz_dir / 'review_count_distribution.png', dpi=300, bbox_inches='tight')